@@ -0,0 +1,159 @@
+"""
+Series Analytics for Vehicle Registration Dashboard
+Rolling means, FFT autocorrelation seasonality and percentile ranks computed
+for every series at once on a 2-D (series x period) array
+"""
+
+import numpy as np
+import pandas as pd
+
+def series_matrix(totals, period_level):
+    """Pivot rollup totals to a dense 2-D (series x period) array
+
+    Args:
+        totals: Series indexed by the series dimensions plus an integer
+            period key level
+        period_level: Name of the period key level
+
+    Returns:
+        (matrix, series_index, period_keys) where missing periods are 0
+    """
+    wide = totals.unstack(period_level, fill_value=0)
+    keys = wide.columns.to_numpy().astype(np.int64)
+    period_keys = np.arange(keys.min(), keys.max() + 1) if len(keys) else keys
+    wide = wide.reindex(columns=period_keys, fill_value=0)
+    return wide.to_numpy(dtype=np.float64), wide.index, period_keys
+
+def rolling_mean(matrix, window):
+    """Trailing mean over `window` periods along each row
+
+    The first window - 1 periods are NaN, as with pandas rolling().mean().
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    cumulative = np.cumsum(matrix, axis=-1)
+    means = np.full(matrix.shape, np.nan)
+    if window <= matrix.shape[-1]:
+        sums = cumulative[..., window - 1:].copy()
+        sums[..., 1:] -= cumulative[..., :-window]
+        means[..., window - 1:] = sums / window
+    return means
+
+def autocorrelation(matrix, demean=True, normalize=True):
+    """Autocorrelation of each row for lags 0..n-1 via the FFT
+
+    O(n log n) per row instead of the O(n^2) of np.correlate. With
+    demean=False and normalize=False it equals the non-negative lags of
+    np.correlate(row, row, mode='full').
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    n = matrix.shape[-1]
+    if demean:
+        matrix = matrix - matrix.mean(axis=-1, keepdims=True)
+
+    # Zero-pad to avoid circular wrap-around
+    size = 1 << int(np.ceil(np.log2(max(2 * n - 1, 1))))
+    spectrum = np.fft.rfft(matrix, n=size, axis=-1)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=-1)[..., :n]
+    if normalize:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            acf = acf / acf[..., :1]
+    return acf
+
+def peak_lags(acf, tolerance=0.0):
+    """Get the lags that are local maxima of a 1-D autocorrelation
+
+    A lag must exceed both neighbours by more than tolerance, so FFT
+    rounding noise on flat stretches is not taken for a peak.
+    """
+    acf = np.asarray(acf)
+    is_peak = (acf[1:-1] > acf[:-2] + tolerance) & (acf[1:-1] > acf[2:] + tolerance)
+    return np.flatnonzero(is_peak) + 1
+
+def seasonality(matrix, min_lag=2, max_lag=None):
+    """Find each row's dominant seasonal lag from its autocorrelation
+
+    Returns:
+        (lags, strengths): the lag in [min_lag, max_lag] with the highest
+        autocorrelation and that autocorrelation (-1..1). Constant rows, or
+        rows too short for min_lag, get lag 0 and NaN strength.
+    """
+    acf = autocorrelation(matrix)
+    n = acf.shape[-1]
+    max_lag = min(max_lag or n // 2, n - 1)
+    lags = np.zeros(acf.shape[0], dtype=np.int64)
+    strengths = np.full(acf.shape[0], np.nan)
+    if max_lag < min_lag:
+        return lags, strengths
+
+    window = np.nan_to_num(acf[:, min_lag:max_lag + 1], nan=-np.inf)
+    best = window.argmax(axis=1)
+    found = np.isfinite(window[np.arange(len(best)), best])
+    lags[found] = best[found] + min_lag
+    strengths[found] = window[found, best[found]]
+    return lags, strengths
+
+def percentile_ranks(values, axis=None):
+    """Percentage of values strictly below each value
+
+    With axis=0 on a 2-D array, each value is ranked within its column
+    (e.g. each series within a period). Ties share the same rank. Runs in
+    O(n log n) with one sort instead of a scan per value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if axis is None:
+        flat = values.ravel()
+        if not len(flat):
+            return values
+        below = np.searchsorted(np.sort(flat), flat, side='left')
+        return (below / len(flat) * 100).reshape(values.shape)
+
+    # Sort each line once; every value's rank is the sorted position of
+    # the first value equal to it
+    columns = np.moveaxis(values, axis, -1)
+    rows, length = columns.reshape(-1, columns.shape[-1]).shape
+    flat = columns.reshape(rows, length)
+    if not length:
+        return values
+    order = np.argsort(flat, axis=1, kind='stable')
+    ordered = np.take_along_axis(flat, order, axis=1)
+    positions = np.broadcast_to(np.arange(length), (rows, length))
+    run_start = np.where(
+        np.concatenate([np.ones((rows, 1), bool), ordered[:, 1:] != ordered[:, :-1]], axis=1),
+        positions, 0
+    )
+    run_start = np.maximum.accumulate(run_start, axis=1)
+    ranks = np.empty_like(flat)
+    np.put_along_axis(ranks, order, run_start / length * 100, axis=1)
+    return np.moveaxis(ranks.reshape(columns.shape), -1, axis)
+
+def percentile_rank_of(data, values):
+    """Percentile rank of each value (scalar or array) within data"""
+    data = np.sort(np.asarray(data, dtype=np.float64).ravel())
+    if not len(data):
+        return np.zeros(np.shape(values)) if np.ndim(values) else 0
+    below = np.searchsorted(data, values, side='left')
+    return below / len(data) * 100
+
+def series_analytics(totals, period_level, window=3, max_lag=None):
+    """Summarize every series of a period rollup at once
+
+    Returns:
+        (summary, rolling) where summary has one row per series with its
+        latest period total, latest rolling mean, the percentile rank of
+        that total among all series, and the dominant seasonal lag and
+        strength; rolling is the (series x period) rolling-mean frame
+    """
+    matrix, series_index, period_keys = series_matrix(totals, period_level)
+    means = rolling_mean(matrix, window)
+    lags, strengths = seasonality(matrix, max_lag=max_lag)
+
+    latest = matrix[:, -1] if matrix.shape[1] else np.zeros(len(matrix))
+    summary = pd.DataFrame({
+        'latest_registrations': latest.astype(np.int64),
+        'rolling_mean': means[:, -1] if matrix.shape[1] else np.nan,
+        'percentile_rank': percentile_ranks(latest),
+        'seasonal_lag': lags,
+        'seasonal_strength': strengths
+    }, index=series_index)
+    rolling = pd.DataFrame(means, index=series_index, columns=period_keys)
+    return summary, rolling
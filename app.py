@@ -14,6 +14,12 @@ import numpy as np
 # Import our modules
 from data_scraper import VehicleDataScraper
 from data_processor import VehicleDataProcessor
+from data_exporter import EXPORT_FORMATS, make_filtered_download
+from profiler import profiler, span
+from shared_store import SharedStore
+from refresh_worker import RefreshWorker
+from chart_data import cached_figure, choose_period, downsample
+from periods import period_keys, period_start
 from utils import format_number, get_color_for_growth, get_available_years, get_available_quarters, get_vehicle_categories
 
 # Page configuration
@@ -49,15 +55,132 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    """Load and cache vehicle registration data"""
+def publish_data():
+    """Process fresh registration data and publish it to the shared store"""
     scraper = VehicleDataScraper()
     data = scraper.get_data()
     processor = VehicleDataProcessor(data)
+    # Unchanged data reuses its derived tables (and aggregated cube slices) from disk
+    processor.use_disk_cache()
     processor.process_data()
+    return processor.publish_to_shared_store()
+
+def warm_version(version):
+    """Open a version's processor and compute the aggregates the first view reads"""
+    processor = load_data(version)
+    processor.calculate_growth_metrics()
+    processor.get_summary_statistics()
+
+@st.cache_resource
+def refresh_worker():
+    """Start this process's background refresh worker
+    
+    Refreshes publish and warm a new version off the request path while
+    every session keeps serving the previous one. Only the very first
+    start, with nothing published yet, builds data on the request path.
+    """
+    store = SharedStore()
+    version = store.current_version() or publish_data()
+    return RefreshWorker(publish_data, version=version, warm=warm_version,
+                         latest=store.current_version).start()
+
+def current_data_version():
+    """Get the version sessions are served; refreshes swap it in atomically"""
+    return refresh_worker().version
+
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    """Open a shared store version and cache the processor
+    
+    The processor is shared by all sessions (not copied per rerun) so its
+    query result cache is reused across reruns. Its tables are memory-mapped
+    from the store, so other Streamlit processes on the host share the same
+    pages, and a newly published version is picked up on the next rerun.
+    Totals tables, summary statistics and growth metrics are read from the
+    disk cache when they were computed for the same data and code before.
+    """
+    processor = VehicleDataProcessor.from_shared_store(version=version)
+    processor.use_disk_cache()
     return processor
 
+# Trend chart x-axis title per period
+TREND_AXIS_LABELS = {'daily': 'Date', 'weekly': 'Week', 'monthly': 'Month',
+                     'quarterly': 'Quarter', 'yearly': 'Year'}
+
+def build_distribution_figure(summary_stats):
+    """Build the vehicle type distribution pie chart"""
+    with span('app.figure.vehicle_distribution'):
+        vehicle_dist = pd.DataFrame(list(summary_stats['vehicle_type_summary'].items()), 
+                                  columns=['Vehicle Type', 'Registrations'])
+        return px.pie(vehicle_dist, values='Registrations', names='Vehicle Type',
+                      title="Vehicle Type Distribution")
+
+def build_trend_figure(processor, period, start_date, end_date):
+    """Build the registration trend line for a date range
+    
+    Points beyond the chart width are dropped with LTTB downsampling, so
+    long daily histories send about CHART_CONFIG['max_points'] points.
+    """
+    trend_data = processor.get_trend_data(period=period)
+    with span('app.figure.trend', rows_in=len(trend_data)) as trend_span:
+        # Include the period the start date falls in
+        start = period_start(period_keys([start_date], period), period)[0]
+        trend_data = trend_data[trend_data['period'].between(start, pd.Timestamp(end_date))]
+        trend_data = downsample(trend_data, 'period', 'registrations')
+        trend_span.rows_out = len(trend_data)
+        
+        fig = px.line(trend_data, x='period', y='registrations', hover_data=['label'],
+                     title=f"{period.title()} Vehicle Registration Trends",
+                     labels={'period': TREND_AXIS_LABELS[period], 'label': TREND_AXIS_LABELS[period],
+                             'registrations': 'Registrations'})
+        fig.update_layout(height=400)
+    return fig
+
+def build_top_manufacturers_figure(processor, limit=10):
+    """Build the top manufacturers bar chart"""
+    top_manufacturers = processor.get_top_manufacturers(limit=limit)
+    with span('app.figure.top_manufacturers', rows_in=len(top_manufacturers)):
+        manufacturer_df = pd.DataFrame(list(top_manufacturers.items()), 
+                                     columns=['Manufacturer', 'Registrations'])
+        fig = px.bar(manufacturer_df, x='Manufacturer', y='Registrations',
+                    title=f"Top {limit} Manufacturers by Registrations")
+        fig.update_layout(height=400)
+    return fig
+
+def build_quarterly_heatmap(processor):
+    """Build the year x quarter registrations heatmap"""
+    quarterly_pivot = processor.get_quarterly_totals()
+    with span('app.figure.quarterly_heatmap', rows_in=quarterly_pivot.size):
+        fig = px.imshow(quarterly_pivot.values,
+                       x=list(quarterly_pivot.columns),
+                       y=list(quarterly_pivot.index),
+                       title="Quarterly Performance Heatmap",
+                       labels=dict(x="Quarter", y="Year", color="Registrations"),
+                       color_continuous_scale="Viridis")
+        fig.update_layout(height=400)
+    return fig
+
+def render_performance_panel():
+    """Show pipeline span timings in the sidebar when profiling is on"""
+    with st.sidebar.expander("⏱️ Performance"):
+        profiler.enabled = st.checkbox("Record timings", value=profiler.enabled)
+        stats = profiler.stats()
+        if not stats:
+            st.caption("No spans recorded yet.")
+            return
+        
+        table = pd.DataFrame.from_dict(stats, orient='index')
+        st.dataframe(
+            table[['count', 'p50_seconds', 'p90_seconds', 'p99_seconds', 'mean_rows_out']],
+            use_container_width=True
+        )
+        st.download_button("Download JSON", profiler.to_json(),
+                           file_name="dashboard_spans.json", mime="application/json")
+        st.download_button("Download Prometheus", profiler.to_prometheus(),
+                           file_name="dashboard_spans.prom", mime="text/plain")
+        if st.button("Reset timings"):
+            profiler.reset()
+
 def main():
     """Main dashboard application"""
     
@@ -65,38 +188,59 @@ def main():
     st.markdown("### *Investor's Perspective on Vehicle Market Trends*")
     
     with st.spinner("Loading vehicle registration data..."):
-        processor = load_data()
+        processor = load_data(current_data_version())
     
     # Sidebar filters
     st.sidebar.header("📊 Dashboard Filters")
     
     # Date range filter
     st.sidebar.subheader("📅 Date Range")
-    min_date = processor.processed_data['raw_data']['date'].min()
-    max_date = processor.processed_data['raw_data']['date'].max()
+    # Filter options come from rollups and the ends of the date-sorted rows,
+    # so reruns do not scan the raw data
+    filter_options = processor.get_filter_options()
     
-    start_date = st.sidebar.date_input("Start Date", min_date)
-    end_date = st.sidebar.date_input("End Date", max_date)
+    start_date = st.sidebar.date_input("Start Date", filter_options['min_date'])
+    end_date = st.sidebar.date_input("End Date", filter_options['max_date'])
     
     # Vehicle category filter
     st.sidebar.subheader("🚗 Vehicle Category")
-    vehicle_categories = ['All'] + list(processor.processed_data['raw_data']['vehicle_type'].unique())
+    vehicle_categories = ['All'] + filter_options['vehicle_types']
     selected_vehicle_type = st.sidebar.selectbox("Select Vehicle Type", vehicle_categories)
     
     # Manufacturer filter
     st.sidebar.subheader("🏭 Manufacturer")
-    manufacturers = ['All'] + list(processor.processed_data['raw_data']['manufacturer'].unique())
+    manufacturers = ['All'] + filter_options['manufacturers']
     selected_manufacturer = st.sidebar.selectbox("Select Manufacturer", manufacturers)
     
-    # Refresh button
+    # Refresh button; the current data stays up while new data is built
+    worker = refresh_worker()
     if st.sidebar.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
+        worker.request_refresh()
+    refresh_status = worker.status()
+    if refresh_status['refreshing']:
+        st.sidebar.caption("🔄 Refreshing in the background; new data appears on your next interaction.")
+    elif refresh_status['last_error']:
+        st.sidebar.warning(f"Last refresh failed: {refresh_status['last_error']}")
+    elif refresh_status['last_refresh']:
+        st.sidebar.caption(f"Last refreshed at {datetime.fromtimestamp(refresh_status['last_refresh']):%H:%M:%S}")
+    
+    render_performance_panel()
     
     if processor and processor.processed_data:
-        # Calculate growth metrics
-        growth_metrics = processor.calculate_growth_metrics()
-        summary_stats = processor.get_summary_statistics()
+        # Answer every widget's query in one pass over the cube; the
+        # figure builders below then read the cached results
+        trend_period = choose_period(start_date, end_date)
+        growth_metrics, summary_stats, _, _, series_analytics, _ = processor.run_queries([
+            {'query': 'growth_metrics'},
+            {'query': 'summary_statistics'},
+            {'query': 'trend', 'period': trend_period},
+            {'query': 'top_manufacturers', 'limit': 10},
+            {'query': 'series_analytics', 'period': 'monthly', 'window': 3},
+            {'query': 'quarterly_totals'}
+        ])
+        
+        # Rendered figures are cached per data version
+        data_key = (processor.shared_version, processor.data_version)
         
         # Key Metrics Row
         st.subheader("📈 Key Performance Indicators")
@@ -115,9 +259,11 @@ def main():
             yoy_growth = growth_metrics['overall']['yoy']
             yoy_color = "normal" if yoy_growth >= 0 else "inverse"
             st.metric(
-                label="Year-over-Year Growth",
+                label="Year-to-Date Growth (YoY)",
                 value=f"{yoy_growth:.1f}%",
-                delta=f"vs {growth_metrics.get('previous_year', 'Previous Year')}",
+                delta=(f"{growth_metrics.get('current_year', 'Year')} vs "
+                       f"{growth_metrics.get('previous_year', 'Previous Year')}, "
+                       f"first {growth_metrics.get('year_days', '?')} days"),
                 delta_color=yoy_color
             )
         
@@ -125,9 +271,11 @@ def main():
             qoq_growth = growth_metrics['overall']['qoq']
             qoq_color = "normal" if qoq_growth >= 0 else "inverse"
             st.metric(
-                label="Quarter-over-Quarter Growth",
+                label="Quarter-to-Date Growth (QoQ)",
                 value=f"{qoq_growth:.1f}%",
-                delta="vs Previous Quarter",
+                delta=(f"{growth_metrics.get('current_quarter', 'Quarter')} vs "
+                       f"{growth_metrics.get('previous_quarter', 'Previous Quarter')}, "
+                       f"first {growth_metrics.get('quarter_days', '?')} days"),
                 delta_color=qoq_color
             )
         
@@ -159,22 +307,18 @@ def main():
         
         with col2:
             # Vehicle type distribution pie chart
-            vehicle_dist = pd.DataFrame(list(summary_stats['vehicle_type_summary'].items()), 
-                                      columns=['Vehicle Type', 'Registrations'])
-            fig = px.pie(vehicle_dist, values='Registrations', names='Vehicle Type',
-                        title="Vehicle Type Distribution")
+            fig = cached_figure('vehicle_distribution', {}, data_key,
+                                lambda: build_distribution_figure(summary_stats))
             st.plotly_chart(fig, use_container_width=True)
         
         # Trend Analysis
         st.subheader("📊 Registration Trends Over Time")
         
-        # Get trend data
-        trend_data = processor.get_trend_data(period='monthly')
-        
-        fig = px.line(trend_data, x='period', y='registrations',
-                     title="Monthly Vehicle Registration Trends",
-                     labels={'period': 'Month', 'registrations': 'Registrations'})
-        fig.update_layout(height=400)
+        # Aggregate to the finest period the chart width can show
+        fig = cached_figure(
+            'trend', {'period': trend_period, 'start_date': start_date, 'end_date': end_date}, data_key,
+            lambda: build_trend_figure(processor, trend_period, start_date, end_date)
+        )
         st.plotly_chart(fig, use_container_width=True)
         
         # Manufacturer Analysis
@@ -184,13 +328,8 @@ def main():
         
         with col1:
             # Top manufacturers bar chart
-            top_manufacturers = processor.get_top_manufacturers(limit=10)
-            manufacturer_df = pd.DataFrame(list(top_manufacturers.items()), 
-                                         columns=['Manufacturer', 'Registrations'])
-            
-            fig = px.bar(manufacturer_df, x='Manufacturer', y='Registrations',
-                        title="Top 10 Manufacturers by Registrations")
-            fig.update_layout(height=400)
+            fig = cached_figure('top_manufacturers', {'limit': 10}, data_key,
+                                lambda: build_top_manufacturers_figure(processor, limit=10))
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
@@ -206,25 +345,28 @@ def main():
             mfr_growth_df = pd.DataFrame(manufacturer_growth_data)
             st.dataframe(mfr_growth_df, use_container_width=True)
         
+        # Momentum and seasonality of every manufacturer series
+        st.subheader("📉 Manufacturer Momentum & Seasonality")
+        
+        if selected_vehicle_type != 'All':
+            series_analytics = series_analytics[series_analytics['vehicle_type'] == selected_vehicle_type]
+        momentum = series_analytics.nlargest(10, 'percentile_rank').rename(columns={
+            'vehicle_type': 'Vehicle Type',
+            'manufacturer': 'Manufacturer',
+            'latest_registrations': 'Latest Month',
+            'rolling_mean': '3-Month Average',
+            'percentile_rank': 'Percentile',
+            'seasonal_lag': 'Season (months)',
+            'seasonal_strength': 'Seasonality'
+        })
+        st.dataframe(momentum, use_container_width=True, hide_index=True)
+        
         # Quarterly Analysis
         st.subheader("📅 Quarterly Performance Analysis")
         
         # Create quarterly heatmap
-        quarterly_data = processor.processed_data['vehicle_type_totals']
-        quarterly_pivot = quarterly_data.pivot_table(
-            values='registrations', 
-            index='year', 
-            columns='quarter', 
-            aggfunc='sum'
-        ).fillna(0)
-        
-        fig = px.imshow(quarterly_pivot.values,
-                       x=quarterly_pivot.columns,
-                       y=quarterly_pivot.index,
-                       title="Quarterly Performance Heatmap",
-                       labels=dict(x="Quarter", y="Year", color="Registrations"),
-                       color_continuous_scale="Viridis")
-        fig.update_layout(height=400)
+        fig = cached_figure('quarterly_heatmap', {}, data_key,
+                            lambda: build_quarterly_heatmap(processor))
         st.plotly_chart(fig, use_container_width=True)
         
         # Data Export Section
@@ -233,25 +375,28 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            # Export filtered data
-            filtered_data = processor.get_filtered_data(
-                start_date=start_date,
-                end_date=end_date,
-                vehicle_type=selected_vehicle_type,
-                manufacturer=selected_manufacturer
-            )
-            
-            csv_data = filtered_data.to_csv(index=False)
+            # Export filtered data; the query and encoding run only on click
+            export_format = st.selectbox("Export Format", list(EXPORT_FORMATS),
+                                         format_func=lambda fmt: fmt.upper())
+            mime, extension = EXPORT_FORMATS[export_format]
             st.download_button(
-                label="📥 Download Filtered Data (CSV)",
-                data=csv_data,
-                file_name=f"vehicle_data_{start_date}_{end_date}.csv",
-                mime="text/csv"
+                label=f"📥 Download Filtered Data ({export_format.upper()})",
+                data=make_filtered_download(
+                    processor,
+                    fmt=export_format,
+                    start_date=start_date,
+                    end_date=end_date,
+                    vehicle_type=selected_vehicle_type,
+                    manufacturer=selected_manufacturer
+                ),
+                file_name=f"vehicle_data_{start_date}_{end_date}{extension}",
+                mime=mime
             )
         
         with col2:
             # Export summary statistics
-            summary_csv = pd.DataFrame([summary_stats]).to_csv(index=False)
+            with span('app.summary_csv'):
+                summary_csv = pd.DataFrame([summary_stats]).to_csv(index=False)
             st.download_button(
                 label="📊 Download Summary Statistics (CSV)",
                 data=summary_csv,
@@ -0,0 +1,242 @@
+"""
+Benchmark suite for Vehicle Registration Dashboard
+Measures how the scraper, processor and app data paths scale with data size
+
+Usage:
+    python benchmark_dashboard.py                          # default sizes
+    python benchmark_dashboard.py --sizes 10K,1M,100M --manufacturers 5,50,500
+    python benchmark_dashboard.py --save-baseline          # store as baseline
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+
+RESULTS_DIRECTORY = 'benchmarks'
+DEFAULT_SIZES = '10K,100K,1M'
+DEFAULT_MANUFACTURERS = '5,50'
+# Longest generated date span; larger datasets add rows per day instead, as
+# longer spans overflow nanosecond timestamps
+MAX_DAYS = 20 * 365
+
+def parse_counts(text):
+    """Parse a comma-separated list of counts such as '10K,1M,100M'"""
+    multipliers = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000}
+    counts = []
+    for item in text.split(','):
+        item = item.strip().upper()
+        if item[-1] in multipliers:
+            counts.append(int(float(item[:-1]) * multipliers[item[-1]]))
+        else:
+            counts.append(int(item))
+    return counts
+
+def dataset_shape(rows, manufacturers):
+    """Get (days, regions) for generate_bulk_data to produce about `rows` rows
+
+    Returns regions=None (one row per day and manufacturer) while the days
+    fit in MAX_DAYS; beyond that one row per region is generated per day.
+    """
+    slots = 3 * manufacturers
+    days = max(1, math.ceil(rows / slots))
+    if days <= MAX_DAYS:
+        return days, None
+    regions = math.ceil(rows / (slots * MAX_DAYS))
+    return math.ceil(rows / (slots * regions)), regions
+
+def measure(func, repeat=1, allocations=True):
+    """Time a call and record its peak RSS and peak traced allocations
+
+    The wall time is the best of `repeat` untraced runs, and the peak RSS is
+    the highest resident set size of the process during those runs,
+    transient peaks included (see profiler.PeakRSS; None where RSS cannot be
+    read). Allocations are measured in one extra run under tracemalloc so
+    tracing overhead does not distort the timing.
+    """
+    from profiler import PeakRSS
+
+    result = None
+    timings = []
+    with PeakRSS() as rss:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+
+    allocated = None
+    if allocations:
+        tracemalloc.start()
+        func()
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result, {
+        'wall_seconds': min(timings),
+        'rss_peak_bytes': rss.peak_bytes,
+        'allocated_peak_bytes': allocated
+    }
+
+def run_case(rows, manufacturers, repeat, allocations):
+    """Run every benchmark for one dataset size and manufacturer cardinality
+
+    Runs in a fresh process so earlier cases do not affect its memory use.
+    """
+    import pandas as pd
+    from data_scraper import VehicleDataScraper
+    from data_processor import VehicleDataProcessor
+
+    days, regions = dataset_shape(rows, manufacturers)
+    scraper = VehicleDataScraper()
+    results = []
+
+    def record(name, func, repeat=repeat):
+        result, metrics = measure(func, repeat, allocations)
+        metrics.update({'benchmark': name, 'rows': rows, 'manufacturers': manufacturers})
+        results.append(metrics)
+        return result
+
+    data = record('generate_bulk_data', lambda: scraper.generate_bulk_data(
+        days=days, manufacturers_per_type=manufacturers, regions=regions,
+        per_region=regions is not None, seed=0
+    ))
+
+    def process():
+        processor = VehicleDataProcessor(data)
+        processor.process_data()
+        return processor
+
+    processor = record('process_data', process)
+
+    def process_serial():
+        VehicleDataProcessor(data).process_data(workers=1)
+
+    record('process_data[serial]', process_serial)
+
+    # Each query clears the result cache first so every run does the work
+    def uncached(query):
+        def call():
+            processor.query_cache.clear()
+            return query()
+        return call
+
+    raw_data = processor.processed_data['raw_data']
+    end_date = raw_data['date'].max()
+    start_date = end_date - pd.Timedelta(days=90)
+    manufacturer = raw_data['manufacturer'].iloc[0]
+
+    record('calculate_growth_metrics', uncached(processor.calculate_growth_metrics))
+    record('get_filtered_data', uncached(lambda: processor.get_filtered_data(
+        start_date=start_date, end_date=end_date, vehicle_type='2W', manufacturer=manufacturer
+    )))
+    record('get_trend_data[monthly]', uncached(lambda: processor.get_trend_data(period='monthly')))
+    record('get_trend_data[daily]', uncached(lambda: processor.get_trend_data(period='daily')))
+
+    return results
+
+def run_sample_generation(repeat, allocations):
+    """Benchmark generate_sample_data, which only produces its fixed default size"""
+    from data_scraper import VehicleDataScraper
+
+    scraper = VehicleDataScraper()
+    data, metrics = measure(scraper.generate_sample_data, repeat, allocations)
+    metrics.update({'benchmark': 'generate_sample_data', 'rows': len(data), 'manufacturers': None})
+    return [metrics]
+
+def run_isolated(func, *args):
+    """Run a benchmark function in a fresh spawned process"""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(func, args)
+
+def result_key(result):
+    """Identify a result for baseline comparison"""
+    return (result['benchmark'], result['rows'], result['manufacturers'])
+
+def compare_to_baseline(results, baseline, threshold):
+    """Flag results that are slower, allocate more or peak higher in RSS than the baseline"""
+    baseline_results = {result_key(r): r for r in baseline.get('results', [])}
+    regressions = []
+
+    for result in results:
+        previous = baseline_results.get(result_key(result))
+        if previous is None:
+            continue
+        for metric in ['wall_seconds', 'allocated_peak_bytes', 'rss_peak_bytes']:
+            old, new = previous.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            result[f'{metric}_vs_baseline'] = ratio
+            if ratio > 1 + threshold:
+                regressions.append((result, metric, ratio))
+
+    return regressions
+
+def main():
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Dataset sizes in rows')
+    parser.add_argument('--manufacturers', default=DEFAULT_MANUFACTURERS,
+                        help='Manufacturers per vehicle type')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark')
+    parser.add_argument('--no-allocations', action='store_true', help='Skip allocation tracing')
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIRECTORY, 'results.json'))
+    parser.add_argument('--baseline', default=os.path.join(RESULTS_DIRECTORY, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='Store results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown or growth before a result is flagged (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    allocations = not args.no_allocations
+    print("🚗 Vehicle Registration Dashboard - Benchmarks")
+    print("=" * 60)
+
+    results = run_isolated(run_sample_generation, args.repeat, allocations)
+    for rows in parse_counts(args.sizes):
+        for manufacturers in parse_counts(args.manufacturers):
+            print(f"\n⏱️  Running: {rows:,} rows, {manufacturers} manufacturers per type")
+            case_results = run_isolated(run_case, rows, manufacturers, args.repeat, allocations)
+            for result in case_results:
+                rss_peak = result['rss_peak_bytes']
+                rss_text = f"{rss_peak / 1e6:>9.1f} MB" if rss_peak is not None else 'n/a'
+                print(f"   - {result['benchmark']:<28} {result['wall_seconds']:>10.4f}s peak RSS {rss_text}")
+            results.extend(case_results)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.threshold)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    output = args.baseline if args.save_baseline else args.output
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print(f"📊 Results written to {output}")
+
+    if regressions:
+        print(f"⚠️  {len(regressions)} regression(s) against {args.baseline}:")
+        for result, metric, ratio in regressions:
+            print(f"   - {result['benchmark']} ({result['rows']:,} rows, "
+                  f"{result['manufacturers']} manufacturers): {metric} x{ratio:.2f}")
+        return False
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,155 @@
+"""
+Chart Data Layer for Vehicle Registration Dashboard
+Downsamples and pre-aggregates series for Plotly and caches rendered figures
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import CHART_CONFIG
+from query_cache import QueryCache, estimate_size, normalize_argument
+
+# Trend periods the processor can aggregate to, finest first, with their
+# approximate length in days
+TREND_PERIODS = [('daily', 1), ('weekly', 7), ('monthly', 30.44), ('quarterly', 91.31), ('yearly', 365.25)]
+
+# Rendered figures shared by all sessions, keyed by (chart, filters, data version)
+figure_cache = QueryCache(
+    max_bytes=CHART_CONFIG['figure_cache_bytes'], ttl_seconds=CHART_CONFIG['figure_cache_ttl_seconds']
+)
+
+def lttb_indices(x, y, threshold):
+    """Select threshold points of a series with Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, so peaks and troughs survive.
+
+    Returns:
+        Sorted positions of the kept points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_stop = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_stop = n - 1, n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+def min_max_indices(y, buckets):
+    """Keep the minimum and maximum of each of `buckets` equal-width buckets
+
+    Returns:
+        Sorted positions of the kept points, including the first and last
+    """
+    n = len(y)
+    if 2 * buckets + 2 >= n:
+        return np.arange(n)
+    y = np.asarray(y)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    selected = [0, n - 1]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop > start:
+            selected.append(start + int(y[start:stop].argmin()))
+            selected.append(start + int(y[start:stop].argmax()))
+    return np.unique(selected)
+
+def downsample(data, x, y, max_points=None, method=None, group=None):
+    """Reduce each series of a long-format frame to about max_points points
+
+    Args:
+        data: DataFrame sorted by x within each series
+        x, y: Column names of the x and y values
+        max_points: Points per series (default: CHART_CONFIG['max_points'],
+            roughly the chart's pixel width)
+        method: 'lttb' or 'minmax' (default: CHART_CONFIG['downsample_method'])
+        group: Optional column separating series (e.g. one line per manufacturer)
+    """
+    max_points = max_points or CHART_CONFIG['max_points']
+    method = method or CHART_CONFIG['downsample_method']
+    if method not in ('lttb', 'minmax'):
+        raise ValueError(f"Unsupported downsample method: {method}")
+
+    def select(series):
+        if len(series) <= max_points:
+            return np.arange(len(series))
+        if method == 'lttb':
+            xs = series[x]
+            if not pd.api.types.is_numeric_dtype(xs):
+                xs = plot_x(xs).to_numpy().view(np.int64)
+            return lttb_indices(xs, series[y], max_points)
+        return min_max_indices(series[y].to_numpy(), max_points // 2)
+
+    if group is None:
+        return data.iloc[select(data)]
+    parts = [series.iloc[select(series)] for _, series in data.groupby(group, observed=True, sort=False)]
+    return pd.concat(parts) if parts else data
+
+def choose_period(start_date, end_date, max_points=None):
+    """Get the finest trend period that fits the date range in max_points points
+
+    Aggregating further would hide shape that the chart can still draw;
+    aggregating less would send points the chart cannot show.
+    """
+    max_points = max_points or CHART_CONFIG['max_points']
+    days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    for period, period_days in TREND_PERIODS:
+        if days / period_days <= max_points:
+            return period
+    return TREND_PERIODS[-1][0]
+
+def plot_x(values):
+    """Convert period or date values to datetimes Plotly can serialize"""
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.PeriodDtype):
+        return values.dt.to_timestamp()
+    return pd.to_datetime(values)
+
+def figure_size(figure):
+    """Estimate the memory held by a figure's trace data in bytes"""
+    size = 0
+    for trace in figure.data:
+        for attribute in ('x', 'y', 'z', 'values', 'labels'):
+            values = getattr(trace, attribute, None)
+            if values is not None:
+                size += estimate_size(np.asarray(values))
+    return size
+
+def cached_figure(chart, filters, data_version, build):
+    """Get a rendered figure from the figure cache, building it on a miss
+
+    Args:
+        chart: Chart name
+        filters: Dict of the selections the figure depends on
+        data_version: Version of the data the figure was built from, e.g.
+            (processor.shared_version, processor.data_version)
+        build: Zero-argument callable returning the figure
+
+    Cached figures are shared between sessions and must not be modified.
+    """
+    key = (chart, tuple((name, normalize_argument(value)) for name, value in sorted(filters.items())),
+           data_version)
+    found, figure = figure_cache.get(key)
+    if not found:
+        figure = build()
+        figure_cache.set(key, figure, size=figure_size(figure))
+    return figure
@@ -2,6 +2,8 @@
 Configuration file for Vehicle Registration Dashboard
 """
 
+import os
+
 # Dashboard Configuration
 DASHBOARD_CONFIG = {
     'title': 'Vehicle Registration Dashboard',
@@ -14,7 +16,97 @@ DASHBOARD_CONFIG = {
 DATA_CONFIG = {
     'sample_data_years': 3,
     'default_vehicle_types': ['2W', '3W', '4W'],
-    'default_regions': ['North', 'South', 'East', 'West', 'Central']
+    'default_regions': ['North', 'South', 'East', 'West', 'Central'],
+    'fiscal_year_start_month': 4  # Indian fiscal year runs April-March
+}
+
+# State to region mapping for state-level registration data
+STATE_REGIONS = {
+    'DL': 'North', 'HR': 'North', 'PB': 'North', 'UP': 'North', 'UK': 'North',
+    'HP': 'North', 'JK': 'North', 'RJ': 'North',
+    'KA': 'South', 'TN': 'South', 'KL': 'South', 'AP': 'South', 'TG': 'South',
+    'WB': 'East', 'OR': 'East', 'BR': 'East', 'JH': 'East', 'AS': 'East',
+    'MH': 'West', 'GJ': 'West', 'GA': 'West',
+    'MP': 'Central', 'CG': 'Central'
+}
+
+# Registration Fetch Configuration
+FETCH_CONFIG = {
+    'base_url': 'http://127.0.0.1:8765',
+    'max_workers': 16,
+    'requests_per_second': 10,
+    'retries': 3,
+    'backoff_seconds': 0.5,
+    'timeout_seconds': 30,
+    'checkpoint_dir': 'data/raw/vahan'
+}
+
+# Raw File Ingestion Configuration
+INGEST_CONFIG = {
+    'directory': 'data/raw',
+    'patterns': ['**/*.csv', '**/*.xlsx', '**/*.json'],
+    'workers': None,  # None uses every CPU core
+    'files_per_task': 4,
+    'csv_block_bytes': 4 * 1024 * 1024  # CSV text parsed per streamed block
+}
+
+# Parallel Processing Configuration
+PROCESSING_CONFIG = {
+    'workers': None,  # None uses every CPU core
+    'parallel_min_rows': 2_000_000,
+    'partitions_per_worker': 4
+}
+
+# Query Cache Configuration
+CACHE_CONFIG = {
+    'max_bytes': 256 * 1024 * 1024,
+    'ttl_seconds': 600
+}
+
+# Profiler Configuration (set DASHBOARD_PROFILE=1 to record from startup)
+PROFILER_CONFIG = {
+    'enabled': os.environ.get('DASHBOARD_PROFILE') == '1',
+    'max_samples': 1000,
+    'track_memory': True
+}
+
+# Shared Dataset Store Configuration
+SHARED_STORE_CONFIG = {
+    'root': 'data/processed/shared',
+    'keep_versions': 2
+}
+
+# Background Refresh Configuration
+REFRESH_CONFIG = {
+    'interval_seconds': None,  # e.g. 3600 for hourly refreshes; None disables them
+    'poll_seconds': 5  # how often to look for versions published elsewhere
+}
+
+# Persistent Aggregate Cache Configuration
+DISK_CACHE_CONFIG = {
+    'root': 'data/processed/cache',
+    'max_bytes': 512 * 1024 * 1024
+}
+
+# Headless Query Service Configuration
+QUERY_SERVICE_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8770,
+    'gzip_min_bytes': 1024,  # smaller bodies are sent uncompressed
+    'gzip_level': 5,
+    'response_cache_bytes': 64 * 1024 * 1024,
+    'max_samples': 1000  # latency samples kept per endpoint
+}
+
+# SQL Query Backend Configuration
+SQL_BACKEND_CONFIG = {
+    'path': 'data/processed/registrations.sqlite',
+    'chunk_rows': 100_000
+}
+
+# Data Export Configuration
+EXPORT_CONFIG = {
+    'chunk_rows': 100_000
 }
 
 # Chart Configuration
@@ -24,5 +116,9 @@ CHART_CONFIG = {
         '3W': '#ff7f0e',
         '4W': '#2ca02c'
     },
-    'chart_height': 500
+    'chart_height': 500,
+    'max_points': 1000,  # points per series, about a chart's pixel width
+    'downsample_method': 'lttb',  # 'lttb' or 'minmax'
+    'figure_cache_bytes': 64 * 1024 * 1024,
+    'figure_cache_ttl_seconds': 600
 }
\ No newline at end of file
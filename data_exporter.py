@@ -0,0 +1,134 @@
+"""
+Data Exporter for Vehicle Registration Dashboard
+Streams query results to CSV, gzip-compressed CSV or Parquet in row chunks
+"""
+
+import io
+import zlib
+
+from config import EXPORT_CONFIG
+from profiler import profiled
+
+# Export format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'csv.gz': ('application/gzip', '.csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet')
+}
+
+class _ByteSink:
+    """Writable file-like object that hands written bytes back in pieces"""
+
+    def __init__(self):
+        self.pieces = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.pieces.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        """Get the bytes written since the last drain"""
+        data = b''.join(self.pieces)
+        self.pieces = []
+        return data
+
+def iter_export(data, fmt='csv', chunk_rows=None):
+    """Yield the encoded export of a DataFrame one row chunk at a time
+
+    Only one chunk is encoded at a time, so memory used by the encoder is
+    bounded by chunk_rows rather than by the size of the result.
+
+    Args:
+        data: DataFrame to export
+        fmt: One of EXPORT_FORMATS ('csv', 'csv.gz' or 'parquet')
+        chunk_rows: Rows per chunk / Parquet row group
+    """
+    chunk_rows = chunk_rows or EXPORT_CONFIG['chunk_rows']
+    yield from iter_export_chunks(
+        (data.iloc[start:start + chunk_rows] for start in range(0, max(len(data), 1), chunk_rows)), fmt
+    )
+
+def iter_export_chunks(chunks, fmt='csv'):
+    """Yield the encoded export of an iterable of DataFrame chunks
+
+    Chunks are encoded as they are read, so a generator of chunks (e.g.
+    VehicleDataProcessor.iter_filtered_data) is exported without ever
+    holding the whole result. Every chunk must have the first one's columns.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if fmt == 'parquet':
+        yield from _iter_parquet(chunks)
+        return
+
+    # gzip container via zlib (wbits=31) so chunks compress incrementally
+    compressor = zlib.compressobj(wbits=31) if fmt == 'csv.gz' else None
+    for number, chunk in enumerate(chunks):
+        encoded = chunk.to_csv(index=False, header=number == 0).encode('utf-8')
+        if compressor is not None:
+            encoded = compressor.compress(encoded)
+        if encoded:
+            yield encoded
+    if compressor is not None:
+        yield compressor.flush()
+
+def _iter_parquet(chunks):
+    """Yield a Parquet file written one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink, writer, schema = _ByteSink(), None, None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk.iloc[:0], preserve_index=False)
+                writer = pq.ParquetWriter(sink, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+@profiled('exporter.export_to_file')
+def export_to_file(data, fileobj, fmt='csv', chunk_rows=None):
+    """Write a chunked export to a binary file object, returning bytes written"""
+    written = 0
+    for piece in iter_export(data, fmt, chunk_rows):
+        fileobj.write(piece)
+        written += len(piece)
+    return written
+
+def make_filtered_download(processor, fmt='csv', chunk_rows=None, **filters):
+    """Build a callable that exports filtered data only when it is invoked
+
+    Intended for st.download_button(data=...): the filter query and the
+    export run when the user clicks the button, not on every rerun. The
+    filtered rows are read and encoded chunk_rows at a time (see
+    VehicleDataProcessor.iter_filtered_data) into a BytesIO, one of the
+    types download_button accepts, so only the encoded file is held whole.
+    """
+    chunk_rows = chunk_rows or EXPORT_CONFIG['chunk_rows']
+
+    def export():
+        buffer = io.BytesIO()
+        for piece in iter_export_chunks(processor.iter_filtered_data(chunk_rows=chunk_rows, **filters), fmt):
+            buffer.write(piece)
+        buffer.seek(0)
+        return buffer
+
+    return export
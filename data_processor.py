@@ -3,146 +3,1257 @@ Data Processor for Vehicle Registration Dashboard
 Handles data analysis, growth calculations, and data preparation
 """
 
+import os
+import inspect
+import functools
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from utils import (
-    calculate_growth, calculate_yoy_growth, calculate_qoq_growth,
-    get_quarter_from_date, format_number, get_color_for_growth
-)
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from config import CACHE_CONFIG, PROCESSING_CONFIG
+from query_cache import QueryCache, cached_query
+from lazy_tables import LazyTables
+from disk_cache import DiskCache, code_version, combine_hashes, partition_hashes
+from profiler import profiled
+from shared_store import SharedStore
+from sql_backend import SQLiteBackend
+from analytics import series_analytics
+from periods import PERIOD_COLUMNS, add_period_keys, dense_totals, period_label, period_start, rolling_totals
+from utils import calculate_growth_array, iter_data_chunks, load_data
+
+# Dimensions of the aggregation cube, from finest time grain to region
+CUBE_DIMENSIONS = ['date', 'vehicle_type', 'manufacturer', 'region']
+
+# Columns stored per cube row; time attributes are derived from the date
+CUBE_COLUMNS = CUBE_DIMENSIONS + ['registrations']
+
+# Time columns derived from the date rather than stored per raw row
+DERIVED_COLUMNS = {'year', 'month', 'quarter', 'month_name'}
+
+# Processed totals tables and the cube keys each one is grouped by
+TIME_KEYS = ['date', 'year', 'month', 'quarter']
+TOTALS_TABLES = {
+    'daily_totals': TIME_KEYS,
+    'vehicle_type_totals': TIME_KEYS + ['vehicle_type'],
+    'manufacturer_totals': TIME_KEYS + ['vehicle_type', 'manufacturer']
+}
+
+# Raw data columns indexed by categorical code for equality filters
+INDEXED_COLUMNS = ['vehicle_type', 'manufacturer']
+
+# Time grains a batch can roll the cube up to, coarsest first, and the
+# time columns each one determines (see _prefetch_rollups)
+_MONTH_COLUMNS = {'year', 'month', 'quarter', 'month_key', 'quarter_key', 'fiscal_year_key'}
+TIME_GRAINS = [
+    ('year', {'year'}),
+    ('quarter_key', {'year', 'quarter', 'quarter_key'}),
+    ('fiscal_year_key', {'fiscal_year_key'}),
+    ('month_key', _MONTH_COLUMNS),
+    ('week_key', {'week_key'}),
+    ('date', _MONTH_COLUMNS | {'date', 'week_key'})
+]
+GRAIN_PERIODS = {column: period for period, column in PERIOD_COLUMNS.items()}
+
+# Widget queries run_queries accepts and the processor method answering each
+BATCH_QUERIES = {
+    'growth_metrics': 'calculate_growth_metrics',
+    'growth_table': 'get_growth_table',
+    'summary_statistics': 'get_summary_statistics',
+    'trend': 'get_trend_data',
+    'top_manufacturers': 'get_top_manufacturers',
+    'series_analytics': 'get_series_analytics',
+    'quarterly_totals': 'get_quarterly_totals',
+    'filtered_data': 'get_filtered_data',
+    'filter_options': 'get_filter_options'
+}
+
+# Version of the code computing the aggregates; part of every disk cache key
+CODE_VERSION = code_version([__name__, 'periods', 'utils'])
 
 class VehicleDataProcessor:
     def __init__(self, data):
         self.raw_data = data
         self.processed_data = None
         self.summary_stats = None
+        self.growth_metrics = None
+        self.cube = None
+        self._rollups = {}
+        self._period_to_date_totals = {}
+        self._source = None
+        self.data_version = 0
+        self.shared_version = None
+        self.backend = None
+        self.disk_cache = None
+        self.content_hash = None
+        self.query_cache = QueryCache(**CACHE_CONFIG)
+
+    @classmethod
+    @profiled('processor.from_shared_store')
+    def from_shared_store(cls, store=None, version=None):
+        """Open a processor over a published shared store version
+        
+        raw_data, the cube and the row index are memory-mapped from the
+        store's Arrow files rather than copied, so every session and process
+        on the host reads the same pages. A cube published as a view of the
+        raw rows is a view of the mapped rows again. Only the small totals
+        tables are built in memory, when first read.
+        
+        Args:
+            store: SharedStore to read (default: SHARED_STORE_CONFIG root)
+            version: Version name (default: the current version)
+        """
+        store = store or SharedStore()
+        version, tables, metadata = store.open(version)
+        
+        raw_data = tables['raw_data'].to_pandas(split_blocks=True) if 'raw_data' in tables else None
+        processor = cls(raw_data)
+        processor.processed_data = processor._processed_tables(raw_data)
+        if metadata.get('cube_is_rows'):
+            processor.cube = processor._cube_view(raw_data)
+        else:
+            # Versions published with stored time attributes keep only the cube columns
+            processor.cube = tables['cube'].select(CUBE_COLUMNS).to_pandas(split_blocks=True)
+        if raw_data is not None:
+            row_index = {'dates': raw_data['date'].to_numpy()}
+            for column in INDEXED_COLUMNS:
+                row_index[column] = {
+                    'categories': raw_data[column].cat.categories,
+                    'order': tables['row_index'][column].to_numpy(),
+                    'offsets': np.asarray(metadata['row_index_offsets'][column])
+                }
+            processor.processed_data['row_index'] = row_index
+        processor._refresh_tables()
+        processor._bump_data_version()
+        processor.shared_version = version
+        processor.content_hash = metadata.get('content_hash')
+        return processor
+
+    @classmethod
+    @profiled('processor.from_sql_backend')
+    def from_sql_backend(cls, backend):
+        """Open a processor over a loaded SQL backend without reading raw rows
+        
+        Neither raw rows nor the daily cube are read into memory. Filtered
+        data, summary statistics, top manufacturers and trends are answered
+        by indexed SQL, and the rollups, quarter-to-date totals and totals
+        tables are SQL GROUP BY queries on the backend's cube (see
+        _backend_rollup), so the full history never has to fit in pandas.
+        """
+        processor = cls(None)
+        processor.backend = backend
+        processor.processed_data = processor._processed_tables(None)
+        processor._refresh_tables()
+        processor._bump_data_version()
+        return processor
 
-    def process_data(self):
-        """Process raw data for dashboard analysis"""
+    def use_sql_backend(self, backend=None):
+        """Load the processed rows into a SQL backend and answer queries from it
+        
+        Args:
+            backend: SQLiteBackend to load (default: the file database at
+                SQL_BACKEND_CONFIG['path'])
+        """
+        if not self.processed_data:
+            self.process_data()
+        backend = backend or SQLiteBackend()
+        if self.raw_data is not None:
+            backend.load_frame(self.raw_data)
+        self.backend = backend
+        self._bump_data_version()
+        return backend
+
+    def use_disk_cache(self, cache=None):
+        """Persist the cube and derived tables in an on-disk cache
+        
+        Entries are keyed by a content hash of the input rows (per month
+        partition for the cube) and the processor code version, so they
+        survive restarts and are only recomputed when their inputs or the
+        code change.
+        
+        Args:
+            cache: DiskCache to use (default: DISK_CACHE_CONFIG root)
+        """
+        self.disk_cache = cache or DiskCache()
+        return self.disk_cache
+
+    @profiled('processor.publish_to_shared_store')
+    def publish_to_shared_store(self, store=None):
+        """Publish the processed data as a new shared store version
+        
+        Returns:
+            The new version name
+        """
+        if self.cube is None:
+            raise ValueError("Process data before publishing it")
+        store = store or SharedStore()
+        
+        metadata = {'content_hash': self.content_hash} if self.content_hash else {}
+        # A cube viewing the raw rows is not written twice
+        if self._cube_is_rows():
+            tables = {}
+            metadata['cube_is_rows'] = True
+        else:
+            tables = {'cube': self.cube}
+        if self.raw_data is not None:
+            row_index = self.processed_data['row_index']
+            tables['raw_data'] = self.raw_data
+            tables['row_index'] = pd.DataFrame({
+                column: row_index[column]['order'] for column in INDEXED_COLUMNS
+            })
+            metadata['row_index_offsets'] = {
+                column: row_index[column]['offsets'].tolist() for column in INDEXED_COLUMNS
+            }
+        
+        self.shared_version = store.publish(tables, metadata)
+        return self.shared_version
+
+    @profiled('processor.process_data')
+    def process_data(self, workers=None):
+        """Process raw data for dashboard analysis
+        
+        Only the cube is built here; the totals tables and the row index
+        are built the first time a query or view reads them. When no two
+        raw rows share a cube key, the rows are sorted by key and the cube
+        is a view of them rather than a second copy.
+        
+        Args:
+            workers: Worker processes for building the cube (default:
+                PROCESSING_CONFIG['workers'], i.e. every core). Inputs
+                smaller than PROCESSING_CONFIG['parallel_min_rows'] or a
+                single worker are processed serially.
+        """
         if self.raw_data is None or self.raw_data.empty:
             return None
             
-        # Convert date column to datetime
-        df = self.raw_data.copy()
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Add quarter and month name
-        df['quarter'] = df['date'].dt.quarter.apply(lambda x: f'Q{x}')
-        df['month_name'] = df['date'].dt.strftime('%B')
-        
-        # Calculate daily totals
-        daily_totals = df.groupby(['date', 'year', 'month', 'quarter']).agg({
-            'registrations': 'sum'
-        }).reset_index()
-        
-        # Calculate vehicle type totals
-        vehicle_type_totals = df.groupby(['date', 'year', 'month', 'quarter', 'vehicle_type']).agg({
-            'registrations': 'sum'
-        }).reset_index()
-        
-        # Calculate manufacturer totals
-        manufacturer_totals = df.groupby(['date', 'year', 'month', 'quarter', 'vehicle_type', 'manufacturer']).agg({
-            'registrations': 'sum'
-        }).reset_index()
-        
-        self.processed_data = {
-            'daily_totals': daily_totals,
-            'vehicle_type_totals': vehicle_type_totals,
-            'manufacturer_totals': manufacturer_totals,
-            'raw_data': df
-        }
+        df = self._prepare_raw(self.raw_data)
+        
+        # Rows that are already one per cube key are the cube rows once
+        # sorted by key, so the cube is kept as a view of them
+        rows = self._sort_as_cube(df)
+        if rows is not None:
+            df = rows
+            self.cube = self._cube_view(df)
+            self.content_hash = self._content_hash(self._partition_hashes(df)) if self.disk_cache is not None else None
+        else:
+            # Keep rows sorted by date for the date index
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date', kind='stable', ignore_index=True)
+            
+            # Build the aggregation cube in a single pass over the raw rows;
+            # with a disk cache, only months whose rows changed are aggregated
+            workers = workers or PROCESSING_CONFIG['workers'] or os.cpu_count() or 1
+            if self.disk_cache is not None:
+                self.cube = self._build_cube_cached(df, workers)
+            else:
+                self.cube = self._aggregate(df, workers)
+                self.content_hash = None
+        self._rollups = {}
+        self._period_to_date_totals = {}
+        
+        # The compact frame replaces the source frame
+        self.raw_data = df
+        self.processed_data = self._processed_tables(df)
+        self._refresh_tables()
+        self._bump_data_version()
         
         return self.processed_data
 
-    def calculate_growth_metrics(self):
-        """Calculate YoY and QoQ growth metrics"""
-        if not self.processed_data:
-            self.process_data()
+    @profiled('processor.process_stream')
+    def process_stream(self, chunks):
+        """Process data arriving as an iterable of DataFrame chunks
+        
+        Each chunk is folded into the aggregation cube and then released, so
+        peak memory is bounded by one chunk plus the aggregates. raw_data is
+        not kept; every aggregate query gives the same result as
+        process_data on the concatenated chunks.
+        """
+        dtypes = {}
+        cube = None
+        pending = []
+        pending_rows = 0
+        
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            compact = self._prepare_raw(chunk)
+            self._unify_categories(compact, dtypes)
+            partial = self._build_cube(compact)
+            pending.append(partial)
+            pending_rows += len(partial)
             
+            # Re-aggregate once pending partials outgrow the folded cube
+            if pending_rows > (0 if cube is None else len(cube)):
+                cube = self._fold_cubes(cube, pending)
+                pending, pending_rows = [], 0
+        
+        if pending:
+            cube = self._fold_cubes(cube, pending)
+        if cube is None:
+            return None
+        
+        self.raw_data = None
+        self.cube = cube
+        self._rollups = {}
+        self._period_to_date_totals = {}
+        self.processed_data = self._processed_tables(None)
+        self._refresh_tables()
+        self._bump_data_version()
+        
+        return self.processed_data
+
+    def process_files(self, filename, directory='data/processed', chunk_rows=1_000_000):
+        """Process a data file or partitioned dataset chunk by chunk
+        
+        Filtered data queries are answered by reading the matching rows
+        back from the file.
+        """
+        result = self.process_stream(iter_data_chunks(filename, directory, chunk_rows))
+        self._source = (filename, directory)
+        return result
+
+    def _unify_categories(self, df, dtypes):
+        """Cast chunk categoricals to shared dtypes, extending them with new values"""
+        for column in CUBE_DIMENSIONS[1:]:
+            dtype = dtypes.get(column)
+            categories = df[column].cat.categories
+            if dtype is None:
+                dtype = df[column].dtype
+            elif not categories.isin(dtype.categories).all():
+                dtype = pd.CategoricalDtype(
+                    dtype.categories.append(categories[~categories.isin(dtype.categories)])
+                )
+            dtypes[column] = dtype
+            df[column] = df[column].astype(dtype)
+
+    def _fold_cubes(self, cube, partials):
+        """Combine partial cubes into one, summing rows with the same key"""
+        frames = ([] if cube is None else [cube]) + partials
+        
+        # The last partial has the most complete categories; recast the rest
+        for column in CUBE_DIMENSIONS[1:]:
+            dtype = frames[-1][column].dtype
+            for frame in frames[:-1]:
+                frame[column] = frame[column].astype(dtype)
+        combined = pd.concat(frames, ignore_index=True)
+        return _sum_registrations(combined, [combined[column] for column in CUBE_DIMENSIONS]).reset_index()
+
+    @profiled('processor.apply_updates')
+    def apply_updates(self, new_data):
+        """Apply a batch of new or corrected rows incrementally
+        
+        Rows are keyed by (date, vehicle_type, manufacturer, region); a batch
+        row replaces the stored row with the same key and is appended
+        otherwise. Only the cube slices of the dates present in the batch are
+        rebuilt. The merged rows of each affected date are spliced into the
+        date-sorted raw rows and cube (appended when the batch starts after
+        the last stored date) rather than re-sorting either, and a row index
+        that was already built has its positions patched. Stored rollups
+        are updated by the delta between the old and new slices, and
+        summary statistics and growth metrics that were already computed
+        are refreshed from the updated rollups.
+        """
+        if not self.processed_data:
+            self.raw_data = pd.concat([self.raw_data, new_data], ignore_index=True)
+            return self.process_data()
+        if new_data is None or new_data.empty:
+            return self.processed_data
+        if self.processed_data['raw_data'] is None:
+            raise ValueError("Incremental updates need in-memory raw data; reprocess the source files")
+        
         df = self.processed_data['raw_data']
+        batch = self._prepare_raw(new_data)
+        categories_added = self._align_categories(df, batch)
         
-        # Get current and previous periods
-        current_year = df['year'].max()
-        previous_year = current_year - 1
-        current_quarter = df['quarter'].iloc[-1]
-        previous_quarter = self._get_previous_quarter(current_quarter)
+        # Merge the batch into the raw rows of the affected dates
+        affected_dates = np.unique(batch['date'].to_numpy())
+        starts, stops = self._date_runs(df['date'].to_numpy(), affected_dates)
+        merged = pd.concat([df.iloc[self._run_positions(starts, stops)], batch], ignore_index=True)
+        merged = merged.drop_duplicates(subset=CUBE_DIMENSIONS, keep='last')
+        if self.backend is not None:
+            self.backend.replace_dates(affected_dates, merged)
+        # Merged rows are one per key, so a cube viewing the raw rows stays
+        # one while every key is complete
+        cube_is_rows = self._cube_is_rows() and merged[CUBE_DIMENSIONS].notna().all().all()
+        merged = merged.sort_values(CUBE_DIMENSIONS if cube_is_rows else 'date', kind='stable', ignore_index=True)
+        row_index = self.processed_data['row_index'] if self.processed_data.is_built('row_index') else None
+        df = self._splice_dates(df, affected_dates, merged)
         
-        # Calculate overall growth
-        overall_growth = {
-            'yoy': self._calculate_yoy_growth(df, current_year, previous_year),
-            'qoq': self._calculate_qoq_growth(df, current_quarter, previous_quarter)
-        }
+        # Rebuild the cube slices of the affected dates only
+        cube_starts, cube_stops = self._date_runs(self.cube['date'].to_numpy(), affected_dates)
+        old_slice = self.cube.iloc[self._run_positions(cube_starts, cube_stops)]
+        new_slice = self._build_cube(merged)
+        if cube_is_rows:
+            self.cube = self._cube_view(df)
+        else:
+            self.cube = self._splice_dates(self.cube, affected_dates, new_slice)
         
-        # Calculate vehicle type growth
-        vehicle_type_growth = {}
-        for vehicle_type in df['vehicle_type'].unique():
-            vehicle_data = df[df['vehicle_type'] == vehicle_type]
-            vehicle_type_growth[vehicle_type] = {
-                'yoy': self._calculate_yoy_growth(vehicle_data, current_year, previous_year),
-                'qoq': self._calculate_qoq_growth(vehicle_data, current_quarter, previous_quarter)
+        # Rollups are rebuilt from the cube when new categories appeared;
+        # otherwise dated rollups are spliced and the others updated by delta
+        if categories_added:
+            self._rollups = {}
+        # Period-to-date windows move with the data, so they are regrouped
+        self._period_to_date_totals = {}
+        delta = pd.concat([
+            new_slice, old_slice.assign(registrations=-old_slice['registrations'])
+        ], ignore_index=True)
+        for keys, totals in self._rollups.items():
+            if 'date' in keys:
+                dates = totals.index.get_level_values('date')
+                fresh = _sum_registrations(new_slice, self._cube_keys(new_slice, keys))
+                totals = pd.concat([totals[~dates.isin(affected_dates)], fresh])
+            else:
+                totals = pd.concat([totals, _sum_registrations(delta, self._cube_keys(delta, keys))])
+            self._rollups[keys] = totals.groupby(
+                level=list(range(len(keys))), observed=True, sort=True
+            ).sum().rename_axis(list(keys))
+        
+        self.raw_data = df
+        self.processed_data['raw_data'] = df
+        if row_index is not None:
+            self.processed_data['row_index'] = self._patch_row_index(row_index, df, affected_dates, starts, stops, merged)
+        self.content_hash = self._content_hash(self._partition_hashes(df)) if self.disk_cache is not None else None
+        if categories_added:
+            self._refresh_tables()
+        else:
+            self._refresh_tables(affected_dates, new_slice)
+        self._bump_data_version()
+        if self.summary_stats is not None:
+            self.get_summary_statistics()
+        if self.growth_metrics is not None:
+            self.calculate_growth_metrics()
+        
+        return self.processed_data
+
+    def _bump_data_version(self):
+        """Mark the data as changed so cached query results are not reused"""
+        self.data_version += 1
+        self.query_cache.clear()
+
+    @profiled('processor.prepare_raw')
+    def _prepare_raw(self, data):
+        """Convert raw rows to a compact, typed frame
+        
+        Dates become datetime64 and the cube dimensions categoricals.
+        Year, month and quarter are not stored; they are derived from the
+        date where needed. The input frame is not copied or modified.
+        """
+        columns = {'date': self._parse_dates(data['date'])}
+        for column in CUBE_DIMENSIONS[1:]:
+            columns[column] = self._as_category(data[column])
+        columns['registrations'] = self._narrow_integers(data['registrations'])
+        
+        # Keep any extra source columns (e.g. state) as they are
+        for column in data.columns:
+            if column not in columns and column not in DERIVED_COLUMNS:
+                columns[column] = data[column]
+        return pd.DataFrame(columns, index=data.index)
+
+    def _narrow_integers(self, values):
+        """Store counts as int32 when they fit, otherwise int64"""
+        values = values.to_numpy()
+        if len(values) and np.iinfo(np.int32).min <= values.min() and values.max() <= np.iinfo(np.int32).max:
+            return values.astype(np.int32, copy=False)
+        return values.astype(np.int64, copy=False)
+
+    def _quarter_column(self, dates):
+        """Derive 'Q1'-'Q4' labels from dates as a categorical"""
+        return _quarter_column(dates)
+
+    def _sort_as_cube(self, df):
+        """Sort raw rows by cube key when every row has a distinct, complete key
+        
+        Returns the sorted rows, or None when rows share a key or miss one
+        and have to be aggregated into a separate cube.
+        """
+        if df.empty:
+            return None
+        date_codes, dates = pd.factorize(df['date'], sort=True)
+        codes = [date_codes] + [df[column].cat.codes.to_numpy() for column in CUBE_DIMENSIONS[1:]]
+        if any((column_codes < 0).any() for column_codes in codes):
+            return None
+        sizes = [len(dates)] + [len(df[column].cat.categories) for column in CUBE_DIMENSIONS[1:]]
+        try:
+            keys = np.ravel_multi_index(codes, sizes)
+        except ValueError:
+            # More key combinations than fit in one integer
+            return None
+        
+        if (np.diff(keys) > 0).all():
+            return df
+        order = np.argsort(keys, kind='stable')
+        if not (np.diff(keys[order]) > 0).all():
+            return None
+        return df.take(order).reset_index(drop=True)
+
+    def _cube_view(self, df):
+        """Get the cube columns of key-sorted, one-per-key rows without copying them"""
+        return pd.DataFrame({column: df[column] for column in CUBE_COLUMNS}, copy=False)
+
+    def _cube_is_rows(self):
+        """Check whether the cube is a view of the raw rows (see _cube_view)"""
+        df = self.processed_data['raw_data'] if self.processed_data else None
+        if df is None or self.cube is None:
+            return False
+        return np.may_share_memory(self.cube['registrations'].to_numpy(), df['registrations'].to_numpy())
+
+    def _cube_keys(self, cube, keys):
+        """Get the columns to group cube rows by, deriving time attributes from the dates"""
+        derived = [column for column in keys if column not in cube.columns]
+        time_columns = _time_columns(cube['date'], derived) if derived else {}
+        return [cube[column] if column in cube.columns else time_columns[column] for column in keys]
+
+    def memory_footprint(self):
+        """Get the memory held by the processed tables in bytes
+        
+        Columns a table shares with raw_data (e.g. a cube that is a view of
+        the raw rows) are counted once, under raw_data.
+        """
+        footprint = {}
+        row_index = None
+        if self.processed_data:
+            # Tables that have not been built yet hold no memory
+            raw_data = self.processed_data['raw_data']
+            for name, table in self.processed_data.built_items():
+                if name == 'row_index':
+                    row_index = table
+                elif table is not None:
+                    footprint[name] = _table_bytes(table, None if name == 'raw_data' else raw_data)
+        footprint['rollups'] = int(sum(
+            totals.memory_usage(deep=True, index=True) for totals in self._rollups.values()
+        ))
+        if row_index is not None:
+            # The date index is a view of raw_data['date'] and is not counted
+            footprint['row_index'] = int(sum(
+                row_index[column]['order'].nbytes for column in INDEXED_COLUMNS
+            ))
+        footprint['total'] = sum(footprint.values())
+        return footprint
+
+    def _align_categories(self, df, batch):
+        """Give batch columns the stored categories, adding any new values
+        
+        Returns True when the stored categories had to be extended.
+        """
+        categories_added = False
+        for column in CUBE_DIMENSIONS[1:]:
+            categories = df[column].cat.categories
+            new_values = [v for v in batch[column].cat.categories if v not in categories]
+            if new_values:
+                df[column] = df[column].cat.add_categories(new_values)
+                self.cube[column] = self.cube[column].cat.add_categories(new_values)
+                categories_added = True
+            batch[column] = batch[column].astype(df[column].dtype)
+        return categories_added
+
+    def _date_runs(self, dates, affected_dates):
+        """Get the start and stop rows of each of affected_dates in sorted dates"""
+        return dates.searchsorted(affected_dates, 'left'), dates.searchsorted(affected_dates, 'right')
+
+    def _run_positions(self, starts, stops):
+        """Get the row positions of every [start, stop) run, in order"""
+        lengths = stops - starts
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    def _splice_dates(self, frame, affected_dates, replacement):
+        """Replace the rows of affected_dates in a date-sorted frame without re-sorting it
+        
+        replacement holds every new row of those dates, sorted by date. When
+        all of them come after the last stored date the rows are appended;
+        otherwise each date's rows go in at its searchsorted position.
+        """
+        starts, stops = self._date_runs(frame['date'].to_numpy(), affected_dates)
+        if starts[0] == len(frame):
+            return pd.concat([frame, replacement], ignore_index=True)
+        
+        new_starts, new_stops = self._date_runs(replacement['date'].to_numpy(), affected_dates)
+        pieces, previous = [], 0
+        for start, stop, new_start, new_stop in zip(starts, stops, new_starts, new_stops):
+            pieces += [frame.iloc[previous:start], replacement.iloc[new_start:new_stop]]
+            previous = stop
+        pieces.append(frame.iloc[previous:])
+        return pd.concat(pieces, ignore_index=True)
+
+    @profiled('processor.patch_row_index')
+    def _patch_row_index(self, row_index, df, affected_dates, starts, stops, merged):
+        """Update a row index for merged rows spliced into df (see _splice_dates)
+        
+        starts and stops are the replaced runs of the old rows. Rows after a
+        replaced run move by the change in row count before them, and the
+        merged rows' new positions are inserted into each code's ascending
+        positions, so nothing is re-sorted. An appended batch moves no rows.
+        """
+        # Row count change of each replaced run, and where its rows now start
+        new_starts, new_stops = self._date_runs(merged['date'].to_numpy(), affected_dates)
+        shifts = np.concatenate([[0], np.cumsum((new_stops - new_starts) - (stops - starts))])
+        merged_positions = np.arange(len(merged)) + np.repeat(starts + shifts[:-1] - new_starts, new_stops - new_starts)
+        appended = starts[0] == len(row_index['dates'])
+        
+        patched = {'dates': df['date'].to_numpy()}
+        for column in INDEXED_COLUMNS:
+            index = row_index[column]
+            order, offsets = index['order'], index['offsets']
+            categories = df[column].cat.categories
+            counts = np.zeros(len(categories), dtype=np.int64)
+            if appended:
+                counts[:len(offsets) - 1] = np.diff(offsets)
+            else:
+                # Drop rows of the replaced runs and shift the rows after them
+                codes = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+                runs_before = stops.searchsorted(order, 'right')
+                kept = runs_before == starts.searchsorted(order, 'right')
+                order = order[kept] + shifts[runs_before[kept]]
+                counts += np.bincount(codes[kept], minlength=len(categories))
+            kept_offsets = np.concatenate([[0], np.cumsum(counts)])
+            
+            # Insert each merged row among the kept rows of its code
+            merged_codes = merged[column].cat.codes.to_numpy()
+            valid = merged_codes >= 0
+            added_codes, added_positions = merged_codes[valid], merged_positions[valid]
+            added = np.lexsort((added_positions, added_codes))
+            added_codes, added_positions = added_codes[added], added_positions[added]
+            insert_at = np.empty(len(added_codes), dtype=np.int64)
+            codes_added, firsts = np.unique(added_codes, return_index=True)
+            for code, first, last in zip(codes_added, firsts, np.append(firsts[1:], len(added_codes))):
+                kept_start, kept_stop = kept_offsets[code], kept_offsets[code + 1]
+                insert_at[first:last] = kept_start + order[kept_start:kept_stop].searchsorted(added_positions[first:last])
+            
+            counts += np.bincount(added_codes, minlength=len(categories))
+            patched[column] = {
+                'categories': categories,
+                'order': np.insert(order, insert_at, added_positions).astype(
+                    np.int32 if len(df) < 2 ** 31 else np.int64, copy=False),
+                'offsets': np.concatenate([[0], np.cumsum(counts)])
             }
+        return patched
+
+    def _processed_tables(self, raw_data):
+        """Create the processed tables over raw_data, with lazy derived tables
+        
+        The totals tables are built from the cube and the row index from
+        raw_data when first read; replacing either input discards them.
+        """
+        tables = LazyTables({'raw_data': raw_data})
+        tables.register('row_index', self._build_row_index, depends_on=['raw_data'])
+        for name, keys in TOTALS_TABLES.items():
+            tables.register(name, functools.partial(self._totals_table, name, keys), depends_on=['cube'])
+        return tables
+
+    def _totals_table(self, name, keys, cube):
+        """Build a totals table from the cube, or read it from the disk cache"""
+        if cube is None:
+            return self._backend_rollup(keys).reset_index()
+        return self._disk_cached(name, lambda: self._group_totals(cube, keys))
+
+    @profiled('processor.refresh_tables')
+    def _refresh_tables(self, affected_dates=None, new_slice=None):
+        """Point the processed tables at the current cube
+        
+        Totals tables are rebuilt from the cube when next read. When
+        affected_dates is given, tables that were already built have only
+        the rows of those dates replaced, using new_slice (the rebuilt cube
+        rows of those dates).
+        """
+        spliced = {}
+        if affected_dates is not None:
+            for name, keys in TOTALS_TABLES.items():
+                if not self.processed_data.is_built(name):
+                    continue
+                spliced[name] = self._splice_dates(self.processed_data[name], affected_dates,
+                                                   self._group_totals(new_slice, keys))
+        self.processed_data['cube'] = self.cube
+        for name, table in spliced.items():
+            self.processed_data[name] = table
+
+    @profiled('processor.group_totals')
+    def _group_totals(self, cube, keys):
+        """Sum cube registrations by keys into a flat table"""
+        return _sum_registrations(cube, self._cube_keys(cube, keys)).reset_index()
+
+    def _parse_dates(self, dates):
+        """Convert a date column to datetime, parsing each distinct value once"""
+        if isinstance(dates.dtype, pd.CategoricalDtype):
+            categories = pd.to_datetime(dates.cat.categories)
+            return pd.Series(categories.take(dates.cat.codes.to_numpy()), index=dates.index)
+        return pd.to_datetime(dates)
+
+    def _aggregate(self, df, workers):
+        """Build the cube serially, or in a process pool for large inputs"""
+        if workers > 1 and len(df) >= PROCESSING_CONFIG['parallel_min_rows']:
+            return self._build_cube_parallel(df, workers)
+        return self._build_cube(df)
+
+    @profiled('processor.build_cube_cached')
+    def _build_cube_cached(self, df, workers):
+        """Build the cube from per-month slices in the disk cache
+        
+        Each month's rows are hashed; months with a cached cube slice are
+        read back and only the rest are aggregated and stored. Sets
+        content_hash from the month hashes.
+        """
+        partitions = self._partition_hashes(df)
+        slices, missing = [], []
+        for month_key, (start, stop, digest) in partitions.items():
+            found, cube_slice = self.disk_cache.get('cube', combine_hashes(CODE_VERSION, digest))
+            if found:
+                slices.append(cube_slice)
+            else:
+                missing.append((month_key, start, stop, digest))
+        
+        cached = len(slices)
+        if missing:
+            if not cached:
+                rows = df
+            else:
+                rows = df.iloc[np.concatenate([np.arange(start, stop) for _, start, stop, _ in missing])]
+            built = self._aggregate(rows.reset_index(drop=True), workers)
+            month_keys = _time_columns(built['date'], ['month_key'])['month_key'].to_numpy()
+            for month_key, _, _, digest in missing:
+                cube_slice = built.iloc[month_keys.searchsorted(month_key, 'left'):
+                                        month_keys.searchsorted(month_key, 'right')].reset_index(drop=True)
+                self.disk_cache.set('cube', combine_hashes(CODE_VERSION, digest), cube_slice)
+                slices.append(cube_slice)
+        
+        self.content_hash = self._content_hash(partitions)
+        if not cached:
+            return built
+        
+        # Cached slices may carry categories in another order
+        for cube_slice in slices:
+            for column in CUBE_DIMENSIONS[1:]:
+                cube_slice[column] = cube_slice[column].astype(df[column].dtype)
+        cube = pd.concat(slices, ignore_index=True)
+        return cube.sort_values(CUBE_DIMENSIONS, kind='stable', ignore_index=True)
+
+    def _partition_hashes(self, df):
+        """Hash the date-sorted raw rows of each month"""
+        return partition_hashes(df, _time_columns(df['date'], ['month_key'])['month_key'].to_numpy())
+
+    def _content_hash(self, partitions):
+        """Combine month partition hashes into one hash of all input rows"""
+        return combine_hashes(*(f"{month_key}:{digest}" for month_key, (_, _, digest) in partitions.items()))
+
+    def _disk_cached(self, name, compute, *args):
+        """Get a derived value from the disk cache, computing and storing it on a miss
+        
+        Values are keyed by the content hash and code version, plus args;
+        without a disk cache or a content hash the value is just computed.
+        """
+        if self.disk_cache is None or self.content_hash is None:
+            return compute()
+        key = combine_hashes(CODE_VERSION, self.content_hash, *args)
+        found, value = self.disk_cache.get(name, key)
+        if not found:
+            value = compute()
+            self.disk_cache.set(name, key, value)
+        return value
+
+    @profiled('processor.build_cube')
+    def _build_cube(self, df):
+        """Aggregate raw rows by date x vehicle_type x manufacturer x region"""
+        keys = [df['date']] + [self._as_category(df[column]) for column in CUBE_DIMENSIONS[1:]]
+        return _sum_registrations(df, keys).reset_index()
+
+    @profiled('processor.build_cube_parallel')
+    def _build_cube_parallel(self, df, workers):
+        """Build the cube by aggregating year/month partitions in a process pool
+        
+        The key and registration columns are copied once into shared memory
+        blocks; each worker attaches to them and aggregates a contiguous
+        range of the date-sorted rows, so no frame is pickled. Partitions
+        cover disjoint dates, so the partial cubes are simply concatenated.
+        """
+        columns = {'date': df['date'].to_numpy().view(np.int64)}
+        for column in CUBE_DIMENSIONS[1:]:
+            columns[column] = df[column].cat.codes.to_numpy()
+        columns['registrations'] = df['registrations'].to_numpy()
+        
+        blocks = []
+        try:
+            descriptors = {}
+            for name, values in columns.items():
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(values.shape, values.dtype, buffer=block.buf)[:] = values
+                descriptors[name] = (block.name, values.dtype.str, len(values))
+            
+            ranges = self._partition_ranges(df, workers * PROCESSING_CONFIG['partitions_per_worker'])
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                partials = list(executor.map(
+                    _aggregate_partition, [descriptors] * len(ranges),
+                    [start for start, _ in ranges], [stop for _, stop in ranges],
+                    [df['date'].dtype.str] * len(ranges)
+                ))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        
+        cube = pd.concat(partials, ignore_index=True)
+        for column in CUBE_DIMENSIONS[1:]:
+            cube[column] = pd.Categorical.from_codes(cube[column], dtype=df[column].dtype)
+        return cube
+
+    def _partition_ranges(self, df, partitions):
+        """Split date-sorted rows at month boundaries into balanced row ranges"""
+        months = _time_columns(df['date'], ['month_key'])['month_key'].to_numpy()
+        boundaries = np.concatenate([[0], np.flatnonzero(np.diff(months)) + 1, [len(df)]])
         
-        # Calculate manufacturer growth
-        manufacturer_growth = {}
-        for manufacturer in df['manufacturer'].unique():
-            manufacturer_data = df[df['manufacturer'] == manufacturer]
-            manufacturer_growth[manufacturer] = {
-                'yoy': self._calculate_yoy_growth(manufacturer_data, current_year, previous_year),
-                'qoq': self._calculate_qoq_growth(manufacturer_data, current_quarter, previous_quarter)
+        # Group consecutive months until each range holds about its share of rows
+        target = len(df) / partitions
+        ranges = []
+        start = 0
+        for boundary in boundaries[1:]:
+            if boundary - start >= target or boundary == len(df):
+                ranges.append((int(start), int(boundary)))
+                start = boundary
+        return ranges
+
+    def _add_time_attributes(self, frame):
+        """Add year, month, quarter and the period keys to a frame with a 'date' column"""
+        return _add_time_attributes(frame)
+
+    def _as_category(self, column):
+        """Convert a key column to categorical, keeping first-appearance order"""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column
+        return column.astype(pd.CategoricalDtype(pd.unique(column)))
+
+    @profiled('processor.build_row_index')
+    def _build_row_index(self, df):
+        """Build the date and categorical code indexes used by get_filtered_data
+        
+        Dates are kept as a sorted array so date ranges map to row offsets
+        with searchsorted. For each indexed column, row positions are grouped
+        by category code: the rows of code c are
+        order[offsets[c]:offsets[c + 1]], in ascending order. Returns None
+        when there are no in-memory rows to index.
+        """
+        if df is None:
+            return None
+        row_index = {'dates': df['date'].to_numpy()}
+        for column in INDEXED_COLUMNS:
+            codes = df[column].cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(df[column].cat.categories))
+            order = np.argsort(codes, kind='stable')[len(codes) - counts.sum():]
+            row_index[column] = {
+                'categories': df[column].cat.categories,
+                'order': order.astype(np.int32) if len(codes) < 2 ** 31 else order,
+                'offsets': np.concatenate([[0], np.cumsum(counts)])
             }
+        return row_index
+
+    def _rows_for_value(self, column, value):
+        """Get the sorted row positions where an indexed column equals value"""
+        index = self.processed_data['row_index'][column]
+        code = index['categories'].get_indexer([value])[0]
+        if code < 0:
+            return np.array([], dtype=np.intp)
+        return index['order'][index['offsets'][code]:index['offsets'][code + 1]]
+
+    def _rollup(self, keys):
+        """Get registration totals of the cube rolled up to the given keys"""
+        keys = tuple(keys)
+        if keys not in self._rollups:
+            if self.cube is None:
+                self._rollups[keys] = self._backend_rollup(keys)
+            else:
+                self._rollups[keys] = _sum_registrations(self.cube, self._cube_keys(self.cube, keys))
+        return self._rollups[keys]
+
+    @profiled('processor.backend_rollup')
+    def _backend_rollup(self, keys, date_ranges=((None, None),)):
+        """Get registration totals by keys from a SQL GROUP BY on the backend's cube
+        
+        Used when the cube is not in memory (see from_sql_backend); only
+        the grouped totals of the cube rows in date_ranges (inclusive
+        (start, end) pairs, None for open) are read. Keys get the index
+        types of a rollup of the in-memory cube.
+        """
+        totals = pd.concat([self.backend.rollup(list(keys), start_date, end_date)
+                            for start_date, end_date in date_ranges], ignore_index=True)
+        if len(date_ranges) > 1:
+            totals = totals.sort_values(list(keys), kind='stable', ignore_index=True)
+        dtypes = _add_time_attributes(pd.DataFrame({'date': pd.DatetimeIndex([])})).dtypes
+        values = []
+        for key in keys:
+            if key == 'date':
+                values.append(pd.to_datetime(totals[key]))
+            elif key in CUBE_DIMENSIONS:
+                values.append(totals[key].astype('category'))
+            else:
+                values.append(totals[key].astype(dtypes[key]))
+        index = (pd.MultiIndex.from_arrays(values, names=list(keys)) if len(keys) > 1
+                 else pd.Index(values[0], name=keys[0]))
+        return pd.Series(totals['registrations'].to_numpy(np.int64), index=index, name='registrations')
+
+    @profiled('processor.run_queries')
+    def run_queries(self, specs):
+        """Answer a page's widget queries from a single pass over the cube
+        
+        The rollups every query reads are planned up front and built from
+        one grouping of the cube (see _prefetch_rollups); each query then
+        runs on those rollups, and its result is cached as if it had been
+        called directly.
+        
+        Args:
+            specs: List of dicts with a 'query' name from BATCH_QUERIES and
+                that query's arguments, e.g. {'query': 'trend',
+                'period': 'weekly'} or {'query': 'top_manufacturers',
+                'limit': 5}
+        
+        Returns:
+            List of results in the order of specs
+        """
+        if not self.processed_data:
+            self.process_data()
+        
+        calls = []
+        for spec in specs:
+            arguments = dict(spec)
+            query = arguments.pop('query')
+            if query not in BATCH_QUERIES:
+                raise ValueError(f"Unsupported query: {query}")
+            calls.append((getattr(self, BATCH_QUERIES[query]), arguments))
+        
+        key_sets = []
+        for (method, arguments), spec in zip(calls, specs):
+            bound = inspect.signature(method).bind(**arguments)
+            bound.apply_defaults()
+            key_sets += self._query_rollups(spec['query'], bound.arguments)
+        self._prefetch_rollups(key_sets)
+        
+        return [method(**arguments) for method, arguments in calls]
+
+    def _query_rollups(self, query, arguments):
+        """Get the cube rollups a batch query reads, as lists of keys"""
+        def growth_rollups(dimensions):
+            dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+            return [dimensions] if dimensions else []
+        
+        # Current periods and period days are read from the overall year,
+        # quarter and daily totals, and a growth table's entities from their
+        # rollup; period-to-date totals are grouped from the cube rows of
+        # the last two years and quarters
+        periods = [['year'], ['quarter_key'], ['date']]
+        if query == 'growth_metrics':
+            return periods + growth_rollups([]) + growth_rollups(['vehicle_type']) + growth_rollups(['manufacturer'])
+        if query == 'growth_table':
+            return periods + growth_rollups(arguments['dimensions'])
+        if query == 'quarterly_totals':
+            return [['year', 'quarter']]
+        if query == 'filter_options':
+            return [['vehicle_type'], ['manufacturer']]
+        if query == 'series_analytics':
+            dimensions = arguments['dimensions']
+            dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+            return [dimensions + [PERIOD_COLUMNS[arguments['period']]]]
+        
+        # These are answered by SQL when a backend is in use
+        if self.backend is not None:
+            return []
+        if query == 'summary_statistics':
+            return [['vehicle_type'], ['manufacturer'], ['year'], ['quarter'], ['date']]
+        if query == 'trend':
+            return [[PERIOD_COLUMNS[arguments['period']]]]
+        if query == 'top_manufacturers':
+            return [['vehicle_type', 'manufacturer']]
+        # Filtered data reads raw rows through the row index, not the cube
+        return []
+
+    @profiled('processor.prefetch_rollups')
+    def _prefetch_rollups(self, key_sets):
+        """Build every missing rollup of key_sets from one pass over the cube
+        
+        Each cube row is read once: its dimension codes and the coarsest
+        time grain that determines every requested time column (e.g.
+        month_key for year and quarter totals, the date when daily totals
+        are needed) are summed into one base grouping with _sum_by_codes.
+        Every rollup is then summed from the smallest grouping (the base or
+        a finer rollup) it can be derived from, with time columns mapped
+        from the grain through one row of attributes per grain value.
+        """
+        missing = [keys for keys in dict.fromkeys(tuple(keys) for keys in key_sets) if keys not in self._rollups]
+        # Without an in-memory cube each rollup is its own SQL query
+        if len(missing) < 2 or self.cube is None:
+            for keys in missing:
+                self._rollup(keys)
+            return
+        
+        requested = set().union(*missing)
+        time_columns = requested - set(CUBE_DIMENSIONS[1:])
+        dimensions = [column for column in CUBE_DIMENSIONS[1:] if column in requested]
+        grain = next((column for column, determined in TIME_GRAINS if time_columns <= determined), None)
+        
+        # Category codes of the dimensions and sorted codes of the grain
+        codes, sizes, levels = [], [], {}
+        for column in dimensions:
+            dtype = self.cube[column].dtype
+            codes.append(self.cube[column].cat.codes.to_numpy())
+            sizes.append(len(dtype.categories))
+            levels[column] = dtype
+        if time_columns:
+            grain_codes, levels[grain] = pd.factorize(self._cube_keys(self.cube, [grain])[0], sort=True)
+            codes.append(grain_codes)
+            sizes.append(len(levels[grain]))
+        base_codes, base_totals = _sum_by_codes(codes, sizes, self.cube['registrations'].to_numpy())
+        base = (dict(zip(dimensions + ([grain] if time_columns else []), base_codes)), base_totals)
+        
+        # Time attributes of each grain value are derived from its first day
+        derived = {}
+        if time_columns - {grain}:
+            attributes = self._add_time_attributes(pd.DataFrame({
+                'date': period_start(levels[grain], GRAIN_PERIODS[grain]), 'registrations': 0
+            }))
+            for column in time_columns - {grain}:
+                derived[column], levels[column] = pd.factorize(attributes[column], sort=True)
+        
+        def has_key(groups, column):
+            """Check whether a grouping holds or determines a key column"""
+            return column in groups or (column in derived and grain in groups)
+        
+        def key_codes(groups, column):
+            """Get the codes of a key column in a grouping, mapping time columns from the grain"""
+            return groups[column] if column in groups else derived[column][groups[grain]]
+        
+        # Finer rollups first, so coarser ones are summed from the smallest
+        # rollup they can be derived from instead of the base
+        groupings = [base]
+        for keys in sorted(missing, key=len, reverse=True):
+            groups, totals = min((grouping for grouping in groupings
+                                  if all(has_key(grouping[0], column) for column in keys)),
+                                 key=lambda grouping: len(grouping[1]))
+            rollup_codes, rollup_totals = _sum_by_codes(
+                [key_codes(groups, column) for column in keys],
+                [len(levels[column].categories) if column in dimensions else len(levels[column]) for column in keys],
+                totals
+            )
+            groupings.append((dict(zip(keys, rollup_codes)), rollup_totals))
+            values = [pd.Categorical.from_codes(column_codes, dtype=levels[column]) if column in dimensions
+                      else levels[column].take(column_codes) for column, column_codes in zip(keys, rollup_codes)]
+            index = (pd.MultiIndex.from_arrays(values, names=list(keys)) if len(keys) > 1
+                     else pd.Index(values[0], name=keys[0]))
+            self._rollups[keys] = pd.Series(rollup_totals, index=index, name='registrations')
+
+    @profiled('processor.calculate_growth_metrics')
+    @cached_query
+    def calculate_growth_metrics(self):
+        """Calculate YoY and QoQ growth metrics"""
+        if not self.processed_data:
+            self.process_data()
+        self.growth_metrics = self._disk_cached('growth_metrics', self._growth_metrics)
+        return self.growth_metrics
+
+    def _growth_metrics(self):
+        """Compute the growth metrics from the growth tables"""
+        # Calculate overall growth
+        overall = self.get_growth_table([]).iloc[0]
+        overall_growth = {'yoy': overall['yoy'], 'qoq': overall['qoq']}
         
-        self.growth_metrics = {
+        # Vehicle type and manufacturer growth are views over the growth tables
+        current_year, current_quarter = self._current_periods()
+        return {
+            'current_year': current_year,
+            'previous_year': current_year - 1,
+            'current_quarter': period_label(current_quarter, 'quarterly'),
+            'previous_quarter': period_label(current_quarter - 1, 'quarterly'),
+            'year_days': self._period_days('yearly'),
+            'quarter_days': self._period_days('quarterly'),
             'overall': overall_growth,
-            'vehicle_type': vehicle_type_growth,
-            'manufacturer': manufacturer_growth
+            'vehicle_type': self._growth_to_dict(self.get_growth_table(['vehicle_type'])),
+            'manufacturer': self._growth_to_dict(self.get_growth_table(['manufacturer']))
         }
+
+    @profiled('processor.get_growth_table')
+    @cached_query
+    def get_growth_table(self, dimensions=('manufacturer',)):
+        """Get YoY and QoQ growth for every entity of the given dimensions
         
-        return self.growth_metrics
+        Growth is computed for all entities at once from year x entity and
+        quarter x entity pivots of the cube. The current year and quarter
+        are usually partial, so YoY and QoQ compare them to date with the
+        same number of days at the start of the previous year and quarter
+        (see _period_to_date). Entities without registrations in a window
+        get 0 for it. Any combination of cube dimensions can be used, e.g.
+        ['region'] or ['vehicle_type', 'manufacturer']; an empty list gives
+        overall growth.
+        
+        Returns:
+            DataFrame with one row per entity, its current and previous
+            period-to-date registrations, and 'yoy' and 'qoq' growth
+            percentages
+        """
+        if not self.processed_data:
+            self.process_data()
+            
+        if isinstance(dimensions, str):
+            dimensions = [dimensions]
+        dimensions = list(dimensions)
+        
+        # Get current and previous periods; period keys are consecutive
+        current_year, current_quarter = self._current_periods()
+        previous_year = current_year - 1
+        previous_quarter = current_quarter - 1
+        
+        # Every entity with registrations gets a row, even without any in the windows
+        entities = self._rollup(dimensions).index if dimensions else None
+        yearly = self._period_pivot(self._period_to_date(dimensions, 'yearly'), entities,
+                                    [current_year, previous_year])
+        quarterly = self._period_pivot(self._period_to_date(dimensions, 'quarterly'), entities,
+                                       [current_quarter, previous_quarter])
+        
+        growth_table = pd.DataFrame({
+            'current_year_registrations': yearly[current_year],
+            'previous_year_registrations': yearly[previous_year],
+            'current_quarter_registrations': quarterly[current_quarter],
+            'previous_quarter_registrations': quarterly[previous_quarter]
+        })
+        growth_table['yoy'] = calculate_growth_array(
+            growth_table['current_year_registrations'], growth_table['previous_year_registrations']
+        )
+        growth_table['qoq'] = calculate_growth_array(
+            growth_table['current_quarter_registrations'], growth_table['previous_quarter_registrations']
+        )
+        
+        if dimensions:
+            growth_table = growth_table.reset_index()
+        return growth_table
+
+    def _period_pivot(self, totals, entities, periods):
+        """Pivot entity x period totals to one row per entity and one column per period
+        
+        entities is the index of entities to return (None for overall
+        totals); missing entities and periods are 0.
+        """
+        if entities is not None:
+            pivot = totals.unstack(-1, fill_value=0).reindex(entities, fill_value=0)
+        else:
+            pivot = totals.to_frame().T.reset_index(drop=True)
+        pivot.columns = list(pivot.columns)
+        return pivot.reindex(columns=periods, fill_value=0).astype(np.int64)
 
-    def _get_previous_quarter(self, current_quarter):
-        """Get previous quarter"""
-        quarter_map = {'Q1': 'Q4', 'Q2': 'Q1', 'Q3': 'Q2', 'Q4': 'Q3'}
-        return quarter_map.get(current_quarter, 'Q4')
+    def _growth_to_dict(self, growth_table):
+        """Convert a growth table to the nested {entity: {'yoy', 'qoq'}} form"""
+        dimensions = [c for c in growth_table.columns if c in CUBE_DIMENSIONS]
+        growth = growth_table.set_index(dimensions)[['yoy', 'qoq']]
+        return growth.to_dict('index')
 
-    def _calculate_yoy_growth(self, df, current_year, previous_year):
-        """Calculate year-over-year growth"""
-        current_data = df[df['year'] == current_year]['registrations'].sum()
-        previous_data = df[df['year'] == previous_year]['registrations'].sum()
-        return calculate_growth(current_data, previous_data)
+    def _current_periods(self):
+        """Get the latest year and quarter key present in the data"""
+        return int(self._rollup(['year']).index.max()), int(self._rollup(['quarter_key']).index.max())
 
-    def _calculate_qoq_growth(self, df, current_quarter, previous_quarter):
-        """Calculate quarter-over-quarter growth"""
-        current_data = df[df['quarter'] == current_quarter]['registrations'].sum()
-        previous_data = df[df['quarter'] == previous_quarter]['registrations'].sum()
-        return calculate_growth(current_data, previous_data)
+    def _period_days(self, period):
+        """Get the number of days of the current year or quarter covered by the data"""
+        current_year, current_quarter = self._current_periods()
+        current = current_year if period == 'yearly' else current_quarter
+        last_date = self._rollup(['date']).index.max()
+        return (last_date - period_start([current], period)[0]).days + 1
+
+    def _period_to_date(self, dimensions, period):
+        """Get period-to-date totals of the current and previous year or quarter per entity
+        
+        The current period is usually partial, so it is compared with the
+        same number of days from the start of the previous period (at most
+        the whole previous period) rather than with all of it.
+        
+        Args:
+            dimensions: Cube dimensions identifying an entity
+            period: 'yearly' or 'quarterly'
+        
+        Returns:
+            Series of registrations indexed by dimensions + the period key
+            column ('year' or 'quarter_key')
+        """
+        keys = (period, tuple(dimensions))
+        if keys not in self._period_to_date_totals:
+            current_year, current_quarter = self._current_periods()
+            current = current_year if period == 'yearly' else current_quarter
+            key_column = PERIOD_COLUMNS[period]
+            current_start, previous_start = period_start([current, current - 1], period)
+            previous_end = min(previous_start + pd.Timedelta(days=self._period_days(period) - 1),
+                               current_start - pd.Timedelta(days=1))
+            
+            if self.cube is None:
+                # Only the cube rows of the two windows are grouped, in SQL
+                self._period_to_date_totals[keys] = self._backend_rollup(
+                    list(dimensions) + [key_column], [(previous_start, previous_end), (current_start, None)]
+                )
+            else:
+                dates = self.cube['date']
+                current_rows = (dates >= current_start).to_numpy()
+                previous_rows = ((dates >= previous_start) & (dates <= previous_end)).to_numpy()
+                window = current_rows | previous_rows
+                rows = self.cube[window]
+                period_keys = pd.Series(np.where(current_rows[window], current, current - 1),
+                                        index=rows.index, name=key_column)
+                self._period_to_date_totals[keys] = _sum_registrations(
+                    rows, self._cube_keys(rows, list(dimensions)) + [period_keys]
+                )
+        return self._period_to_date_totals[keys]
+
+    @profiled('processor.get_filter_options')
+    @cached_query
+    def get_filter_options(self):
+        """Get the date range and the vehicle types and manufacturers with data
+        
+        Dates are read from the ends of the date-sorted raw rows and the
+        options from the memoized vehicle type and manufacturer rollups
+        (which the summary statistics read too), so no raw rows are scanned.
+        
+        Returns:
+            Dict with 'min_date', 'max_date', 'vehicle_types' and
+            'manufacturers'
+        """
+        if not self.processed_data:
+            self.process_data()
+        raw_data = self.processed_data['raw_data']
+        if raw_data is not None and len(raw_data):
+            min_date, max_date = raw_data['date'].iloc[[0, -1]]
+        else:
+            dates = self._rollup(['date']).index
+            min_date, max_date = (dates[0], dates[-1]) if len(dates) else (None, None)
+        return {
+            'min_date': min_date,
+            'max_date': max_date,
+            'vehicle_types': list(self._rollup(['vehicle_type']).index),
+            'manufacturers': list(self._rollup(['manufacturer']).index)
+        }
 
+    @profiled('processor.get_summary_statistics')
+    @cached_query
     def get_summary_statistics(self):
         """Get summary statistics for the dashboard"""
         if not self.processed_data:
             self.process_data()
-            
-        df = self.processed_data['raw_data']
+        if self.backend is not None:
+            self.summary_stats = self.backend.summary_statistics()
+            return self.summary_stats
         
-        # Calculate total registrations
-        total_registrations = df['registrations'].sum()
+        self.summary_stats = self._disk_cached('summary_stats', self._summary_statistics)
+        return self.summary_stats
+
+    def _summary_statistics(self):
+        """Compute the summary statistics from cube rollups"""
+        # Calculate total registrations from a rollup rather than the cube
+        total_registrations = self._rollup(['year']).sum()
         
         # Calculate vehicle type summary
-        vehicle_type_summary = df.groupby('vehicle_type')['registrations'].sum().to_dict()
+        vehicle_type_summary = self._rollup(['vehicle_type']).to_dict()
         
         # Calculate manufacturer summary
-        manufacturer_summary = df.groupby('manufacturer')['registrations'].sum().nlargest(10).to_dict()
+        manufacturer_summary = self._rollup(['manufacturer']).nlargest(10).to_dict()
         
         # Calculate yearly summary
-        yearly_summary = df.groupby('year')['registrations'].sum().to_dict()
+        yearly_summary = self._rollup(['year']).to_dict()
         
         # Calculate quarterly summary
-        quarterly_summary = df.groupby('quarter')['registrations'].sum().to_dict()
+        quarterly_summary = self._rollup(['quarter']).to_dict()
         
         # Calculate recent trend (last 30 days)
-        recent_data = df[df['date'] >= df['date'].max() - pd.Timedelta(days=30)]
-        recent_trend = recent_data['registrations'].sum()
+        daily = self._rollup(['date'])
+        recent_trend = daily[daily.index >= daily.index.max() - pd.Timedelta(days=30)].sum()
         
-        self.summary_stats = {
+        return {
             'total_registrations': total_registrations,
             'vehicle_type_summary': vehicle_type_summary,
             'manufacturer_summary': manufacturer_summary,
@@ -150,48 +1261,318 @@ class VehicleDataProcessor:
             'quarterly_summary': quarterly_summary,
             'recent_trend': recent_trend
         }
-        
-        return self.summary_stats
 
+    @profiled('processor.get_filtered_data')
+    @cached_query
     def get_filtered_data(self, start_date=None, end_date=None, vehicle_type=None, manufacturer=None):
         """Get filtered data based on user selections"""
-        df = self.processed_data['raw_data'].copy()
+        if self.backend is not None:
+            return self._as_filtered_result(
+                self.backend.filtered_data(start_date, end_date, vehicle_type, manufacturer)
+            )
+        df = self.processed_data['raw_data']
+        if df is None:
+            return self._load_filtered_source(start_date, end_date, vehicle_type, manufacturer)
+        return self._with_time_columns(df.iloc[self._filtered_rows(start_date, end_date, vehicle_type, manufacturer)])
+
+    def iter_filtered_data(self, start_date=None, end_date=None, vehicle_type=None, manufacturer=None,
+                           chunk_rows=100_000):
+        """Yield the filtered data of get_filtered_data in chunks of at most chunk_rows rows
         
+        Only one chunk of rows is materialized at a time: in-memory rows are
+        taken chunk by chunk from the row index positions and SQL rows are
+        paged by (date, rowid). A processor streamed from source files has no
+        row positions, so its filtered rows are read once and then sliced.
+        """
+        if not self.processed_data:
+            self.process_data()
+        if self.backend is not None:
+            for chunk in self.backend.iter_filtered_data(start_date, end_date, vehicle_type, manufacturer,
+                                                         chunk_rows):
+                yield self._as_filtered_result(chunk)
+            return
+        df = self.processed_data['raw_data']
+        if df is None:
+            data = self._load_filtered_source(start_date, end_date, vehicle_type, manufacturer)
+            for start in range(0, max(len(data), 1), chunk_rows):
+                yield data.iloc[start:start + chunk_rows]
+            return
+        rows = self._filtered_rows(start_date, end_date, vehicle_type, manufacturer)
+        if isinstance(rows, slice):
+            rows = range(rows.start, rows.stop)
+        for start in range(0, max(len(rows), 1), chunk_rows):
+            yield self._with_time_columns(df.iloc[rows[start:start + chunk_rows]])
+
+    def _filtered_rows(self, start_date, end_date, vehicle_type, manufacturer):
+        """Get the positions of the raw rows matching the filters, in row order
+        
+        Returns:
+            A slice of the date-sorted rows, or an array of row positions
+            when vehicle type or manufacturer filters apply
+        """
+        dates = self.processed_data['row_index']['dates']
+        
+        # Date range filters become a contiguous slice of the sorted rows
+        start, stop = 0, len(dates)
         if start_date:
-            df = df[df['date'] >= start_date]
+            start = dates.searchsorted(pd.Timestamp(start_date).to_datetime64().astype(dates.dtype), 'left')
         if end_date:
-            df = df[df['date'] <= end_date]
-        if vehicle_type and vehicle_type != 'All':
-            df = df[df['vehicle_type'] == vehicle_type]
-        if manufacturer:
-            df = df[df['manufacturer'] == manufacturer]
-            
-        return df
+            stop = dates.searchsorted(pd.Timestamp(end_date).to_datetime64().astype(dates.dtype), 'right')
+        
+        # Equality filters intersect per-code row lists within the slice
+        rows = None
+        for column, value in zip(INDEXED_COLUMNS, [vehicle_type, manufacturer]):
+            if not value or value == 'All':
+                continue
+            value_rows = self._rows_for_value(column, value)
+            value_rows = value_rows[value_rows.searchsorted(start):value_rows.searchsorted(stop)]
+            rows = value_rows if rows is None else np.intersect1d(rows, value_rows, assume_unique=True)
+        return slice(start, stop) if rows is None else rows
 
-    def get_trend_data(self, metric='registrations', group_by='date', period='monthly'):
-        """Get trend data for charts"""
-        df = self.processed_data['raw_data'].copy()
+    def _load_filtered_source(self, start_date, end_date, vehicle_type, manufacturer):
+        """Read filtered rows from the source files of a streamed processor"""
+        if self._source is None:
+            raise ValueError("Filtered data needs raw_data or a source file (see process_files)")
+        filename, directory = self._source
+        data = load_data(filename, directory, start_date=start_date, end_date=end_date,
+                         vehicle_type=vehicle_type, manufacturer=manufacturer)
+        return self._as_filtered_result(data)
+
+    def _as_filtered_result(self, data):
+        """Convert rows read from files or SQL to the filtered data layout"""
+        df = self._prepare_raw(data).sort_values('date', kind='stable', ignore_index=True)
+        return self._with_time_columns(df)
+
+    def _with_time_columns(self, rows):
+        """Add year, month and quarter, derived for these rows only, to raw rows"""
+        dates = rows['date']
+        columns = {
+            'date': dates,
+            'year': dates.dt.year.astype(np.int16),
+            'month': dates.dt.month.astype(np.int8)
+        }
+        columns.update({column: rows[column] for column in rows.columns if column not in columns})
+        columns['quarter'] = self._quarter_column(dates)
+        return pd.DataFrame(columns, index=rows.index)
+
+    @profiled('processor.get_trend_data')
+    @cached_query
+    def get_trend_data(self, metric='registrations', group_by='date', period='monthly', window=None):
+        """Get trend data for charts
+        
+        Totals are rolled up by the period keys of the cube dates, with
+        every period between the first and last present (empty periods
+        are 0).
+        
+        Args:
+            metric: Name of the value column
+            period: 'daily', 'weekly', 'monthly', 'quarterly', 'fiscal_year'
+                or 'yearly'
+            window: Optional number of periods for trailing rolling sums
+        
+        Returns:
+            DataFrame with the period start date ('period'), its 'label'
+            and the metric
+        """
+        if period not in PERIOD_COLUMNS:
+            raise ValueError(f"Unsupported period: {period}")
         
-        if period == 'monthly':
-            df['period'] = df['date'].dt.to_period('M')
-        elif period == 'quarterly':
-            df['period'] = df['quarter']
+        if period == 'daily':
+            totals = self._period_totals(period)
+            totals = totals.reindex(pd.date_range(totals.index.min(), totals.index.max()), fill_value=0)
+            labels = totals.index.strftime('%Y-%m-%d')
         else:
-            df['period'] = df['date'].dt.date
-            
-        trend_data = df.groupby('period')[metric].sum().reset_index()
+            totals = dense_totals(self._period_totals(period))
+            labels = [period_label(key, period) for key in totals.index]
+        if window:
+            totals = rolling_totals(totals, window)
+        
+        trend_data = pd.DataFrame({
+            'period': period_start(totals.index, period),
+            'label': labels,
+            metric: totals.to_numpy()
+        })
         return trend_data
 
+    def _period_totals(self, period):
+        """Get total registrations per period key from SQL or the cube"""
+        if self.backend is not None:
+            return self.backend.period_totals(period)
+        return self._rollup([PERIOD_COLUMNS[period]])
+
+    @profiled('processor.get_series_analytics')
+    @cached_query
+    def get_series_analytics(self, dimensions=('vehicle_type', 'manufacturer'), period='monthly', window=3):
+        """Get rolling means, seasonality and percentile ranks for every series
+        
+        All series of the given dimensions are analysed together on one
+        (series x period) array built from a cube rollup.
+        
+        Args:
+            dimensions: Cube dimensions identifying a series
+            period: 'weekly', 'monthly', 'quarterly', 'fiscal_year' or 'yearly'
+            window: Rolling mean window in periods
+        
+        Returns:
+            DataFrame with one row per series: latest_registrations,
+            rolling_mean, percentile_rank, seasonal_lag (in periods) and
+            seasonal_strength
+        """
+        summary, _ = self._series_analytics(dimensions, period, window)
+        return summary.reset_index()
+
+    @profiled('processor.get_rolling_means')
+    @cached_query
+    def get_rolling_means(self, dimensions=('vehicle_type', 'manufacturer'), period='monthly', window=3):
+        """Get every series' rolling mean, one column per period start date"""
+        _, rolling = self._series_analytics(dimensions, period, window)
+        rolling.columns = period_start(rolling.columns, period)
+        return rolling
+
+    def _series_analytics(self, dimensions, period, window):
+        """Run analytics.series_analytics on a dimensions x period rollup"""
+        if not self.processed_data:
+            self.process_data()
+        if period == 'daily' or period not in PERIOD_COLUMNS:
+            raise ValueError(f"Series analytics need a weekly or coarser period, not {period}")
+        if isinstance(dimensions, str):
+            dimensions = [dimensions]
+        level = PERIOD_COLUMNS[period]
+        return series_analytics(self._rollup(list(dimensions) + [level]), level, window)
+
+    @profiled('processor.get_quarterly_totals')
+    @cached_query
+    def get_quarterly_totals(self):
+        """Get registrations with one row per year and one column per quarter"""
+        if not self.processed_data:
+            self.process_data()
+        return self._rollup(['year', 'quarter']).unstack('quarter', fill_value=0)
+
+    @profiled('processor.get_top_manufacturers')
+    @cached_query
     def get_top_manufacturers(self, vehicle_type=None, limit=10):
         """Get top manufacturers by registration count"""
-        df = self.processed_data['raw_data'].copy()
+        if self.backend is not None:
+            return self.backend.top_manufacturers(vehicle_type, limit)
+        totals = self._rollup(['vehicle_type', 'manufacturer'])
         
         if vehicle_type and vehicle_type != 'All':
-            df = df[df['vehicle_type'] == vehicle_type]
+            totals = totals[totals.index.get_level_values('vehicle_type') == vehicle_type]
             
-        top_manufacturers = df.groupby('manufacturer')['registrations'].sum().nlargest(limit)
+        top_manufacturers = totals.groupby(level='manufacturer', observed=True).sum().nlargest(limit)
         return top_manufacturers.to_dict()
 
+def _sum_by_codes(codes, sizes, weights):
+    """Sum weights by combinations of integer codes, in sorted code order
+    
+    Args:
+        codes: List of code arrays, one per key; codes of key i are in
+            [0, sizes[i])
+        sizes: Number of distinct codes of each key
+        weights: Values to sum, one per row
+    
+    Returns:
+        (key_codes, totals) with one code array per key and the int64 total
+        of each combination that occurs, like a sorted observed groupby
+    """
+    weights = np.asarray(weights)
+    if not codes:
+        return [], np.array([weights.sum()], dtype=np.int64)
+    combined = np.ravel_multi_index(codes, sizes)
+    cells = int(np.prod(sizes, dtype=np.float64))
+    if cells <= max(len(combined), 1 << 20):
+        # Dense grid: one bincount pass for counts and one for totals
+        observed = np.flatnonzero(np.bincount(combined, minlength=cells))
+        totals = np.bincount(combined, weights=weights, minlength=cells)[observed]
+    else:
+        observed, inverse = np.unique(combined, return_inverse=True)
+        totals = np.bincount(inverse, weights=weights, minlength=len(observed))
+    return list(np.unravel_index(observed, sizes)), np.rint(totals).astype(np.int64)
+
+def _quarter_column(dates):
+    """Derive 'Q1'-'Q4' labels from dates as a categorical"""
+    return pd.Categorical.from_codes(
+        (dates.dt.month.to_numpy() - 1) // 3, ['Q1', 'Q2', 'Q3', 'Q4']
+    )
+
+def _add_time_attributes(frame):
+    """Add year, month, quarter and the period keys to a frame with a 'date' column"""
+    frame['year'] = frame['date'].dt.year.astype(np.int16)
+    frame['month'] = frame['date'].dt.month.astype(np.int8)
+    frame['quarter'] = _quarter_column(frame['date'])
+    return add_period_keys(frame)
+
+def _time_columns(dates, columns):
+    """Derive time attribute columns (see _add_time_attributes) for every row
+    
+    Attributes are computed once per distinct date and spread to the rows,
+    so neither raw rows nor cube rows store them.
+    
+    Returns:
+        Dict of column name -> Series aligned with dates
+    """
+    values = dates.to_numpy()
+    if dates.is_monotonic_increasing:
+        starts = np.flatnonzero(np.concatenate([[len(values) > 0], values[1:] != values[:-1]]))
+        inverse = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(values))))
+        uniques = values[starts]
+    else:
+        inverse, uniques = pd.factorize(values)
+    attributes = _add_time_attributes(pd.DataFrame({'date': pd.DatetimeIndex(uniques)}))
+    return {
+        column: pd.Series(attributes[column].array.take(inverse), index=dates.index, name=column)
+        for column in columns
+    }
+
+def _sum_registrations(frame, keys):
+    """Sum a frame's registrations by key columns, sorted by key
+    
+    Narrow raw counts are summed as int64 so totals cannot overflow.
+    """
+    return frame['registrations'].astype(np.int64).groupby(keys, observed=True, sort=True).sum()
+
+def _column_buffer(column):
+    """Get the array holding a column's values (the codes of a categorical)"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.array.codes
+    return column.to_numpy()
+
+def _table_bytes(table, shared_with=None):
+    """Get the bytes held by a table, skipping columns that share shared_with's memory"""
+    total = 0
+    for column, nbytes in table.memory_usage(deep=True, index=True).items():
+        if (shared_with is not None and column in table.columns and column in shared_with.columns
+                and np.may_share_memory(_column_buffer(table[column]), _column_buffer(shared_with[column]))):
+            continue
+        total += int(nbytes)
+    return total
+
+def _aggregate_partition(descriptors, start, stop, date_dtype):
+    """Aggregate rows [start, stop) of shared-memory columns by cube key
+    
+    Runs in a worker process; returns cube rows with category codes rather
+    than labels for the dimensions.
+    """
+    blocks = []
+    try:
+        columns = {}
+        for name, (block_name, dtype, length) in descriptors.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            columns[name] = np.ndarray(length, np.dtype(dtype), buffer=block.buf)[start:stop].copy()
+    finally:
+        for block in blocks:
+            block.close()
+    
+    partition = pd.DataFrame(columns)
+    valid = np.ones(len(partition), dtype=bool)
+    for column in CUBE_DIMENSIONS[1:]:
+        valid &= partition[column].to_numpy() >= 0
+    partition = partition[valid]
+    partial = _sum_registrations(partition, [partition[column] for column in CUBE_DIMENSIONS]).reset_index()
+    partial['date'] = partial['date'].to_numpy().view(np.dtype(date_dtype))
+    return partial
+
 def main():
     """Test the data processor"""
     from data_scraper import VehicleDataScraper
@@ -7,11 +7,29 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 from utils import ensure_data_directory
+from config import DATA_CONFIG, STATE_REGIONS
+from vahan_fetcher import FetchTask, RegistrationFetcher
+from profiler import profiled
+
+# Manufacturers sold under each vehicle type
+MANUFACTURERS_BY_TYPE = {
+    '2W': ['Hero MotoCorp', 'Honda', 'Bajaj', 'TVS', 'Yamaha'],
+    '3W': ['Bajaj', 'TVS', 'Mahindra', 'Piaggio'],
+    '4W': ['Maruti Suzuki', 'Hyundai', 'Tata', 'Mahindra', 'Toyota']
+}
+
+# Inclusive range of daily base registrations per vehicle type
+BASE_REGISTRATION_RANGES = {
+    '2W': (8000, 15000),
+    '3W': (500, 2000),
+    '4W': (3000, 8000)
+}
 
 class VehicleDataScraper:
     def __init__(self):
         self.data = None
         
+    @profiled('scraper.generate_sample_data')
     def generate_sample_data(self):
         """Generate realistic sample data for demonstration"""
         print("Generating sample vehicle registration data...")
@@ -22,24 +40,12 @@ class VehicleDataScraper:
         
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
         
-        # Sample manufacturers for each vehicle type
-        manufacturers_2w = ['Hero MotoCorp', 'Honda', 'Bajaj', 'TVS', 'Yamaha']
-        manufacturers_3w = ['Bajaj', 'TVS', 'Mahindra', 'Piaggio']
-        manufacturers_4w = ['Maruti Suzuki', 'Hyundai', 'Tata', 'Mahindra', 'Toyota']
-        
         data_records = []
         
         for date in dates:
             for vehicle_type in ['2W', '3W', '4W']:
-                if vehicle_type == '2W':
-                    manufacturers = manufacturers_2w
-                    base_registrations = random.randint(8000, 15000)
-                elif vehicle_type == '3W':
-                    manufacturers = manufacturers_3w
-                    base_registrations = random.randint(500, 2000)
-                else:  # 4W
-                    manufacturers = manufacturers_4w
-                    base_registrations = random.randint(3000, 8000)
+                manufacturers = MANUFACTURERS_BY_TYPE[vehicle_type]
+                base_registrations = random.randint(*BASE_REGISTRATION_RANGES[vehicle_type])
                 
                 for manufacturer in manufacturers:
                     registrations = int(base_registrations * random.uniform(0.7, 1.3))
@@ -58,6 +64,135 @@ class VehicleDataScraper:
         self.data = pd.DataFrame(data_records)
         return self.data
     
+    @profiled('scraper.generate_bulk_data')
+    def generate_bulk_data(self, days=None, manufacturers_per_type=None, regions=None, per_region=False, seed=None):
+        """Generate large sample datasets column by column with NumPy
+        
+        Produces the same schema and value distributions as
+        generate_sample_data, but draws every column in one vectorized pass
+        from a seeded numpy.random.Generator. String columns are returned as
+        categoricals (date as an ordered one holding 'YYYY-MM-DD' strings)
+        and numeric columns use narrow integer dtypes.
+        
+        Args:
+            days: Number of consecutive days ending today (default: the
+                configured number of sample years)
+            manufacturers_per_type: Manufacturers per vehicle type; the
+                default lists are extended with synthetic names when larger
+            regions: Number of regions; the default regions are extended
+                with synthetic names when larger
+            per_region: Generate one row per region for every day and
+                manufacturer instead of one row with a random region
+            seed: Seed for the random generator
+        """
+        rng = np.random.default_rng(seed)
+        
+        if days is None:
+            days = DATA_CONFIG['sample_data_years'] * 365 + 1
+        dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=days, freq='D')
+        
+        # One slot per (vehicle type, manufacturer) pair, in generation order
+        vehicle_types = list(MANUFACTURERS_BY_TYPE)
+        slot_types = []
+        slot_manufacturers = []
+        for type_code, vehicle_type in enumerate(vehicle_types):
+            manufacturers = self._scale_names(
+                MANUFACTURERS_BY_TYPE[vehicle_type], manufacturers_per_type,
+                f'{vehicle_type} Manufacturer'
+            )
+            slot_types.extend([type_code] * len(manufacturers))
+            slot_manufacturers.extend(manufacturers)
+        
+        manufacturer_names = list(dict.fromkeys(slot_manufacturers))
+        manufacturer_codes = {name: code for code, name in enumerate(manufacturer_names)}
+        slot_types = np.array(slot_types, dtype=np.int8)
+        slot_manufacturers = np.array(
+            [manufacturer_codes[name] for name in slot_manufacturers], dtype=np.int32
+        )
+        region_names = self._scale_names(DATA_CONFIG['default_regions'], regions, 'Region')
+        
+        if per_region:
+            # One slot per (vehicle type, manufacturer, region)
+            slot_regions = np.tile(np.arange(len(region_names), dtype=np.int16), len(slot_types))
+            slot_types = np.repeat(slot_types, len(region_names))
+            slot_manufacturers = np.repeat(slot_manufacturers, len(region_names))
+        
+        n_slots = len(slot_types)
+        n_rows = days * n_slots
+        
+        # Daily base registrations per vehicle type, then per-row noise
+        low = np.array([BASE_REGISTRATION_RANGES[v][0] for v in vehicle_types])
+        high = np.array([BASE_REGISTRATION_RANGES[v][1] for v in vehicle_types])
+        base = rng.integers(low, high + 1, size=(days, len(vehicle_types)), dtype=np.int32)
+        noise = rng.random((days, n_slots), dtype=np.float32) * np.float32(0.6) + np.float32(0.7)
+        registrations = (base[:, slot_types] * noise).astype(np.int32).ravel()
+        
+        day_codes = np.repeat(np.arange(days, dtype=np.int32), n_slots)
+        months = dates.month.to_numpy().astype(np.int8)
+        if per_region:
+            region_codes = np.tile(slot_regions, days)
+        else:
+            region_codes = rng.integers(0, len(region_names), size=n_rows, dtype=np.int16)
+        
+        self.data = pd.DataFrame({
+            # Ordered, chronological categories keep min/max and date
+            # comparisons working as on the plain strings of get_data()
+            'date': pd.Categorical.from_codes(day_codes, dates.strftime('%Y-%m-%d'), ordered=True),
+            'year': np.repeat(dates.year.to_numpy().astype(np.int16), n_slots),
+            'month': np.repeat(months, n_slots),
+            'quarter': pd.Categorical.from_codes(
+                np.repeat((months - 1) // 3, n_slots), ['Q1', 'Q2', 'Q3', 'Q4']
+            ),
+            'vehicle_type': pd.Categorical.from_codes(np.tile(slot_types, days), vehicle_types),
+            'manufacturer': pd.Categorical.from_codes(
+                np.tile(slot_manufacturers, days), manufacturer_names
+            ),
+            'registrations': registrations,
+            'region': pd.Categorical.from_codes(region_codes, region_names)
+        })
+        return self.data
+    
+    @profiled('scraper.fetch_registrations')
+    def fetch_registrations(self, states=None, months=None, vehicle_classes=None, **fetcher_options):
+        """Fetch state x month x vehicle-class registration pages concurrently
+        
+        Pages are fetched by a bounded worker pool with pooled connections,
+        per-host rate limiting and retries, and each page is checkpointed
+        under data/raw so an interrupted crawl resumes where it stopped.
+        
+        Args:
+            states: State codes (default: all states in STATE_REGIONS)
+            months: Months as 'YYYY-MM' (default: the last 12 months)
+            vehicle_classes: Vehicle classes (default: 2W, 3W and 4W)
+            **fetcher_options: Overrides for FETCH_CONFIG (base_url,
+                max_workers, requests_per_second, retries, ...)
+        """
+        ensure_data_directory()
+        states = states or list(STATE_REGIONS)
+        if months is None:
+            end = pd.Timestamp.now().to_period('M')
+            months = [str(end - i) for i in range(12, 0, -1)]
+        vehicle_classes = vehicle_classes or DATA_CONFIG['default_vehicle_types']
+        
+        tasks = [
+            FetchTask(state, month, vehicle_class)
+            for state in states for month in months for vehicle_class in vehicle_classes
+        ]
+        self.fetcher = RegistrationFetcher(**fetcher_options)
+        print(f"Fetching {len(tasks)} registration pages with {self.fetcher.max_workers} workers...")
+        self.data = self.fetcher.fetch_all(tasks)
+        
+        if self.fetcher.failures:
+            print(f"Failed to fetch {len(self.fetcher.failures)} pages")
+        return self.data
+    
+    def _scale_names(self, names, count, prefix):
+        """Truncate or extend a list of names to the requested count"""
+        if count is None:
+            return list(names)
+        extra = [f'{prefix} {i:03d}' for i in range(len(names) + 1, count + 1)]
+        return list(names[:count]) + extra
+    
     def _get_quarter(self, month):
         """Get quarter from month"""
         if month <= 3:
@@ -0,0 +1,186 @@
+"""
+Persistent Aggregate Cache for Vehicle Registration Dashboard
+On-disk cache of derived tables keyed by input content hash and code version
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import DISK_CACHE_CONFIG
+
+def code_version(modules):
+    """Hash the source files of the given modules
+
+    Any edit to the code that computes an aggregate changes the version,
+    so entries written by older code are never read after a deploy. The
+    pandas and numpy versions are included too, since pickled frames may
+    not load under other releases.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"pandas={pd.__version__};numpy={np.__version__}".encode())
+    for name in sorted(modules):
+        with open(sys.modules[name].__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def partition_hashes(data, keys):
+    """Hash the rows of each partition of a frame
+
+    Args:
+        data: DataFrame whose partitions are contiguous runs of rows
+        keys: Integer partition key of each row (e.g. month keys)
+
+    Returns:
+        Dict of partition key -> (start, stop, digest). The digest covers
+        the column names and the row values, not the index.
+    """
+    keys = np.asarray(keys)
+    if not len(keys):
+        return {}
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    boundaries = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1, [len(keys)]])
+    header = ','.join(map(str, data.columns)).encode()
+    partitions = {}
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        digest = hashlib.sha256(header)
+        digest.update(row_hashes[start:stop].tobytes())
+        partitions[int(keys[start])] = (int(start), int(stop), digest.hexdigest())
+    return partitions
+
+def combine_hashes(*parts):
+    """Hash any number of strings (or reprs of values) into one hex digest"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class DiskCache:
+    """Directory of pickled derived tables, one file per (name, key)
+
+    Entries are immutable: a changed input gives a new key, so a stale
+    entry is simply never read again. Files are written to a temporary name
+    and renamed, so a reader never sees a partial entry. Once the directory
+    outgrows max_bytes, the least recently read entries are removed.
+
+    The directory size is tracked as entries are written, so it is only
+    walked on the first write and when entries must be removed.
+
+    Only point this at a directory the dashboard alone writes to; entries
+    are unpickled when read.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or DISK_CACHE_CONFIG['root']
+        self.max_bytes = max_bytes or DISK_CACHE_CONFIG['max_bytes']
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None
+
+    def get(self, name, key):
+        """Get a cached entry, returning (found, value)"""
+        path = self._path(name, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except Exception:
+            # Truncated entries or ones pickled by other library versions
+            # (AttributeError, ImportError, TypeError, ...) are discarded
+            self.misses += 1
+            self._remove(path)
+            return False, None
+        # Reading marks the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return True, value
+
+    def set(self, name, key, value):
+        """Store an entry, removing the least recently used ones over max_bytes"""
+        path = self._path(name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry_size for _, entry_size, _ in self._entries())
+            try:
+                self._total_bytes -= os.stat(path).st_size
+            except FileNotFoundError:
+                pass
+            os.replace(temporary, path)
+            self._total_bytes += size
+        self._prune()
+
+    def stats(self):
+        """Get hit/miss counters and the size of the cache directory"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries()),
+            'bytes': sum(size for _, size, _ in self._entries())
+        }
+
+    def _path(self, name, key):
+        """Get the file of an entry"""
+        return os.path.join(self.root, name, f"{key}.pkl")
+
+    def _entries(self):
+        """List (path, size, last used) of every entry"""
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for filename in files:
+                if filename.endswith('.pkl'):
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _remove(self, path):
+        """Delete an entry file, releasing its size"""
+        with self._lock:
+            try:
+                size = os.stat(path).st_size
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _prune(self):
+        """Remove the least recently used entries until the cache fits max_bytes"""
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            # Only now are entries listed, which also corrects the tracked
+            # size for files other processes wrote or removed
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._total_bytes = total
@@ -0,0 +1,246 @@
+"""
+Raw Data Ingestion for Vehicle Registration Dashboard
+Discovers raw export files, parses them in parallel with explicit dtypes and
+validates them against the data schema
+"""
+
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import INGEST_CONFIG, DATA_CONFIG
+from profiler import profiled
+from utils import CATEGORICAL_COLUMNS, save_data
+
+# Columns every raw file must have; year, month and quarter are derived
+# from the date when missing (see data/README.md)
+REQUIRED_COLUMNS = ['date', 'vehicle_type', 'manufacturer', 'registrations', 'region']
+
+# Rows sharing these columns are one registration count; 'state' is added
+# when the files have it, so state rows of one region are kept apart
+KEY_COLUMNS = ['date', 'vehicle_type', 'manufacturer', 'region']
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.json')
+
+def discover_files(patterns=None, directory=None):
+    """Find raw files matching glob patterns, in sorted path order
+
+    Args:
+        patterns: Glob pattern or list of patterns relative to directory
+            (default: INGEST_CONFIG['patterns'])
+        directory: Root directory (default: INGEST_CONFIG['directory'])
+    """
+    directory = directory or INGEST_CONFIG['directory']
+    patterns = patterns or INGEST_CONFIG['patterns']
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.join(directory, pattern), recursive=True))
+    return sorted(path for path in paths if path.endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(path))
+
+@profiled('ingest.ingest_files')
+def ingest_files(patterns=None, directory=None, workers=None, output=None):
+    """Parse, validate and combine raw files into one typed frame
+
+    Files are parsed in a process pool, INGEST_CONFIG['files_per_task']
+    files per task. Rows failing the schema are dropped and files that
+    cannot be parsed are skipped; both are listed in the returned
+    problems. Rows with the same key are de-duplicated, keeping the row
+    from the last file in path order.
+
+    Args:
+        patterns, directory: Files to read (see discover_files)
+        workers: Worker processes (default: INGEST_CONFIG['workers'], i.e.
+            every core); a single worker or file is parsed in-process
+        output: Optional file name under data/processed to save the frame
+            to, e.g. 'registrations.parquet' for a year/month partitioned
+            dataset
+
+    Returns:
+        (data, problems) where data is sorted by date and problems is a
+        list of (path, message) tuples
+    """
+    paths = discover_files(patterns, directory)
+    workers = min(workers or INGEST_CONFIG['workers'] or os.cpu_count() or 1, max(len(paths), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse_raw_file, paths, chunksize=INGEST_CONFIG['files_per_task']))
+    else:
+        results = [parse_raw_file(path) for path in paths]
+
+    frames = [frame for frame, _ in results if frame is not None and not frame.empty]
+    problems = [problem for _, file_problems in results for problem in file_problems]
+    data = _combine(frames)
+
+    keys = KEY_COLUMNS + (['state'] if 'state' in data.columns else [])
+    rows = len(data)
+    data = data.drop_duplicates(subset=keys, keep='last')
+    if len(data) < rows:
+        problems.append((directory or INGEST_CONFIG['directory'], f"{rows - len(data)} duplicate rows removed"))
+    data = data.sort_values('date', kind='stable', ignore_index=True)
+
+    if output:
+        save_data(data, output)
+    return data, problems
+
+def parse_raw_file(path):
+    """Parse and validate one raw file
+
+    Returns:
+        (data, problems) where data holds the schema columns, plus any
+        extra source columns, with schema dtypes, or None when the file
+        cannot be used
+    """
+    try:
+        if path.endswith('.csv'):
+            data = _read_csv(path)
+        elif path.endswith('.xlsx'):
+            data = _read_xlsx(path)
+        else:
+            data = pd.read_json(path, dtype=False)
+    except Exception as e:
+        return None, [(path, f"unreadable: {e}")]
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in data.columns]
+    if missing:
+        return None, [(path, f"missing columns: {', '.join(missing)}")]
+    return validate_frame(data, path)
+
+def validate_frame(data, source=''):
+    """Cast a parsed frame to the schema dtypes and drop invalid rows
+
+    A row is invalid when its date is not YYYY-MM-DD, a key column is
+    empty, vehicle_type or region is not a configured value, registrations
+    is negative or not a whole number, or year/month disagree with the date.
+
+    Returns:
+        (data, problems) as for parse_raw_file
+    """
+    problems = []
+    dates = _parse_dates(data['date'])
+    registrations = pd.to_numeric(data['registrations'], errors='coerce').to_numpy(dtype=np.float64)
+    categories = {column: _as_category(data[column]) for column in ['vehicle_type', 'manufacturer', 'region']}
+
+    checks = {
+        'invalid date': dates.isna().to_numpy(),
+        'empty manufacturer': (categories['manufacturer'].isna() | (categories['manufacturer'] == '')).to_numpy(),
+        'unknown vehicle_type': ~categories['vehicle_type'].isin(DATA_CONFIG['default_vehicle_types']).to_numpy(),
+        'unknown region': ~categories['region'].isin(DATA_CONFIG['default_regions']).to_numpy(),
+        'invalid registrations': ~(np.isfinite(registrations) & (registrations >= 0)
+                                   & (registrations == np.floor(registrations)))
+    }
+    for column, derived in [('year', dates.dt.year), ('month', dates.dt.month)]:
+        if column in data.columns:
+            stated = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=np.float64)
+            checks[f"{column} does not match date"] = stated != derived.to_numpy(dtype=np.float64)
+
+    # Each invalid row is reported under the first check it fails
+    invalid = np.zeros(len(data), dtype=bool)
+    for problem, mask in checks.items():
+        mask = mask & ~invalid
+        if mask.any():
+            problems.append((source, f"{int(mask.sum())} rows dropped: {problem}"))
+            invalid |= mask
+
+    valid = ~invalid
+    dates = dates[valid].reset_index(drop=True)
+    typed = pd.DataFrame({
+        'date': dates,
+        'year': dates.dt.year.astype(np.int16),
+        'month': dates.dt.month.astype(np.int8),
+        'quarter': pd.Categorical.from_codes((dates.dt.month.to_numpy() - 1) // 3, ['Q1', 'Q2', 'Q3', 'Q4']),
+        'vehicle_type': categories['vehicle_type'][valid].reset_index(drop=True),
+        'manufacturer': categories['manufacturer'][valid].reset_index(drop=True),
+        'registrations': registrations[valid].astype(np.int64),
+        'region': categories['region'][valid].reset_index(drop=True)
+    })
+    for column in CATEGORICAL_COLUMNS:
+        typed[column] = typed[column].cat.remove_unused_categories()
+
+    # Extra source columns (e.g. state) are kept as they are
+    for column in data.columns:
+        if column not in typed.columns and column != 'month_name':
+            typed[column] = data[column][valid].reset_index(drop=True)
+    return typed, problems
+
+def _read_csv(path):
+    """Read a CSV file with pyarrow's streaming reader using explicit column types
+
+    The file is read in blocks of INGEST_CONFIG['csv_block_bytes'], each
+    converted to pandas as it arrives, so the whole file is never held as
+    text or as an Arrow table. Text columns are dictionary-encoded while
+    reading, so each distinct value (e.g. a date or manufacturer name) is
+    converted only once per block.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    text = pa.dictionary(pa.int32(), pa.string())
+    column_types = {column: text for column in ['date', 'quarter', 'vehicle_type', 'manufacturer', 'region', 'state']}
+    column_types.update({'year': pa.float64(), 'month': pa.float64(), 'registrations': pa.float64()})
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=INGEST_CONFIG['csv_block_bytes']),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types)
+    )
+    frames = [batch.to_pandas() for batch in reader]
+    if not frames:
+        return reader.schema.empty_table().to_pandas()
+    # Each block has its own dictionaries; _combine merges the categories
+    return _combine(frames)
+
+def _read_xlsx(path):
+    """Read the first sheet of an Excel file with openpyxl's streaming reader
+
+    The read-only reader yields cell values row by row without building
+    the workbook's cell objects, which is far faster than pd.read_excel.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        names = [str(name).strip() if name is not None else '' for name in header]
+        values = [list(row) for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+    return pd.DataFrame(values, columns=names) if values else pd.DataFrame(columns=names)
+
+def _parse_dates(dates):
+    """Parse YYYY-MM-DD dates, each distinct value once; invalid dates become NaT"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return pd.Series(pd.to_datetime(dates).to_numpy())
+    if not isinstance(dates.dtype, pd.CategoricalDtype):
+        # Excel cells may hold datetimes rather than text
+        dates = dates.map(lambda value: value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else value)
+        dates = dates.astype('category')
+    categories = pd.to_datetime(dates.cat.categories.astype(str), format='%Y-%m-%d', errors='coerce')
+    return pd.Series(categories.take(dates.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT))
+
+def _as_category(values):
+    """Convert a column to a categorical with a fresh index"""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    return values.reset_index(drop=True)
+
+def _combine(frames):
+    """Concatenate typed frames, merging their categories"""
+    if not frames:
+        return validate_frame(pd.DataFrame(columns=REQUIRED_COLUMNS))[0]
+    names = list(dict.fromkeys(column for frame in frames for column in frame.columns))
+    columns = {}
+    for column in names:
+        parts = [frame[column] if column in frame.columns else pd.Series([None] * len(frame), dtype=object)
+                 for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[column] = pd.api.types.union_categoricals(parts, ignore_order=True)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
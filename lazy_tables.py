@@ -0,0 +1,102 @@
+"""
+Lazy Tables for Vehicle Registration Dashboard
+Demand-driven, memoized derived tables with dependency tracking
+"""
+
+import threading
+from collections.abc import MutableMapping
+
+class LazyTables(MutableMapping):
+    """Mapping of stored tables and derived tables built on first access
+
+    A derived table is registered with a builder and the names of the
+    tables it is built from. It is built the first time it is read, from
+    its (possibly also derived) dependencies, and memoized. Storing a new
+    value under a name discards every memoized table that depends on it,
+    directly or transitively, so they are rebuilt on their next read.
+
+    Membership tests, iteration and len() never build anything. Reads are
+    serialized by a lock, so concurrent sessions build each table once.
+    """
+
+    def __init__(self, tables=None):
+        self._values = dict(tables or {})
+        self._builders = {}
+        self._dependents = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, builder, depends_on=()):
+        """Register a derived table
+
+        Args:
+            name: Table name
+            builder: Callable taking the dependency tables, in order, and
+                returning the derived table
+            depends_on: Names of the tables the builder reads
+        """
+        with self._lock:
+            self._builders[name] = (builder, tuple(depends_on))
+            for dependency in depends_on:
+                self._dependents.setdefault(dependency, set()).add(name)
+            self._values.pop(name, None)
+            self._invalidate_dependents(name)
+
+    def is_built(self, name):
+        """Check whether a table currently holds a value"""
+        return name in self._values
+
+    def built_items(self):
+        """Get (name, table) pairs of the tables that hold a value, building none"""
+        with self._lock:
+            return list(self._values.items())
+
+    def invalidate(self, name):
+        """Discard a derived table and everything built from it"""
+        with self._lock:
+            if name in self._builders:
+                self._values.pop(name, None)
+            self._invalidate_dependents(name)
+
+    def _invalidate_dependents(self, name):
+        """Discard the memoized tables built from name (lock must be held)"""
+        for dependent in self._dependents.get(name, ()):
+            self._values.pop(dependent, None)
+            self._invalidate_dependents(dependent)
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            if name not in self._builders:
+                raise KeyError(name)
+            builder, depends_on = self._builders[name]
+            value = builder(*[self[dependency] for dependency in depends_on])
+            self._values[name] = value
+            return value
+
+    def __setitem__(self, name, value):
+        with self._lock:
+            self._values[name] = value
+            self._invalidate_dependents(name)
+
+    def __delitem__(self, name):
+        with self._lock:
+            if name not in self._values and name not in self._builders:
+                raise KeyError(name)
+            self._values.pop(name, None)
+            self._builders.pop(name, None)
+            self._invalidate_dependents(name)
+
+    def __contains__(self, name):
+        return name in self._values or name in self._builders
+
+    def __iter__(self):
+        return iter(list(self._values) + [name for name in self._builders if name not in self._values])
+
+    def __len__(self):
+        return len(self._values.keys() | self._builders.keys())
+
+    def __repr__(self):
+        built = ', '.join(self._values)
+        pending = ', '.join(name for name in self._builders if name not in self._values)
+        return f"LazyTables(built=[{built}], pending=[{pending}])"
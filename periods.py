@@ -0,0 +1,111 @@
+"""
+Period Engine for Vehicle Registration Dashboard
+Year-aware integer period keys, period totals and rolling windows
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_CONFIG
+
+# Cube column holding each period's key; consecutive periods have
+# consecutive keys, so the previous period is always key - 1
+PERIOD_COLUMNS = {
+    'daily': 'date',
+    'weekly': 'week_key',
+    'monthly': 'month_key',
+    'quarterly': 'quarter_key',
+    'fiscal_year': 'fiscal_year_key',
+    'yearly': 'year'
+}
+
+# Weeks start on Monday; 1970-01-05 is the first Monday after the epoch
+_FIRST_MONDAY = pd.Timestamp('1970-01-05')
+
+def period_keys(dates, period):
+    """Get the integer period key of each date
+
+    Keys are weeks since 1970-01-05, year * 12 + month - 1, year * 4 +
+    quarter - 1 and the calendar year a fiscal year starts in (April-March
+    by default, so Feb 2025 is in fiscal year 2024). Daily keys are the
+    dates themselves.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if period == 'daily':
+        return dates.to_numpy()
+    if period == 'weekly':
+        days = (dates - _FIRST_MONDAY).days.to_numpy()
+        return (days // 7).astype(np.int32)
+    years = dates.year.to_numpy().astype(np.int32)
+    months = dates.month.to_numpy().astype(np.int32)
+    if period == 'monthly':
+        return years * 12 + months - 1
+    if period == 'quarterly':
+        return years * 4 + (months - 1) // 3
+    if period == 'fiscal_year':
+        return years - (months < DATA_CONFIG['fiscal_year_start_month']).astype(np.int32)
+    if period == 'yearly':
+        return years
+    raise ValueError(f"Unsupported period: {period}")
+
+def period_start(keys, period):
+    """Get the first day of each period key"""
+    if period == 'daily':
+        return pd.DatetimeIndex(keys)
+    keys = np.asarray(keys, dtype=np.int64)
+    if period == 'weekly':
+        return _FIRST_MONDAY + pd.to_timedelta(keys * 7, unit='D')
+    if period == 'monthly':
+        years, months = keys // 12, keys % 12 + 1
+    elif period == 'quarterly':
+        years, months = keys // 4, (keys % 4) * 3 + 1
+    elif period == 'fiscal_year':
+        years, months = keys, np.full(len(keys), DATA_CONFIG['fiscal_year_start_month'])
+    elif period == 'yearly':
+        years, months = keys, np.ones(len(keys), dtype=np.int64)
+    else:
+        raise ValueError(f"Unsupported period: {period}")
+    return pd.to_datetime(pd.DataFrame({'year': years, 'month': months, 'day': 1}))
+
+def period_label(key, period):
+    """Format a period key for display, e.g. '2024-Q3' or 'FY2024-25'"""
+    key = int(key)
+    if period == 'quarterly':
+        return f"{key // 4}-Q{key % 4 + 1}"
+    if period == 'monthly':
+        return f"{key // 12}-{key % 12 + 1:02d}"
+    if period == 'fiscal_year':
+        return f"FY{key}-{(key + 1) % 100:02d}"
+    if period == 'weekly':
+        return f"W{period_start([key], period)[0]:%Y-%m-%d}"
+    return str(key)
+
+def add_period_keys(frame):
+    """Add every period key column to a frame with a 'date' column"""
+    dates = frame['date']
+    for period, column in PERIOD_COLUMNS.items():
+        if column not in frame.columns:
+            frame[column] = period_keys(dates, period)
+    return frame
+
+def dense_totals(totals):
+    """Spread totals indexed by integer period key over every key in range
+
+    Periods with no registrations get 0, so a key's total is at position
+    key - first key and neighbouring periods are neighbouring positions.
+    """
+    if totals.empty:
+        return totals
+    keys = totals.index.to_numpy().astype(np.int64)
+    first = keys.min()
+    values = np.zeros(keys.max() - first + 1, dtype=np.int64)
+    np.add.at(values, keys - first, totals.to_numpy())
+    return pd.Series(values, index=pd.RangeIndex(first, keys.max() + 1, name=totals.index.name),
+                     name=totals.name)
+
+def rolling_totals(totals, window):
+    """Sum dense period totals over a trailing window of `window` periods"""
+    values = totals.to_numpy()
+    cumulative = np.concatenate([[0], np.cumsum(values)])
+    starts = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    return pd.Series(cumulative[1:] - cumulative[starts], index=totals.index, name=totals.name)
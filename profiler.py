@@ -0,0 +1,243 @@
+"""
+Pipeline Profiler for Vehicle Registration Dashboard
+Named timing spans with row counts, memory deltas and percentile summaries
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+
+import numpy as np
+
+from config import PROFILER_CONFIG
+
+# Percentiles reported per span
+PERCENTILES = (50, 90, 99)
+
+def current_rss_bytes():
+    """Get the current resident set size of this process, or None if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS mark (VmHWM) of this process; False if not possible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_bytes():
+    """Get the peak RSS mark (VmHWM) of this process, or None if unknown"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+class PeakRSS:
+    """Context manager recording the peak resident set size within a block
+
+    Where the kernel's peak mark can be reset (Linux) it is reset on entry
+    and read on exit, so transient peaks are never missed. Elsewhere a
+    thread samples current_rss_bytes() every `interval` seconds. `peak_bytes`
+    is None when RSS cannot be read at all.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.peak_bytes = None
+        self._stop = None
+        self._thread = None
+
+    def __enter__(self):
+        self.peak_bytes = current_rss_bytes()
+        if not _reset_peak_rss() and self.peak_bytes is not None:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._sample_once()
+        else:
+            peak = _peak_rss_bytes()
+            if peak is not None:
+                self.peak_bytes = peak
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._sample_once()
+
+    def _sample_once(self):
+        rss = current_rss_bytes()
+        if rss is not None and rss > self.peak_bytes:
+            self.peak_bytes = rss
+
+def count_rows(value):
+    """Get the row count of a DataFrame, Series, array or sized collection"""
+    shape = getattr(value, 'shape', None)
+    if shape:
+        return int(shape[0])
+    if isinstance(value, (list, tuple, dict)):
+        return len(value)
+    return None
+
+class _NullSpan:
+    """Span returned while profiling is disabled; every operation is a no-op"""
+
+    rows_in = None
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """One timed section; set rows_in/rows_out inside the with block"""
+
+    def __init__(self, profiler, name, rows_in=None):
+        self.profiler = profiler
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self._rss = current_rss_bytes() if self.profiler.track_memory else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        memory_delta = None
+        if self._rss is not None:
+            # RSS may become unreadable; then the delta is simply not recorded
+            rss = current_rss_bytes()
+            memory_delta = rss - self._rss if rss is not None else None
+        self.profiler.record(self.name, seconds, self.rows_in, self.rows_out, memory_delta)
+        return False
+
+class Profiler:
+    def __init__(self, enabled=False, max_samples=1000, track_memory=True):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self.track_memory = track_memory
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, rows_in=None):
+        """Time a block: `with profiler.span('stage', rows_in=n) as s: ...`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, rows_in)
+
+    def profiled(self, name=None):
+        """Decorate a function so each call is recorded as a span
+
+        Rows in are taken from the first DataFrame-like positional argument
+        and rows out from the result, when they have a length.
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                rows_in = next((count_rows(a) for a in args if hasattr(a, 'shape')), None)
+                with Span(self, span_name, rows_in) as span:
+                    result = func(*args, **kwargs)
+                    span.rows_out = count_rows(result)
+                return result
+
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds, rows_in=None, rows_out=None, memory_delta=None):
+        """Add one span sample, keeping the most recent max_samples per name"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append((seconds, rows_in, rows_out, memory_delta))
+
+    def reset(self):
+        """Drop all recorded samples"""
+        with self._lock:
+            self._samples.clear()
+
+    def stats(self):
+        """Summarize samples per span: count, total, mean, percentiles and rows"""
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+
+        summary = {}
+        for name, samples in sorted(snapshot.items()):
+            seconds = np.array([s[0] for s in samples])
+            stats = {
+                'count': len(samples),
+                'total_seconds': float(seconds.sum()),
+                'mean_seconds': float(seconds.mean()),
+                'max_seconds': float(seconds.max())
+            }
+            for percentile, value in zip(PERCENTILES, np.percentile(seconds, PERCENTILES)):
+                stats[f'p{percentile}_seconds'] = float(value)
+            for index, field in [(1, 'rows_in'), (2, 'rows_out'), (3, 'memory_delta_bytes')]:
+                values = [s[index] for s in samples if s[index] is not None]
+                stats[f'mean_{field}'] = float(np.mean(values)) if values else None
+            summary[name] = stats
+        return summary
+
+    def to_json(self, indent=2):
+        """Dump the span summary as JSON"""
+        return json.dumps(self.stats(), indent=indent)
+
+    def to_prometheus(self, prefix='dashboard'):
+        """Dump the span summary in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_span_seconds Wall time of dashboard pipeline spans",
+            f"# TYPE {prefix}_span_seconds summary"
+        ]
+        stats = self.stats()
+        for name, span in stats.items():
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for percentile in PERCENTILES:
+                lines.append(f'{prefix}_span_seconds{{span="{label}",quantile="{percentile / 100}"}} '
+                             f'{span[f"p{percentile}_seconds"]}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{label}"}} {span["total_seconds"]}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{label}"}} {span["count"]}')
+
+        for field, description in [('rows_out', 'Mean rows produced'),
+                                   ('memory_delta_bytes', 'Mean resident memory change')]:
+            metric = f"{prefix}_span_{field}"
+            lines.append(f"# HELP {metric} {description} per span")
+            lines.append(f"# TYPE {metric} gauge")
+            for name, span in stats.items():
+                if span[f'mean_{field}'] is not None:
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{metric}{{span="{label}"}} {span[f"mean_{field}"]}')
+        return '\n'.join(lines) + '\n'
+
+# Process-wide profiler shared by the scraper, processor and app
+profiler = Profiler(**PROFILER_CONFIG)
+span = profiler.span
+profiled = profiler.profiled
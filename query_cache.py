@@ -0,0 +1,148 @@
+"""
+Query Result Cache for Vehicle Registration Dashboard
+Memory-bounded LRU cache with TTL eviction for processor query results
+"""
+
+import sys
+import time
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+class QueryCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl_seconds=600):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Get a cached value, returning (found, value)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                self._remove(key)
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry['value']
+
+    def set(self, key, value, size=None):
+        """Store a value, evicting least recently used entries over the size limit
+        
+        size overrides the estimated size in bytes for values estimate_size
+        cannot measure.
+        """
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'value': value, 'size': size, 'created': time.monotonic()}
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all cached values"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Get hit/miss counters and current cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes
+            }
+
+    def _is_expired(self, entry):
+        """Check whether an entry is older than the TTL"""
+        return self.ttl_seconds is not None and time.monotonic() - entry['created'] > self.ttl_seconds
+
+    def _remove(self, key):
+        """Remove an entry and release its size (lock must be held)"""
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry['size']
+
+    def __getstate__(self):
+        """Pickle the cache settings only; cached results are not carried over"""
+        return {'max_bytes': self.max_bytes, 'ttl_seconds': self.ttl_seconds}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+def estimate_size(value):
+    """Estimate the memory held by a query result in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+def normalize_argument(value):
+    """Normalize a filter argument so equivalent selections share a cache key"""
+    if value is None or (isinstance(value, str) and value == 'All'):
+        return None
+    if isinstance(value, (datetime, date, np.datetime64, pd.Timestamp)):
+        return pd.Timestamp(value)
+    if isinstance(value, (list, tuple, set)):
+        return tuple(normalize_argument(v) for v in value)
+    return value
+
+def cached_query(method):
+    """Cache a processor query by (method, normalized arguments, data version)
+    
+    The decorated method's owner must provide query_cache and data_version
+    attributes. Cached results are shared between callers and must not be
+    modified in place.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = tuple(
+            (name, normalize_argument(value))
+            for name, value in list(bound.arguments.items())[1:]
+        )
+        version = self.data_version
+        key = (method.__name__, arguments, version)
+        
+        found, result = self.query_cache.get(key)
+        if found:
+            return result
+        result = method(self, *args, **kwargs)
+        if self.data_version == version:
+            self.query_cache.set(key, result)
+        return result
+    
+    return wrapper
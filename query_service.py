@@ -0,0 +1,306 @@
+"""
+Headless Query Service for Vehicle Registration Dashboard
+Serves processor queries as JSON or Arrow IPC streams over local HTTP
+
+Usage:
+    python query_service.py                    # serve the current shared store version
+    python query_service.py --port 8770 --version <name>
+
+Endpoints (GET, query string arguments):
+    /growth                 YoY/QoQ growth metrics
+    /growth_table           dimensions=vehicle_type,manufacturer
+    /summary                Summary statistics
+    /trend                  period, window, start_date, end_date
+    /top_manufacturers      vehicle_type, limit
+    /filtered               start_date, end_date, vehicle_type, manufacturer
+    /health                 Served data version
+    /metrics                Per-endpoint latency (Prometheus text, or format=json)
+
+Tables are returned as JSON records, or as an Arrow IPC stream with
+format=arrow or an Accept: application/vnd.apache.arrow.stream header.
+"""
+
+import io
+import json
+import gzip
+import argparse
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from config import QUERY_SERVICE_CONFIG
+from data_processor import VehicleDataProcessor
+from profiler import Profiler, count_rows
+from query_cache import QueryCache
+from shared_store import SharedStore
+
+ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_TYPE = 'application/json'
+
+class QueryError(ValueError):
+    """Invalid request arguments, answered with 400 Bad Request"""
+
+def _text(params, name, default=None):
+    """Get a query string argument; 'All' and empty values mean no filter"""
+    value = params.get(name, default)
+    return None if value in ('', 'All') else value
+
+def _integer(params, name, default=None):
+    """Get a whole-number query string argument"""
+    value = _text(params, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer") from None
+
+def _growth(processor, params):
+    return processor.calculate_growth_metrics()
+
+def _growth_table(processor, params):
+    dimensions = _text(params, 'dimensions', 'manufacturer')
+    return processor.get_growth_table(dimensions.split(',') if dimensions else [])
+
+def _summary(processor, params):
+    return processor.get_summary_statistics()
+
+def _trend(processor, params):
+    trend = processor.get_trend_data(period=_text(params, 'period', 'monthly'), window=_integer(params, 'window'))
+    start_date, end_date = _text(params, 'start_date'), _text(params, 'end_date')
+    if start_date:
+        trend = trend[trend['period'] >= pd.Timestamp(start_date)]
+    if end_date:
+        trend = trend[trend['period'] <= pd.Timestamp(end_date)]
+    return trend
+
+def _top_manufacturers(processor, params):
+    top = processor.get_top_manufacturers(_text(params, 'vehicle_type'), _integer(params, 'limit', 10))
+    return pd.DataFrame({'manufacturer': list(top), 'registrations': list(top.values())})
+
+def _filtered(processor, params):
+    return processor.get_filtered_data(_text(params, 'start_date'), _text(params, 'end_date'),
+                                       _text(params, 'vehicle_type'), _text(params, 'manufacturer'))
+
+# Query endpoints and the function answering each from the processor
+ENDPOINTS = {
+    '/growth': _growth,
+    '/growth_table': _growth_table,
+    '/summary': _summary,
+    '/trend': _trend,
+    '/top_manufacturers': _top_manufacturers,
+    '/filtered': _filtered
+}
+
+def accepts_gzip(header):
+    """Check whether an Accept-Encoding header allows gzip
+
+    Codings are comma-separated, each with an optional q-value; gzip is
+    allowed when it, or '*' if gzip is not listed, has q > 0.
+    """
+    qualities = {}
+    for item in (header or '').split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+def to_json_value(value):
+    """Convert a query result to plain JSON types (numpy scalars, dates, keys)"""
+    if isinstance(value, dict):
+        return {str(to_json_value(key)): to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    return value
+
+def encode_result(result, arrow=False):
+    """Encode a query result as (body, content type)
+
+    DataFrames become JSON records or an Arrow IPC stream; other results
+    (e.g. growth metrics) are JSON only.
+    """
+    if isinstance(result, pd.DataFrame):
+        if arrow:
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            sink = io.BytesIO()
+            with ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue(), ARROW_STREAM_TYPE
+        return result.to_json(orient='records', date_format='iso').encode(), JSON_TYPE
+    if arrow:
+        raise QueryError("This endpoint returns JSON only")
+    return json.dumps(to_json_value(result)).encode(), JSON_TYPE
+
+class QueryServiceServer(ThreadingHTTPServer):
+    """HTTP server answering processor queries from one warm processor
+
+    Requests run concurrently on worker threads over HTTP/1.1 keep-alive
+    connections. Processor results are cached by the processor's query
+    cache; encoded (and compressed) bodies are cached per data version, so
+    a repeated request is answered without re-encoding. Every endpoint's
+    latency is recorded in a dedicated profiler.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, processor, host=None, port=None):
+        super().__init__((host or QUERY_SERVICE_CONFIG['host'],
+                          QUERY_SERVICE_CONFIG['port'] if port is None else port), _QueryHandler)
+        self.processor = processor
+        self.metrics = Profiler(enabled=True, max_samples=QUERY_SERVICE_CONFIG['max_samples'], track_memory=False)
+        self.response_cache = QueryCache(max_bytes=QUERY_SERVICE_CONFIG['response_cache_bytes'], ttl_seconds=None)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def answer(self, path, params, arrow=False, compress=False):
+        """Get (status, body, content type, compressed) for a query request
+
+        Every request, cached or not, is timed under the endpoint's name;
+        requests failing with an unexpected error are timed under
+        "GET <path> 500" instead, so failures show up in the metrics.
+        """
+        with self.metrics.span(f"GET {path}") as span:
+            processor = self.processor
+            key = (path, tuple(sorted(params.items())), arrow, compress,
+                   processor.shared_version, processor.data_version)
+            found, response = self.response_cache.get(key)
+            if found:
+                return response
+            try:
+                result = ENDPOINTS[path](processor, params)
+                body, content_type = encode_result(result, arrow)
+                span.rows_out = count_rows(result)
+                compressed = compress and len(body) >= QUERY_SERVICE_CONFIG['gzip_min_bytes']
+                if compressed:
+                    body = gzip.compress(body, compresslevel=QUERY_SERVICE_CONFIG['gzip_level'])
+            except QueryError as e:
+                return 400, json.dumps({'error': str(e)}).encode(), JSON_TYPE, False
+            except (ValueError, KeyError, TypeError) as e:
+                # e.g. an unsupported period or an unparseable date
+                return 400, json.dumps({'error': f"Invalid arguments: {e}"}).encode(), JSON_TYPE, False
+            except Exception as e:
+                # Answer rather than drop the keep-alive connection
+                span.name = f"GET {path} 500"
+                print(f"Query service error on {path}: {e}")
+                return 500, json.dumps({'error': f"Internal error: {e}"}).encode(), JSON_TYPE, False
+            response = (200, body, content_type, compressed)
+            self.response_cache.set(key, response, size=len(body))
+            return response
+
+    def health(self):
+        """Get the served data version and row counts"""
+        processor = self.processor
+        return {
+            'status': 'ok',
+            'shared_version': processor.shared_version,
+            'data_version': processor.data_version,
+            'cube_rows': count_rows(processor.cube),
+            'response_cache': self.response_cache.stats()
+        }
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; without this, keep-alive
+    # requests wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        output_format = params.pop('format', None)
+        arrow = output_format == 'arrow' or (output_format is None and ARROW_STREAM_TYPE in self.headers.get('Accept', ''))
+        compress = accepts_gzip(self.headers.get('Accept-Encoding'))
+
+        if url.path == '/health':
+            return self._send(200, json.dumps(to_json_value(self.server.health())).encode(), JSON_TYPE)
+        if url.path == '/metrics':
+            if output_format == 'json':
+                return self._send(200, self.server.metrics.to_json().encode(), JSON_TYPE)
+            return self._send(200, self.server.metrics.to_prometheus(prefix='query_service').encode(),
+                              'text/plain; version=0.0.4')
+        if url.path not in ENDPOINTS:
+            return self._send(404, json.dumps({'error': 'Not found'}).encode(), JSON_TYPE)
+
+        status, body, content_type, compressed = self.server.answer(url.path, params, arrow, compress)
+        self._send(status, body, content_type, compressed)
+
+    def _send(self, status, body, content_type, compressed=False):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept, Accept-Encoding')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def load_processor(version=None):
+    """Open a shared store version, or build and publish data when none exists"""
+    store = SharedStore()
+    version = version or store.current_version()
+    if version is None:
+        from data_scraper import VehicleDataScraper
+        processor = VehicleDataProcessor(VehicleDataScraper().get_data())
+        processor.use_disk_cache()
+        processor.process_data()
+        version = processor.publish_to_shared_store(store)
+    processor = VehicleDataProcessor.from_shared_store(store, version)
+    processor.use_disk_cache()
+    # Warm the aggregates most requests read
+    processor.calculate_growth_metrics()
+    processor.get_summary_statistics()
+    return processor
+
+def main():
+    """Serve processor queries until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=QUERY_SERVICE_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=QUERY_SERVICE_CONFIG['port'])
+    parser.add_argument('--version', help='Shared store version to serve (default: the current one)')
+    args = parser.parse_args()
+
+    processor = load_processor(args.version)
+    server = QueryServiceServer(processor, args.host, args.port)
+    print(f"🌐 Serving registration queries at {server.url} (version {processor.shared_version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping query service")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Background Refresh Worker for Vehicle Registration Dashboard
+Rebuilds the dataset off the request path and swaps versions in atomically
+"""
+
+import time
+import threading
+
+from config import REFRESH_CONFIG
+
+class RefreshWorker:
+    """Daemon thread that publishes new data versions in the background
+
+    Sessions read `version` and keep serving it while a refresh runs. A
+    refresh publishes a new version, warms it (e.g. opens its processor
+    and computes the first view's aggregates), and only then replaces
+    `version`, so no session waits for a rebuild (stale-while-revalidate).
+    The worker also picks up versions published by other processes and
+    can refresh on a schedule.
+
+    Args:
+        publish: Callable building and publishing new data, returning
+            its version
+        version: Version to serve until the first swap
+        warm: Optional callable preparing a version before it is served
+        latest: Optional callable returning the newest published
+            version, polled to pick up other processes' publishes
+        interval_seconds: Seconds between scheduled refreshes (default:
+            REFRESH_CONFIG['interval_seconds']; None disables them)
+        poll_seconds: Seconds between polls of latest (default:
+            REFRESH_CONFIG['poll_seconds'])
+    """
+
+    def __init__(self, publish, version=None, warm=None, latest=None,
+                 interval_seconds=None, poll_seconds=None):
+        self.publish = publish
+        self.warm = warm
+        self.latest = latest
+        self.interval_seconds = (REFRESH_CONFIG['interval_seconds']
+                                 if interval_seconds is None else interval_seconds)
+        self.poll_seconds = poll_seconds or REFRESH_CONFIG['poll_seconds']
+        self.version = version
+        self.refreshing = False
+        self.last_refresh = None
+        self.last_duration = None
+        self.last_error = None
+        self.refreshes = 0
+        self._next_refresh = self._schedule()
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread (once)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='refresh-worker', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the worker thread after any refresh in progress"""
+        self._stopped.set()
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_refresh(self):
+        """Ask for a refresh without waiting for it
+
+        Returns:
+            False when a refresh is already running; requests made meanwhile
+            are folded into one follow-up refresh
+        """
+        self._requested.set()
+        return not self.refreshing
+
+    def refresh_now(self):
+        """Publish, warm and swap in a new version on the calling thread"""
+        self.refreshing = True
+        started = time.monotonic()
+        try:
+            self.swap(self.publish())
+            self.last_error = None
+            self.refreshes += 1
+        except Exception as e:
+            # Keep serving the previous version
+            self.last_error = str(e)
+            print(f"Background refresh failed: {e}")
+        finally:
+            self.last_duration = time.monotonic() - started
+            self.last_refresh = time.time()
+            self._next_refresh = self._schedule()
+            self.refreshing = False
+        return self.version
+
+    def swap(self, version):
+        """Warm a version and then make it the one sessions are served"""
+        if version is None or version == self.version:
+            return
+        if self.warm is not None:
+            self.warm(version)
+        with self._lock:
+            self.version = version
+
+    def status(self):
+        """Get the serving version and the state of the last refresh
+
+        refreshing is True while a refresh runs or is waiting to start.
+        """
+        return {
+            'version': self.version,
+            'refreshing': self.refreshing or self._requested.is_set(),
+            'refreshes': self.refreshes,
+            'last_refresh': self.last_refresh,
+            'last_duration': self.last_duration,
+            'last_error': self.last_error,
+            'next_refresh': self._next_refresh
+        }
+
+    def _schedule(self):
+        """Get the wall-clock time of the next scheduled refresh, or None"""
+        return time.time() + self.interval_seconds if self.interval_seconds else None
+
+    def _run(self):
+        """Wait for requests, scheduled refreshes and newer published versions"""
+        while not self._stopped.is_set():
+            timeout = self.poll_seconds
+            if self._next_refresh is not None:
+                timeout = max(0.0, min(timeout, self._next_refresh - time.time()))
+            requested = self._requested.wait(timeout)
+            if self._stopped.is_set():
+                break
+            if requested or (self._next_refresh is not None and time.time() >= self._next_refresh):
+                self._requested.clear()
+                self.refresh_now()
+            elif self.latest is not None:
+                try:
+                    self.swap(self.latest())
+                except Exception as e:
+                    print(f"Could not open the latest version: {e}")
@@ -0,0 +1,119 @@
+"""
+Shared Dataset Store for Vehicle Registration Dashboard
+Versioned Arrow IPC files that every session and process memory-maps
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from config import SHARED_STORE_CONFIG
+
+# File in the store root naming the current version directory
+CURRENT_POINTER = 'CURRENT'
+
+class SharedStore:
+    """Directory of immutable dataset versions with an atomic CURRENT pointer
+
+    Each published version is a directory of uncompressed Arrow IPC files.
+    Readers memory-map them, so every process on the host shares the same
+    page-cache pages instead of holding its own copy. Publishing writes a
+    new directory and then replaces CURRENT, so readers see either the old
+    or the new version, never a partial one.
+    """
+
+    def __init__(self, root=None, keep_versions=None):
+        self.root = root or SHARED_STORE_CONFIG['root']
+        self.keep_versions = keep_versions or SHARED_STORE_CONFIG['keep_versions']
+
+    def current_version(self):
+        """Get the name of the current version, or None if nothing is published"""
+        try:
+            with open(os.path.join(self.root, CURRENT_POINTER)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def publish(self, tables, metadata=None):
+        """Write tables as a new version and make it current
+
+        Args:
+            tables: Mapping of name -> DataFrame or pyarrow Table
+            metadata: JSON-serializable dict stored with the version
+
+        Returns:
+            The new version name
+        """
+        os.makedirs(self.root, exist_ok=True)
+        # Names sort by publish time
+        version = f"v{time.strftime('%Y%m%d%H%M%S')}{time.time_ns() % 10 ** 9:09d}-{uuid.uuid4().hex[:8]}"
+        staging = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(staging)
+
+        try:
+            for name, table in tables.items():
+                if not isinstance(table, pa.Table):
+                    table = pa.Table.from_pandas(table, preserve_index=False)
+                with ipc.new_file(os.path.join(staging, f"{name}.arrow"), table.schema) as writer:
+                    writer.write_table(table)
+            with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                json.dump(metadata or {}, f)
+            os.rename(staging, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # Swap the pointer atomically
+        pointer = os.path.join(self.root, CURRENT_POINTER)
+        with open(f"{pointer}.{version}.tmp", 'w') as f:
+            f.write(version)
+        os.replace(f"{pointer}.{version}.tmp", pointer)
+
+        self._prune(version)
+        return version
+
+    def open(self, version=None):
+        """Memory-map a version's tables
+
+        Returns:
+            (version, tables, metadata) where tables maps name -> pyarrow
+            Table backed by the mapped files
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No dataset published in {self.root}")
+        directory = os.path.join(self.root, version)
+
+        tables = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.arrow'):
+                source = pa.memory_map(os.path.join(directory, filename))
+                tables[filename[:-len('.arrow')]] = ipc.open_file(source).read_all()
+        with open(os.path.join(directory, 'metadata.json')) as f:
+            metadata = json.load(f)
+        return version, tables, metadata
+
+    def versions(self):
+        """List published version names, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if name.startswith('v') and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def _prune(self, current):
+        """Remove all but the newest keep_versions versions
+
+        Processes still mapping a removed version keep reading it until they
+        reopen (on Windows the files are in use and are left for a later prune).
+        """
+        stale = [version for version in self.versions() if version != current]
+        for version in stale[:max(len(stale) - (self.keep_versions - 1), 0)]:
+            shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
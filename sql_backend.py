@@ -0,0 +1,275 @@
+"""
+SQL Query Backend for Vehicle Registration Dashboard
+Embedded SQLite database answering processor queries with indexed SQL
+"""
+
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import SQL_BACKEND_CONFIG, DATA_CONFIG
+from periods import PERIOD_COLUMNS
+from utils import iter_data_chunks
+
+# Raw columns with a fixed SQL type; other source columns are stored untyped
+CORE_COLUMNS = {
+    'date': 'TEXT NOT NULL',
+    'year': 'INTEGER NOT NULL',
+    'month': 'INTEGER NOT NULL',
+    'vehicle_type': 'TEXT NOT NULL',
+    'manufacturer': 'TEXT NOT NULL',
+    'region': 'TEXT NOT NULL',
+    'registrations': 'INTEGER NOT NULL'
+}
+
+# Indexed raw columns; the daily cube table has one composite key index
+INDEXED_COLUMNS = ['date', 'vehicle_type', 'manufacturer', 'region']
+
+# Rows of the daily cube table, aggregated from the registrations table
+CUBE_SELECT = (
+    "SELECT date, year, month, vehicle_type, manufacturer, region, "
+    "SUM(registrations) AS registrations FROM registrations"
+)
+CUBE_GROUP_BY = "GROUP BY date, vehicle_type, manufacturer, region"
+
+# SQL expression of each period key over cube columns; must match periods.py
+_WEEK_DAYS = "CAST(julianday(date) - julianday('1970-01-05') AS INTEGER)"
+PERIOD_KEY_SQL = {
+    'daily': 'date',
+    'weekly': f"({_WEEK_DAYS} - (({_WEEK_DAYS} % 7) + 7) % 7) / 7",
+    'monthly': 'year * 12 + month - 1',
+    'quarterly': 'year * 4 + (month - 1) / 3',
+    'fiscal_year': f"year - (month < {DATA_CONFIG['fiscal_year_start_month']})",
+    'yearly': 'year'
+}
+
+# SQL expression of each cube key a rollup can group by (see rollup)
+ROLLUP_KEY_SQL = {
+    **{PERIOD_COLUMNS[period]: key for period, key in PERIOD_KEY_SQL.items()},
+    'month': 'month',
+    'quarter': "'Q' || ((month - 1) / 3 + 1)",
+    **{column: column for column in INDEXED_COLUMNS[1:]}
+}
+
+class SQLiteBackend:
+    """Registration rows and a daily cube in an indexed SQLite database
+
+    The database can be in memory (':memory:') or a file, so queries work
+    the same whether or not the history fits in RAM. A file database is
+    reused across restarts without reloading.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or SQL_BACKEND_CONFIG['path']
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def is_loaded(self):
+        """Check whether the database already holds registration data"""
+        return bool(self._query(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'cube'"
+        ).iat[0, 0])
+
+    def load_frame(self, data, chunk_rows=None):
+        """Replace the database contents with a DataFrame of registration rows"""
+        chunk_rows = chunk_rows or SQL_BACKEND_CONFIG['chunk_rows']
+        return self.load_chunks(
+            data.iloc[start:start + chunk_rows] for start in range(0, len(data), chunk_rows)
+        )
+
+    def load_files(self, filename, directory='data/processed', chunk_rows=None):
+        """Replace the database contents with a data file, read chunk by chunk"""
+        chunk_rows = chunk_rows or SQL_BACKEND_CONFIG['chunk_rows']
+        return self.load_chunks(iter_data_chunks(filename, directory, chunk_rows))
+
+    def load_chunks(self, chunks):
+        """Replace the database contents with an iterable of row chunks
+
+        Indexes and the daily cube are built once after all rows are in.
+        """
+        with self._lock, self.connection:
+            self.connection.execute("DROP TABLE IF EXISTS registrations")
+            self.connection.execute("DROP TABLE IF EXISTS cube")
+            rows = 0
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                chunk = self._to_sql_rows(chunk)
+                if not rows:
+                    self._create_table(chunk.columns)
+                chunk.to_sql('registrations', self.connection, if_exists='append', index=False)
+                rows += len(chunk)
+            if not rows:
+                self._create_table(list(CORE_COLUMNS))
+            for column in INDEXED_COLUMNS:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_registrations_{column} ON registrations ({column})"
+                )
+            self._build_cube()
+        return rows
+
+    def replace_dates(self, dates, data):
+        """Replace the rows of the given dates with data, updating the cube"""
+        dates = [pd.Timestamp(date).strftime('%Y-%m-%d') for date in dates]
+        placeholders = ', '.join('?' * len(dates))
+        with self._lock, self.connection:
+            self.connection.execute(f"DELETE FROM registrations WHERE date IN ({placeholders})", dates)
+            self.connection.execute(f"DELETE FROM cube WHERE date IN ({placeholders})", dates)
+            if not data.empty:
+                self._to_sql_rows(data).to_sql('registrations', self.connection, if_exists='append', index=False)
+            self.connection.execute(
+                f"INSERT INTO cube {CUBE_SELECT} WHERE date IN ({placeholders}) {CUBE_GROUP_BY}", dates
+            )
+
+    def filtered_data(self, start_date=None, end_date=None, vehicle_type=None, manufacturer=None):
+        """Get the registration rows matching the filters, sorted by date"""
+        where, params = self._where(start_date, end_date, vehicle_type, manufacturer)
+        return self._query(f"SELECT * FROM registrations{where} ORDER BY date, rowid", params)
+
+    def iter_filtered_data(self, start_date=None, end_date=None, vehicle_type=None, manufacturer=None,
+                           chunk_rows=None):
+        """Yield the rows of filtered_data in chunks of at most chunk_rows rows
+
+        Each chunk is its own query, resuming after the (date, rowid) of the
+        previous one, so the connection is not held between chunks.
+        """
+        chunk_rows = chunk_rows or SQL_BACKEND_CONFIG['chunk_rows']
+        where, params = self._where(start_date, end_date, vehicle_type, manufacturer)
+        resume = " AND (date, rowid) > (?, ?)" if where else " WHERE (date, rowid) > (?, ?)"
+        last = ['', 0]
+        while True:
+            chunk = self._query(
+                f"SELECT rowid AS row_id, * FROM registrations{where}{resume} ORDER BY date, rowid LIMIT ?",
+                params + last + [chunk_rows]
+            )
+            # An empty first chunk still gives the result's columns
+            if chunk.empty and last[1]:
+                return
+            yield chunk.drop(columns='row_id')
+            if len(chunk) < chunk_rows:
+                return
+            last = [chunk['date'].iat[-1], int(chunk['row_id'].iat[-1])]
+
+    def rollup(self, keys, start_date=None, end_date=None):
+        """Get total registrations grouped by cube keys, sorted by key
+
+        Args:
+            keys: Cube dimensions and time columns (year, month, quarter or
+                a period key column) to group by
+            start_date, end_date: Optional inclusive date range of cube rows
+
+        Returns:
+            DataFrame with one column per key and 'registrations'
+        """
+        positions = ', '.join(str(position) for position in range(1, len(keys) + 1))
+        columns = ''.join(f"{ROLLUP_KEY_SQL[key]} AS {key}, " for key in keys)
+        where, params = self._where(start_date, end_date)
+        return self._query(
+            f"SELECT {columns}SUM(registrations) AS registrations FROM cube{where} "
+            f"GROUP BY {positions} ORDER BY {positions}", params
+        )
+
+    def period_totals(self, period):
+        """Get total registrations per period key, sorted by key"""
+        key = PERIOD_KEY_SQL[period]
+        totals = self._query(
+            f"SELECT {key} AS period_key, SUM(registrations) AS registrations FROM cube "
+            "GROUP BY period_key ORDER BY period_key"
+        )
+        index = totals['period_key']
+        if period == 'daily':
+            index = pd.to_datetime(index)
+        return pd.Series(totals['registrations'].to_numpy(), index=pd.Index(index, name=PERIOD_COLUMNS[period]),
+                         name='registrations')
+
+    def top_manufacturers(self, vehicle_type=None, limit=10):
+        """Get the manufacturers with the most registrations"""
+        where, params = self._where(vehicle_type=vehicle_type)
+        totals = self._query(
+            f"SELECT manufacturer, SUM(registrations) AS registrations FROM cube{where} "
+            "GROUP BY manufacturer ORDER BY registrations DESC LIMIT ?", params + [limit]
+        )
+        return dict(zip(totals['manufacturer'], totals['registrations']))
+
+    def summary_statistics(self):
+        """Get the dashboard summary statistics with one query per figure"""
+        def totals(column, order='key', limit=-1):
+            frame = self._query(
+                f"SELECT {column} AS key, SUM(registrations) AS registrations FROM cube "
+                f"GROUP BY key ORDER BY {order} LIMIT ?", [limit]
+            )
+            return dict(zip(frame['key'], frame['registrations']))
+
+        recent = self._query(
+            "SELECT SUM(registrations) FROM cube "
+            "WHERE date >= date((SELECT MAX(date) FROM cube), '-30 day')"
+        ).iat[0, 0]
+        return {
+            'total_registrations': int(self._query("SELECT SUM(registrations) FROM cube").iat[0, 0] or 0),
+            'vehicle_type_summary': totals('vehicle_type'),
+            'manufacturer_summary': totals('manufacturer', 'registrations DESC', 10),
+            'yearly_summary': totals('year'),
+            'quarterly_summary': totals("'Q' || ((month - 1) / 3 + 1)"),
+            'recent_trend': int(recent or 0)
+        }
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def _query(self, sql, params=()):
+        """Run a query under the connection lock and return a DataFrame"""
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=list(params))
+
+    def _where(self, start_date=None, end_date=None, vehicle_type=None, manufacturer=None):
+        """Build an indexed WHERE clause and its parameters; 'All' means no filter"""
+        clauses, params = [], []
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+        for column, value in [('vehicle_type', vehicle_type), ('manufacturer', manufacturer)]:
+            if value and value != 'All':
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _to_sql_rows(self, data):
+        """Convert a chunk to plain SQL-storable columns"""
+        dates = pd.to_datetime(data['date'].astype(str) if isinstance(data['date'].dtype, pd.CategoricalDtype)
+                               else data['date'])
+        columns = {
+            'date': dates.dt.strftime('%Y-%m-%d'),
+            'year': dates.dt.year.astype(np.int64),
+            'month': dates.dt.month.astype(np.int64)
+        }
+        for column in data.columns:
+            if column in columns or column in ('quarter', 'month_name'):
+                continue
+            values = data[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(str)
+            columns[column] = values
+        return pd.DataFrame(columns)
+
+    def _create_table(self, columns):
+        """Create the registrations table with core and extra source columns"""
+        definitions = [f'"{column}" {CORE_COLUMNS.get(column, "")}'.rstrip() for column in columns]
+        self.connection.execute(f"CREATE TABLE registrations ({', '.join(definitions)})")
+
+    def _build_cube(self):
+        """Aggregate raw rows into the daily cube table and index it"""
+        self.connection.execute(
+            "CREATE TABLE cube (date TEXT, year INTEGER, month INTEGER, vehicle_type TEXT, "
+            "manufacturer TEXT, region TEXT, registrations INTEGER)"
+        )
+        self.connection.execute(f"INSERT INTO cube {CUBE_SELECT} {CUBE_GROUP_BY}")
+        self.connection.execute(
+            "CREATE INDEX idx_cube_key ON cube (date, vehicle_type, manufacturer, region)"
+        )
+        self.connection.execute("CREATE INDEX idx_cube_manufacturer ON cube (vehicle_type, manufacturer)")
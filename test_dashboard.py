@@ -52,6 +52,142 @@ def test_data_generation():
         print(f"❌ Data generation error: {e}")
         return False
 
+def test_bulk_data_generation():
+    """Test vectorized bulk data generation"""
+    try:
+        from data_scraper import VehicleDataScraper
+        scraper = VehicleDataScraper()
+        sample = scraper.generate_sample_data()
+        data = scraper.generate_bulk_data(days=30, manufacturers_per_type=8, regions=7, seed=42)
+        
+        assert list(data.columns) == list(sample.columns), "Bulk data schema differs from sample data"
+        assert len(data) == 30 * 8 * 3, f"Expected 720 records, got {len(data)}"
+        assert data['manufacturer'].dtype == 'category', "Manufacturer should be categorical"
+        assert data['registrations'].min() >= 0, "Negative registrations generated"
+        assert data['date'].min() < data['date'].max() == sample['date'].max(), "Dates should be ordered"
+        assert data['region'].nunique() <= 7, "Too many regions generated"
+        
+        repeat = scraper.generate_bulk_data(days=30, manufacturers_per_type=8, regions=7, seed=42)
+        assert repeat['registrations'].equals(data['registrations']), "Seeded generation is not reproducible"
+        
+        # One row per region grows the rows per day without more days
+        per_region = scraper.generate_bulk_data(days=30, manufacturers_per_type=8, regions=7, per_region=True, seed=42)
+        assert len(per_region) == 30 * 8 * 3 * 7, f"Expected 5040 records, got {len(per_region)}"
+        assert (per_region['region'].value_counts() == 30 * 8 * 3).all(), "Regions should be evenly covered"
+        
+        print(f"✅ Bulk data generation successful: {len(data)} records created")
+        print(f"   - Memory usage: {data.memory_usage(deep=True).sum():,} bytes")
+        return True
+    except Exception as e:
+        print(f"❌ Bulk data generation error: {e}")
+        return False
+
+def test_registration_fetching():
+    """Test concurrent fetching against the local Vahan stand-in"""
+    try:
+        import os
+        import tempfile
+        from data_scraper import VehicleDataScraper
+        from vahan_standin import VahanStandInServer, record_sample_pages
+        
+        with tempfile.TemporaryDirectory() as directory:
+            pages = os.path.join(directory, 'recorded')
+            checkpoints = os.path.join(directory, 'checkpoints')
+            record_sample_pages(pages, states=['KA', 'MH'], months=['2024-01', '2024-02'], seed=1)
+            
+            # Every page fails once, so each task needs a retry
+            server = VahanStandInServer(pages, port=0, fail_first=1)
+            server.start()
+            try:
+                scraper = VehicleDataScraper()
+                options = {'base_url': server.url, 'max_workers': 4, 'requests_per_second': 200,
+                           'backoff_seconds': 0.01, 'checkpoint_dir': checkpoints}
+                data = scraper.fetch_registrations(['KA', 'MH'], ['2024-01', '2024-02'], **options)
+                assert not scraper.fetcher.failures, f"Fetch failures: {scraper.fetcher.failures}"
+                assert len(data) == 2 * 2 * 14, f"Expected 56 records, got {len(data)}"
+                assert set(data['region']) == {'South', 'West'}, "States mapped to wrong regions"
+                
+                # A second run resumes from checkpoints without new requests
+                requests_made = server.request_count
+                resumed = scraper.fetch_registrations(['KA', 'MH'], ['2024-01', '2024-02'], **options)
+                assert server.request_count == requests_made, "Checkpointed pages were fetched again"
+                assert len(resumed) == len(data), "Resumed fetch lost records"
+            finally:
+                server.shutdown()
+                server.server_close()
+        
+        print("✅ Registration fetching successful")
+        print(f"   - Records fetched: {len(data)}")
+        return True
+    except Exception as e:
+        print(f"❌ Registration fetching error: {e}")
+        return False
+
+def test_raw_ingestion():
+    """Test parallel raw file ingestion with schema validation and de-duplication"""
+    try:
+        import tempfile
+        import pandas as pd
+        from ingest import ingest_files
+        from utils import load_data
+        
+        rows = pd.DataFrame({
+            'date': ['2024-08-01', '2024-08-01', '2024-08-02'],
+            'vehicle_type': ['2W', '4W', '2W'],
+            'manufacturer': ['Honda', 'Tata', 'Honda'],
+            'registrations': [120, 80, 95],
+            'region': ['North', 'North', 'North'],
+            'state': ['DL', 'DL', 'DL']
+        })
+        with tempfile.TemporaryDirectory() as directory:
+            rows.to_csv(os.path.join(directory, 'DL_2024-08.csv'), index=False)
+            rows.assign(state='HR').to_excel(os.path.join(directory, 'HR_2024-08.xlsx'), index=False)
+            # A re-export correcting one row, plus rows failing the schema
+            pd.concat([
+                rows.iloc[[0]].assign(registrations=125),
+                rows.iloc[[1]].assign(date='2024-13-01'),
+                rows.iloc[[2]].assign(vehicle_type='9W'),
+                rows.iloc[[2]].assign(registrations=-5)
+            ]).to_csv(os.path.join(directory, 'DL_2024-08_v2.csv'), index=False)
+            pd.DataFrame({'maker': ['Honda']}).to_csv(os.path.join(directory, 'notes.csv'), index=False)
+            
+            data, problems = ingest_files('*', directory, workers=2)
+            assert len(data) == 6, f"Expected 6 rows, got {len(data)}"
+            assert data['date'].is_monotonic_increasing, "Rows should be sorted by date"
+            for column in ['vehicle_type', 'manufacturer', 'region']:
+                assert data[column].dtype == 'category', f"{column} should be categorical"
+            assert data['registrations'].dtype == 'int64', "Registrations should be int64"
+            corrected = data[(data['state'] == 'DL') & (data['date'] == '2024-08-01') & (data['manufacturer'] == 'Honda')]
+            assert corrected['registrations'].tolist() == [125], "The later file should win"
+            messages = ' | '.join(message for _, message in problems)
+            for expected in ['invalid date', 'unknown vehicle_type', 'invalid registrations',
+                             'missing columns', '1 duplicate rows removed']:
+                assert expected in messages, f"Missing problem: {expected}"
+            
+            assert load_data('*.csv', directory, vehicle_type='4W')['registrations'].tolist() == [80], \
+                "load_data should ingest glob patterns"
+            
+            # CSV files are streamed block by block; categories merge across blocks
+            from config import INGEST_CONFIG
+            from ingest import parse_raw_file
+            many = pd.concat([rows.assign(manufacturer=f"Maker {i}") for i in range(40)], ignore_index=True)
+            many.to_csv(os.path.join(directory, 'many.csv'), index=False)
+            block_bytes = INGEST_CONFIG['csv_block_bytes']
+            INGEST_CONFIG['csv_block_bytes'] = 512
+            try:
+                streamed, _ = parse_raw_file(os.path.join(directory, 'many.csv'))
+            finally:
+                INGEST_CONFIG['csv_block_bytes'] = block_bytes
+            assert streamed['manufacturer'].astype(str).tolist() == many['manufacturer'].tolist(), \
+                "Streamed blocks lost or reordered rows"
+        
+        print("✅ Raw ingestion successful")
+        print(f"   - Rows: {len(data)}, problems reported: {len(problems)}")
+        return True
+    except Exception as e:
+        print(f"❌ Raw ingestion error: {e}")
+        return False
+
 def test_data_processing():
     """Test data processing functionality"""
     try:
@@ -78,6 +214,36 @@ def test_data_processing():
         print(f"❌ Data processing error: {e}")
         return False
 
+def test_compact_representation():
+    """Test compact dtypes and memory footprint of processed raw data"""
+    try:
+        from data_scraper import VehicleDataScraper
+        from data_processor import VehicleDataProcessor
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_sample_data()
+        source_bytes = data.memory_usage(deep=True).sum()
+        
+        processor = VehicleDataProcessor(data)
+        raw_data = processor.process_data()['raw_data']
+        
+        for column in ['vehicle_type', 'manufacturer', 'region']:
+            assert raw_data[column].dtype == 'category', f"{column} should be categorical"
+        for column in ['year', 'month', 'quarter']:
+            assert column not in raw_data.columns, f"{column} should be derived, not stored"
+        
+        # One row per key: the cube is a view of the raw rows, not a copy
+        footprint = processor.memory_footprint()
+        assert footprint['raw_data'] * 5 <= source_bytes, "Raw data is not compact"
+        assert footprint['total'] * 5 <= source_bytes, f"Processor state is {footprint['total']:,} bytes"
+        
+        print("✅ Compact representation successful")
+        print(f"   - Raw data: {source_bytes:,} -> {footprint['raw_data']:,} bytes, total {footprint['total']:,} bytes")
+        return True
+    except Exception as e:
+        print(f"❌ Compact representation error: {e}")
+        return False
+
 def test_utility_functions():
     """Test utility functions"""
     try:
@@ -113,6 +279,39 @@ def test_utility_functions():
         print(f"❌ Utility function error: {e}")
         return False
 
+def test_columnar_storage():
+    """Test partitioned Parquet storage with projection and filters"""
+    try:
+        import tempfile
+        from data_scraper import VehicleDataScraper
+        from utils import save_data, load_data
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_bulk_data(days=120, seed=5)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            save_data(data, 'registrations.parquet', directory=directory)
+            loaded = load_data('registrations.parquet', directory=directory)
+            assert len(loaded) == len(data), "Round trip lost records"
+            assert loaded['registrations'].sum() == data['registrations'].sum(), "Round trip changed totals"
+            assert loaded['manufacturer'].dtype == 'category', "Manufacturer should load as categorical"
+            
+            start_date = data['date'].iloc[len(data) // 2]
+            subset = load_data('registrations.parquet', directory=directory,
+                               columns=['date', 'registrations'], start_date=start_date,
+                               vehicle_type='4W', manufacturer='Tata')
+            assert list(subset.columns) == ['date', 'registrations'], "Column projection failed"
+            expected = data[(data['date'] >= start_date) & (data['vehicle_type'] == '4W') &
+                            (data['manufacturer'] == 'Tata')]
+            assert len(subset) == len(expected), f"Expected {len(expected)} records, got {len(subset)}"
+        
+        print("✅ Columnar storage successful")
+        print(f"   - Filtered records: {len(subset)}")
+        return True
+    except Exception as e:
+        print(f"❌ Columnar storage error: {e}")
+        return False
+
 def test_growth_calculations():
     """Test growth calculation algorithms"""
     try:
@@ -140,13 +339,905 @@ def test_growth_calculations():
         print(f"❌ Growth calculation error: {e}")
         return False
 
+def test_growth_table():
+    """Test vectorized growth table against per-entity calculations"""
+    try:
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from utils import calculate_growth
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_bulk_data(days=500, seed=7)
+        processor = VehicleDataProcessor(data)
+        processor.process_data()
+        
+        # YoY compares the year to date with as many days of the previous year
+        import pandas as pd
+        growth_table = processor.get_growth_table(['region'])
+        cube = processor.cube
+        last_date = cube['date'].max()
+        year_start = pd.Timestamp(last_date.year, 1, 1)
+        previous_year_start = pd.Timestamp(last_date.year - 1, 1, 1)
+        previous_year_end = previous_year_start + (last_date - year_start)
+        for _, row in growth_table.iterrows():
+            region_data = cube[cube['region'] == row['region']]
+            current = region_data[region_data['date'] >= year_start]['registrations'].sum()
+            previous = region_data[region_data['date'].between(previous_year_start, previous_year_end)]['registrations'].sum()
+            expected = calculate_growth(current, previous)
+            assert abs(row['yoy'] - expected) < 1e-9, f"YoY mismatch for {row['region']}"
+        assert processor.calculate_growth_metrics()['year_days'] == (last_date - year_start).days + 1, "Year days differ"
+        
+        # QoQ compares the quarter to date with as many days of the previous quarter
+        current_start = last_date.to_period('Q').start_time
+        previous_start = (last_date.to_period('Q') - 1).start_time
+        days = (last_date - current_start).days
+        previous_end = min(previous_start + pd.Timedelta(days=days), current_start - pd.Timedelta(days=1))
+        overall = processor.get_growth_table([]).iloc[0]
+        dates = processor.cube['date']
+        assert overall['current_quarter_registrations'] == processor.cube.loc[dates >= current_start, 'registrations'].sum()
+        assert overall['previous_quarter_registrations'] == processor.cube.loc[
+            (dates >= previous_start) & (dates <= previous_end), 'registrations'].sum(), "Previous quarter window differs"
+        assert processor.calculate_growth_metrics()['quarter_days'] == days + 1, "Quarter days differ"
+        
+        pairs = processor.get_growth_table(['vehicle_type', 'manufacturer'])
+        assert len(pairs) == 14, f"Expected 14 vehicle type/manufacturer pairs, got {len(pairs)}"
+        
+        # An entity without registrations in the latest quarters gets 0, not NaN
+        stale = pd.DataFrame({'date': [last_date - pd.Timedelta(days=400)], 'vehicle_type': ['4W'],
+                              'manufacturer': ['Retired Motors'], 'region': ['North'], 'registrations': [50]})
+        processor.apply_updates(stale)
+        retired = processor.get_growth_table(['manufacturer']).set_index('manufacturer').loc['Retired Motors']
+        assert retired['current_quarter_registrations'] == 0 and retired['previous_quarter_registrations'] == 0, \
+            "Quarter registrations should be 0"
+        assert retired['qoq'] == 0 and not pd.isna(retired['yoy']), "Growth should be 0%, not NaN"
+        assert processor.calculate_growth_metrics()['manufacturer']['Retired Motors']['qoq'] == 0, "Metrics growth is NaN"
+        assert processor.get_growth_table(['manufacturer'])['current_quarter_registrations'].dtype == 'int64', \
+            "Counts should stay int64"
+        
+        print("✅ Growth table calculations successful")
+        print(f"   - Regions: {len(growth_table)}, vehicle type/manufacturer pairs: {len(pairs)}")
+        return True
+    except Exception as e:
+        print(f"❌ Growth table error: {e}")
+        return False
+
+def test_period_engine():
+    """Test year-aware period keys, quarterly trends and QoQ growth"""
+    try:
+        import pandas as pd
+        from data_processor import VehicleDataProcessor
+        from periods import period_keys, period_label, rolling_totals, dense_totals
+        
+        dates = pd.to_datetime(['2024-03-31', '2024-04-01', '2025-02-15'])
+        assert list(period_keys(dates, 'fiscal_year')) == [2023, 2024, 2024], "Fiscal years should run April-March"
+        assert period_label(period_keys(dates, 'quarterly')[2], 'quarterly') == '2025-Q1', "Quarter label wrong"
+        assert (period_keys(dates, 'quarterly')[2] - period_keys(dates, 'quarterly')[1]) == 3, "Quarter keys not consecutive"
+        
+        totals = dense_totals(pd.Series([5, 7], index=[10, 13]))
+        assert list(totals) == [5, 0, 0, 7], "Missing periods should be zero"
+        assert list(rolling_totals(totals, 2)) == [5, 5, 0, 7], "Rolling window sums wrong"
+        
+        # Q1 of two different years must stay separate buckets
+        data = pd.DataFrame({
+            'date': ['2023-02-01', '2023-11-01', '2024-02-01', '2024-05-01'],
+            'vehicle_type': '2W', 'manufacturer': 'Honda', 'region': 'North',
+            'registrations': [100, 200, 300, 600]
+        })
+        processor = VehicleDataProcessor(data)
+        processor.process_data()
+        quarterly = processor.get_trend_data(period='quarterly')
+        assert list(quarterly['label']) == ['2023-Q1', '2023-Q2', '2023-Q3', '2023-Q4', '2024-Q1', '2024-Q2'], \
+            "Quarterly trend should have one row per year and quarter"
+        assert list(quarterly['registrations']) == [100, 0, 0, 200, 300, 600], "Quarterly totals wrong"
+        
+        growth = processor.calculate_growth_metrics()
+        assert growth['current_quarter'] == '2024-Q2', "Current quarter should be the latest quarter"
+        assert abs(growth['overall']['qoq'] - 100.0) < 1e-9, "QoQ should compare 2024-Q2 with 2024-Q1"
+        
+        print("✅ Period engine successful")
+        print(f"   - Quarterly periods: {len(quarterly)}")
+        return True
+    except Exception as e:
+        print(f"❌ Period engine error: {e}")
+        return False
+
+def test_series_analytics():
+    """Test vectorized rolling means, seasonality and percentile ranks"""
+    try:
+        import numpy as np
+        import pandas as pd
+        from analytics import rolling_mean, seasonality, percentile_ranks
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from utils import detect_seasonality
+        
+        rng = np.random.default_rng(37)
+        matrix = rng.integers(0, 1000, size=(50, 36)).astype(float)
+        expected = pd.DataFrame(matrix.T).rolling(6).mean().to_numpy().T
+        assert np.allclose(rolling_mean(matrix, 6), expected, equal_nan=True), "Rolling means differ from pandas"
+        
+        months = np.arange(48)
+        seasonal = 100 + 30 * np.sin(2 * np.pi * months / 12) + rng.normal(0, 2, size=(3, 48))
+        lags, _ = seasonality(seasonal, max_lag=20)
+        assert (lags == 12).all(), f"Expected a 12-month season, got {lags}"
+        
+        values = rng.integers(0, 20, size=200)
+        ranks = percentile_ranks(values)
+        assert np.allclose(ranks, [(values < v).mean() * 100 for v in values]), "Percentile ranks wrong"
+        
+        series = rng.integers(0, 100, size=60)
+        full = np.correlate(series, series, mode='full')[59:]
+        reference = [i for i in range(1, 59) if full[i] > full[i - 1] and full[i] > full[i + 1]]
+        assert detect_seasonality(series) == reference, "FFT seasonality peaks differ from np.correlate"
+        
+        data = VehicleDataScraper().generate_bulk_data(days=730, manufacturers_per_type=15, seed=41)
+        processor = VehicleDataProcessor(data)
+        processor.process_data()
+        summary = processor.get_series_analytics(period='monthly', window=3)
+        assert len(summary) == 45, f"Expected 45 series, got {len(summary)}"
+        
+        cube = processor._add_time_attributes(processor.cube.copy())
+        monthly = cube.groupby(['vehicle_type', 'manufacturer', 'month_key'], observed=True)['registrations'].sum()
+        first = summary.iloc[0]
+        one_series = monthly.loc[(first['vehicle_type'], first['manufacturer'])]
+        assert abs(first['rolling_mean'] - one_series.iloc[-3:].mean()) < 1e-6, "Processor rolling mean wrong"
+        
+        print("✅ Series analytics successful")
+        print(f"   - Series analysed: {len(summary)}")
+        return True
+    except Exception as e:
+        print(f"❌ Series analytics error: {e}")
+        return False
+
+def test_filtered_data():
+    """Test indexed filtering against boolean mask filtering"""
+    try:
+        import pandas as pd
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_bulk_data(days=400, seed=3)
+        processor = VehicleDataProcessor(data)
+        processed_data = processor.process_data()
+        raw_data = processed_data['raw_data']
+        
+        start_date = raw_data['date'].min() + pd.Timedelta(days=50)
+        end_date = start_date + pd.Timedelta(days=90)
+        filtered = processor.get_filtered_data(start_date, end_date, '3W', 'Bajaj')
+        expected = raw_data[
+            (raw_data['date'] >= start_date) & (raw_data['date'] <= end_date) &
+            (raw_data['vehicle_type'] == '3W') & (raw_data['manufacturer'] == 'Bajaj')
+        ]
+        assert filtered.drop(columns=['year', 'month', 'quarter']).equals(expected), "Indexed filter differs from mask filter"
+        assert len(filtered) == 91, f"Expected 91 records, got {len(filtered)}"
+        
+        everything = processor.get_filtered_data(vehicle_type='All', manufacturer='All')
+        assert len(everything) == len(raw_data), "'All' filters should keep every record"
+        
+        print("✅ Filtered data successful")
+        print(f"   - Filtered records: {len(filtered)}")
+        return True
+    except Exception as e:
+        print(f"❌ Filtered data error: {e}")
+        return False
+
+def test_incremental_updates():
+    """Test incremental updates against reprocessing the full history"""
+    try:
+        import pandas as pd
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_bulk_data(days=400, seed=11)
+        last_day = data['date'].max()
+        
+        # A new day of data plus a correction to an earlier row
+        correction = data.iloc[[100]].copy()
+        correction['registrations'] += 500
+        batch = pd.concat([data[data['date'] == last_day], correction])
+        
+        processor = VehicleDataProcessor(data[data['date'] < last_day])
+        processor.process_data()
+        processor.get_summary_statistics()
+        processor.calculate_growth_metrics()
+        processor.get_filtered_data(vehicle_type='2W')
+        processor.apply_updates(batch)
+        
+        expected_data = data.copy()
+        expected_data.loc[expected_data.index[100], 'registrations'] += 500
+        expected = VehicleDataProcessor(expected_data)
+        expected.process_data()
+        
+        assert processor.summary_stats == expected.get_summary_statistics(), "Summary statistics differ"
+        assert processor.growth_metrics == expected.calculate_growth_metrics(), "Growth metrics differ"
+        for table in ['daily_totals', 'vehicle_type_totals', 'manufacturer_totals']:
+            assert processor.processed_data[table].equals(expected.processed_data[table]), f"{table} differ"
+        assert processor.cube.equals(expected.cube), "Cube differs"
+        assert processor._cube_is_rows(), "The cube should stay a view of the raw rows"
+        
+        # The row index is patched in place of being rebuilt
+        import numpy as np
+        patched = processor.processed_data['row_index']
+        rebuilt = processor._build_row_index(processor.processed_data['raw_data'])
+        for column in ['vehicle_type', 'manufacturer']:
+            assert np.array_equal(patched[column]['order'], rebuilt[column]['order']), f"{column} row index differs"
+            assert np.array_equal(patched[column]['offsets'], rebuilt[column]['offsets']), f"{column} offsets differ"
+        filtered = processor.get_filtered_data(vehicle_type='3W', manufacturer='Bajaj')
+        assert filtered.equals(expected.get_filtered_data(vehicle_type='3W', manufacturer='Bajaj')), "Filtered data differs"
+        
+        # Two reports sharing some keys keep an aggregated cube, spliced the same way
+        reports = pd.concat([data, scraper.generate_bulk_data(days=400, seed=12)], ignore_index=True)
+        before = reports[reports['date'] < last_day]
+        batch = pd.concat([reports[reports['date'] == last_day], correction])
+        aggregated = VehicleDataProcessor(before)
+        aggregated.process_data()
+        aggregated.apply_updates(batch)
+        affected = before['date'].isin(batch['date'])
+        keys = ['date', 'vehicle_type', 'manufacturer', 'region']
+        merged = pd.concat([before[affected], batch]).drop_duplicates(keys, keep='last')
+        expected = VehicleDataProcessor(pd.concat([before[~affected], merged]))
+        expected.process_data()
+        assert not aggregated._cube_is_rows(), "Rows sharing keys need an aggregated cube"
+        assert aggregated.cube.equals(expected.cube), "Aggregated cube differs"
+        
+        print("✅ Incremental updates successful")
+        print(f"   - Batch records applied: {len(batch)}")
+        return True
+    except Exception as e:
+        print(f"❌ Incremental update error: {e}")
+        return False
+
+def test_streaming_processing():
+    """Test out-of-core chunked processing against in-memory processing"""
+    try:
+        import tempfile
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from utils import save_data, load_data
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_bulk_data(days=400, manufacturers_per_type=12, seed=19)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            save_data(data, 'registrations.parquet', directory=directory)
+            in_memory = VehicleDataProcessor(load_data('registrations.parquet', directory=directory))
+            in_memory.process_data()
+            streamed = VehicleDataProcessor(None)
+            streamed.process_files('registrations.parquet', directory=directory, chunk_rows=2000)
+            
+            assert streamed.get_summary_statistics() == in_memory.get_summary_statistics(), "Summary statistics differ"
+            assert streamed.calculate_growth_metrics() == in_memory.calculate_growth_metrics(), "Growth metrics differ"
+            for table in ['daily_totals', 'vehicle_type_totals', 'manufacturer_totals']:
+                assert streamed.processed_data[table].equals(in_memory.processed_data[table]), f"{table} differ"
+            
+            filtered = streamed.get_filtered_data(vehicle_type='4W', manufacturer='Tata')
+            expected = in_memory.get_filtered_data(vehicle_type='4W', manufacturer='Tata')
+            assert len(filtered) == len(expected), "Filtered data read from files differs"
+        
+        print("✅ Streaming processing successful")
+        print(f"   - Cube rows: {len(streamed.cube)}")
+        return True
+    except Exception as e:
+        print(f"❌ Streaming processing error: {e}")
+        return False
+
+def test_parallel_processing():
+    """Test that the partitioned process-pool cube matches the serial cube"""
+    try:
+        from config import PROCESSING_CONFIG
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        
+        # Two reports per day share some keys, so the cube is aggregated
+        import pandas as pd
+        scraper = VehicleDataScraper()
+        data = pd.concat([scraper.generate_bulk_data(days=500, manufacturers_per_type=10, seed=23),
+                          scraper.generate_bulk_data(days=500, manufacturers_per_type=10, seed=24)])
+        
+        serial = VehicleDataProcessor(data)
+        serial.process_data(workers=1)
+        
+        min_rows = PROCESSING_CONFIG['parallel_min_rows']
+        PROCESSING_CONFIG['parallel_min_rows'] = 0
+        try:
+            parallel = VehicleDataProcessor(data)
+            parallel.process_data(workers=2)
+        finally:
+            PROCESSING_CONFIG['parallel_min_rows'] = min_rows
+        
+        assert not serial._cube_is_rows(), "Rows sharing keys need an aggregated cube"
+        assert parallel.cube.equals(serial.cube), "Parallel cube differs from serial cube"
+        assert parallel.get_summary_statistics() == serial.get_summary_statistics(), "Summary statistics differ"
+        assert len(parallel._partition_ranges(parallel.processed_data['raw_data'], 8)) > 1, "Expected several partitions"
+        
+        print("✅ Parallel processing successful")
+        print(f"   - Cube rows: {len(parallel.cube)}")
+        return True
+    except Exception as e:
+        print(f"❌ Parallel processing error: {e}")
+        return False
+
+def test_profiler():
+    """Test span recording, summaries and the disabled fast path"""
+    try:
+        import time
+        from profiler import Profiler, profiler
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        
+        local = Profiler(enabled=False)
+        with local.span('disabled'):
+            pass
+        assert local.stats() == {}, "Disabled profiler recorded a span"
+        
+        local.enabled = True
+        for _ in range(5):
+            with local.span('stage', rows_in=10) as s:
+                s.rows_out = 4
+        stats = local.stats()['stage']
+        assert stats['count'] == 5 and stats['mean_rows_out'] == 4, "Span samples not recorded"
+        assert 'dashboard_span_seconds_count{span="stage"} 5' in local.to_prometheus(), "Prometheus dump incomplete"
+        
+        # RSS becoming unreadable mid-span drops only the memory delta
+        import profiler as profiler_module
+        read_rss = profiler_module.current_rss_bytes
+        try:
+            with local.span('no_rss'):
+                profiler_module.current_rss_bytes = lambda: None
+        finally:
+            profiler_module.current_rss_bytes = read_rss
+        assert local.stats()['no_rss']['mean_memory_delta_bytes'] is None, "Missing RSS should skip the delta"
+        
+        # A transient allocation shows in the peak RSS, with or without the kernel's peak mark
+        reset_peak = profiler_module._reset_peak_rss
+        try:
+            for resettable in [True, False]:
+                if not resettable:
+                    profiler_module._reset_peak_rss = lambda: False
+                before = profiler_module.current_rss_bytes()
+                with profiler_module.PeakRSS() as rss:
+                    block = b'x' * (64 * 1024 * 1024)
+                    time.sleep(0.05)
+                    del block
+                if before is not None:
+                    assert rss.peak_bytes >= before + 48 * 1024 * 1024, "Transient RSS peak was missed"
+        finally:
+            profiler_module._reset_peak_rss = reset_peak
+        
+        was_enabled = profiler.enabled
+        profiler.enabled = True
+        profiler.reset()
+        try:
+            data = VehicleDataScraper().generate_bulk_data(days=30, manufacturers_per_type=5, seed=29)
+            processor = VehicleDataProcessor(data)
+            processor.process_data()
+            processor.get_filtered_data(vehicle_type='2W')
+            recorded = profiler.stats()
+        finally:
+            profiler.enabled = was_enabled
+            profiler.reset()
+        for name in ['scraper.generate_bulk_data', 'processor.process_data', 'processor.get_filtered_data']:
+            assert name in recorded, f"Missing span {name}"
+        assert recorded['processor.prepare_raw']['mean_rows_in'] == len(data), "Rows in not recorded"
+        
+        print("✅ Profiler successful")
+        print(f"   - Spans recorded: {len(recorded)}")
+        return True
+    except Exception as e:
+        print(f"❌ Profiler error: {e}")
+        return False
+
+def test_shared_store():
+    """Test publishing to and opening from the memory-mapped shared store"""
+    try:
+        import tempfile
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from shared_store import SharedStore
+        
+        data = VehicleDataScraper().generate_bulk_data(days=200, manufacturers_per_type=8, seed=31)
+        processor = VehicleDataProcessor(data)
+        processor.process_data()
+        
+        with tempfile.TemporaryDirectory() as directory:
+            store = SharedStore(directory, keep_versions=2)
+            version = processor.publish_to_shared_store(store)
+            assert store.current_version() == version, "CURRENT does not point at the new version"
+            
+            shared = VehicleDataProcessor.from_shared_store(store)
+            assert shared.raw_data.equals(processor.raw_data), "Mapped raw data differs"
+            assert shared.cube.equals(processor.cube), "Mapped cube differs"
+            assert not shared.raw_data['registrations'].to_numpy().flags.writeable, "Raw data was copied, not mapped"
+            assert shared.calculate_growth_metrics() == processor.calculate_growth_metrics(), "Growth metrics differ"
+            assert shared.get_filtered_data(vehicle_type='3W').equals(
+                processor.get_filtered_data(vehicle_type='3W')), "Filtered data differs"
+            
+            for _ in range(3):
+                latest = processor.publish_to_shared_store(store)
+            assert store.versions()[-1] == latest and len(store.versions()) == 2, "Old versions not pruned"
+        
+        print("✅ Shared store successful")
+        print(f"   - Published version: {version}")
+        return True
+    except Exception as e:
+        print(f"❌ Shared store error: {e}")
+        return False
+
+def test_lazy_tables():
+    """Test that derived tables are built on first read and kept in sync"""
+    try:
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        
+        data = VehicleDataScraper().generate_bulk_data(days=200, seed=19)
+        last_day = data['date'].max()
+        processor = VehicleDataProcessor(data[data['date'] < last_day])
+        tables = processor.process_data()
+        
+        lazy = ['row_index', 'daily_totals', 'vehicle_type_totals', 'manufacturer_totals']
+        assert not any(tables.is_built(name) for name in lazy), "Derived tables should not be built eagerly"
+        processor.calculate_growth_metrics()
+        assert not tables.is_built('manufacturer_totals'), "Growth metrics should not need the totals tables"
+        
+        # Built tables are memoized and spliced by incremental updates
+        vehicle_type_totals = tables['vehicle_type_totals']
+        assert tables['vehicle_type_totals'] is vehicle_type_totals, "Tables should be memoized"
+        processor.apply_updates(data[data['date'] == last_day])
+        assert tables.is_built('vehicle_type_totals'), "Built tables should be updated in place"
+        assert not tables.is_built('row_index'), "New raw data should discard the row index"
+        
+        expected = VehicleDataProcessor(data)
+        expected.process_data()
+        for table in lazy[1:]:
+            assert tables[table].equals(expected.processed_data[table]), f"{table} differ"
+        assert len(processor.get_filtered_data(vehicle_type='2W')) == len(
+            expected.get_filtered_data(vehicle_type='2W')), "Filtered data differs"
+        
+        print("✅ Lazy tables successful")
+        print(f"   - Built after queries: {', '.join(name for name, _ in tables.built_items())}")
+        return True
+    except Exception as e:
+        print(f"❌ Lazy tables error: {e}")
+        return False
+
+def test_disk_cache():
+    """Test the persistent aggregate cache across processor restarts"""
+    try:
+        import tempfile
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from disk_cache import DiskCache
+        
+        # Two reports per day share some keys, so the cube is aggregated
+        # and cached by month
+        import pandas as pd
+        scraper = VehicleDataScraper()
+        data = pd.concat([scraper.generate_bulk_data(days=200, seed=23),
+                          scraper.generate_bulk_data(days=200, seed=24)], ignore_index=True)
+        expected = VehicleDataProcessor(data)
+        expected.process_data()
+        
+        with tempfile.TemporaryDirectory() as directory:
+            def cached_processor(source):
+                processor = VehicleDataProcessor(source)
+                processor.use_disk_cache(DiskCache(directory))
+                processor.process_data()
+                processor.get_summary_statistics()
+                processor.calculate_growth_metrics()
+                processor.processed_data['manufacturer_totals']
+                return processor
+            
+            cold = cached_processor(data)
+            assert cold.disk_cache.stats()['hits'] == 0, "A cold cache should miss"
+            warm = cached_processor(data)
+            assert warm.disk_cache.stats()['misses'] == 0, "A restart should read every entry from disk"
+            assert warm.cube.equals(expected.cube), "Cached cube differs"
+            assert warm.summary_stats == expected.get_summary_statistics(), "Summary statistics differ"
+            assert warm.growth_metrics == expected.calculate_growth_metrics(), "Growth metrics differ"
+            assert warm.processed_data['manufacturer_totals'].equals(
+                expected.processed_data['manufacturer_totals']), "Manufacturer totals differ"
+            
+            # Changing one month's rows recomputes that month's cube slice only
+            changed = data.copy()
+            changed.loc[changed.index[-1], 'registrations'] += 100
+            stale = cached_processor(changed)
+            assert stale.content_hash != warm.content_hash, "Content hash should change"
+            assert stale.disk_cache.stats()['misses'] == 4, "Expected one cube slice and three derived entries"
+            assert stale.summary_stats['total_registrations'] == expected.summary_stats['total_registrations'] + 100
+            
+            # Entries that fail to unpickle (e.g. written by another pandas)
+            # are misses and are removed
+            import os
+            broken = DiskCache(os.path.join(directory, 'broken'), max_bytes=2048)
+            broken.set('table', 'key', 0)
+            with open(broken._path('table', 'key'), 'wb') as f:
+                f.write(b'cdisk_cache\nRemovedClass\n.')
+            assert broken.get('table', 'key') == (False, None), "Unloadable entries should miss"
+            assert not os.path.exists(broken._path('table', 'key')), "Unloadable entries should be removed"
+            for key in range(10):
+                broken.set('table', key, b'x' * 500)
+            assert broken.stats()['bytes'] <= 2048, "Cache should be pruned to max_bytes"
+            assert broken.get('table', 9)[0], "The newest entry should be kept"
+        
+        print("✅ Disk cache successful")
+        print(f"   - Entries reused after restart: {warm.disk_cache.stats()['hits']}")
+        return True
+    except Exception as e:
+        print(f"❌ Disk cache error: {e}")
+        return False
+
+def test_refresh_worker():
+    """Test background refreshes that keep serving the previous version"""
+    try:
+        import time
+        import threading
+        from refresh_worker import RefreshWorker
+        
+        release = threading.Event()
+        published = []
+        warmed = []
+        
+        def publish():
+            release.wait(5)
+            if len(published) == 1:
+                published.append(None)
+                raise RuntimeError("source unavailable")
+            published.append(f"v{len(published) + 1}")
+            return published[-1]
+        
+        def wait_for(condition):
+            deadline = time.monotonic() + 5
+            while not condition() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return condition()
+        
+        worker = RefreshWorker(publish, version='v0', warm=warmed.append, poll_seconds=0.05).start()
+        assert worker.request_refresh(), "Refresh should start"
+        assert wait_for(lambda: worker.refreshing), "Refresh should run in the background"
+        assert worker.version == 'v0', "The previous version should be served during a refresh"
+        release.set()
+        assert wait_for(lambda: worker.version == 'v1'), "The new version should be swapped in"
+        assert warmed == ['v1'], "A version should be warmed before it is served"
+        
+        # A failed refresh keeps serving the current version
+        worker.request_refresh()
+        assert wait_for(lambda: worker.status()['last_error'] is not None), "Failure should be reported"
+        assert worker.version == 'v1', "A failed refresh should not swap versions"
+        worker.stop(5)
+        
+        # Scheduled refreshes and versions published elsewhere
+        latest = ['v9']
+        scheduled = RefreshWorker(lambda: 'v10', version='v8', latest=lambda: latest[0],
+                                  interval_seconds=0.3, poll_seconds=0.05).start()
+        assert wait_for(lambda: scheduled.version == 'v9'), "Versions published elsewhere should be picked up"
+        latest[0] = 'v10'
+        assert wait_for(lambda: scheduled.status()['refreshes'] >= 1), "A scheduled refresh should run"
+        scheduled.stop(5)
+        
+        print("✅ Refresh worker successful")
+        print(f"   - Serving: {worker.version}, last error: {worker.status()['last_error']}")
+        return True
+    except Exception as e:
+        print(f"❌ Refresh worker error: {e}")
+        return False
+
+def test_run_queries():
+    """Test that a batch of widget queries matches the queries run one by one"""
+    try:
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        
+        data = VehicleDataScraper().generate_bulk_data(days=500, seed=23)
+        batched = VehicleDataProcessor(data)
+        batched.process_data()
+        direct = VehicleDataProcessor(data)
+        direct.process_data()
+        
+        specs = [
+            {'query': 'growth_metrics'},
+            {'query': 'summary_statistics'},
+            {'query': 'trend', 'period': 'weekly'},
+            {'query': 'top_manufacturers', 'limit': 5},
+            {'query': 'series_analytics', 'period': 'monthly', 'window': 3},
+            {'query': 'quarterly_totals'},
+            {'query': 'filter_options'}
+        ]
+        results = batched.run_queries(specs)
+        assert len(results) == len(specs), "One result per query expected"
+        assert results[0] == direct.calculate_growth_metrics(), "Growth metrics differ"
+        assert results[1] == direct.get_summary_statistics(), "Summary statistics differ"
+        assert results[2].equals(direct.get_trend_data(period='weekly')), "Trend differs"
+        assert results[3] == direct.get_top_manufacturers(limit=5), "Top manufacturers differ"
+        assert results[4].equals(direct.get_series_analytics(period='monthly', window=3)), "Series analytics differ"
+        assert results[5].equals(direct.get_quarterly_totals()), "Quarterly totals differ"
+        raw_data = direct.processed_data['raw_data']
+        assert results[6]['min_date'] == raw_data['date'].min() and results[6]['max_date'] == raw_data['date'].max()
+        assert sorted(results[6]['manufacturers']) == sorted(raw_data['manufacturer'].unique()), "Filter options differ"
+        
+        # Every batched rollup equals grouping the cube directly
+        cube = direct._add_time_attributes(direct.cube.astype({'registrations': 'int64'}))
+        for keys, totals in batched._rollups.items():
+            expected = cube.groupby(list(keys), observed=True, sort=True)['registrations'].sum()
+            assert totals.equals(expected), f"Rollup {keys} differs"
+        
+        try:
+            batched.run_queries([{'query': 'unknown'}])
+            assert False, "Unknown queries should be rejected"
+        except ValueError:
+            pass
+        
+        print("✅ Batch queries successful")
+        print(f"   - Rollups built in one pass: {len(batched._rollups)}")
+        return True
+    except Exception as e:
+        print(f"❌ Batch queries error: {e}")
+        return False
+
+def test_query_service():
+    """Test the headless JSON/Arrow query service over one keep-alive connection"""
+    try:
+        import gzip
+        import json
+        import http.client
+        import pyarrow.ipc as ipc
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from query_service import QueryServiceServer
+        
+        processor = VehicleDataProcessor(VehicleDataScraper().generate_bulk_data(days=120, seed=29))
+        processor.process_data()
+        server = QueryServiceServer(processor, port=0)
+        server.start()
+        try:
+            connection = http.client.HTTPConnection(*server.server_address[:2])
+            
+            def get(path, headers=None):
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                return response, response.read()
+            
+            response, body = get('/summary')
+            assert response.status == 200, f"Summary failed with {response.status}"
+            assert json.loads(body)['total_registrations'] == processor.get_summary_statistics()['total_registrations']
+            
+            response, body = get('/top_manufacturers?limit=3')
+            assert [row['manufacturer'] for row in json.loads(body)] == list(processor.get_top_manufacturers(limit=3))
+            
+            # Arrow streams and gzip bodies hold the same rows
+            response, body = get('/filtered?vehicle_type=2W', {'Accept-Encoding': 'gzip'})
+            assert response.getheader('Content-Encoding') == 'gzip', "Large bodies should be compressed"
+            rows = len(processor.get_filtered_data(vehicle_type='2W'))
+            assert len(json.loads(gzip.decompress(body))) == rows, "JSON rows differ"
+            response, body = get('/filtered?vehicle_type=2W&format=arrow')
+            assert ipc.open_stream(body).read_all().num_rows == rows, "Arrow rows differ"
+            
+            # q=0 refuses gzip, however the coding is spelled
+            for refused in ['gzip;q=0', 'x-gzip;q=0', 'deflate, gzip; q=0.0', 'gzip;q=0, *']:
+                response, body = get('/filtered?vehicle_type=2W', {'Accept-Encoding': refused})
+                assert response.getheader('Content-Encoding') is None, f"'{refused}' should not be compressed"
+                assert len(json.loads(body)) == rows, "Uncompressed JSON rows differ"
+            for accepted in ['deflate, gzip;q=0.5', '*']:
+                response, body = get('/filtered?vehicle_type=2W', {'Accept-Encoding': accepted})
+                assert response.getheader('Content-Encoding') == 'gzip', f"'{accepted}' should be compressed"
+            
+            response, _ = get('/trend?period=hourly')
+            assert response.status == 400, "Bad arguments should be rejected"
+            response, _ = get('/growth')
+            assert response.status == 200, "Connection should be kept alive"
+            
+            # Unexpected errors are answered with a 500 and recorded
+            def fail(*args, **kwargs):
+                raise RuntimeError("backend unavailable")
+            processor.get_top_manufacturers = fail
+            response, body = get('/top_manufacturers?limit=4')
+            assert response.status == 500 and 'error' in json.loads(body), "Errors should answer 500"
+            response, _ = get('/summary')
+            assert response.status == 200, "Connection should survive an error"
+            
+            latency = server.metrics.stats()
+            assert {'GET /summary', 'GET /filtered', 'GET /growth'} <= set(latency), "Endpoint latency not recorded"
+            assert 'GET /top_manufacturers 500' in latency, "Failed requests not recorded"
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        print("✅ Query service successful")
+        print(f"   - Endpoints timed: {len(latency)}")
+        return True
+    except Exception as e:
+        print(f"❌ Query service error: {e}")
+        return False
+
+def test_chart_data():
+    """Test chart downsampling, period choice and the figure cache"""
+    try:
+        import numpy as np
+        import pandas as pd
+        import plotly.express as px
+        from chart_data import (lttb_indices, min_max_indices, downsample, choose_period,
+                                plot_x, cached_figure, figure_cache)
+        
+        x = np.arange(10_000)
+        y = np.sin(x / 500.0)
+        y[4321] = 5.0
+        kept = lttb_indices(x, y, 500)
+        assert len(kept) == 500 and kept[0] == 0 and kept[-1] == len(x) - 1, "LTTB must keep the endpoints"
+        assert 4321 in kept, "LTTB dropped the peak"
+        assert 4321 in min_max_indices(y, 100), "Min-max dropped the peak"
+        
+        series = pd.DataFrame({
+            'date': np.tile(pd.date_range('2000-01-01', periods=5000), 2),
+            'manufacturer': np.repeat(['Tata', 'Honda'], 5000),
+            'registrations': np.arange(10_000)
+        })
+        reduced = downsample(series, 'date', 'registrations', max_points=300, group='manufacturer')
+        assert (reduced.groupby('manufacturer').size() == 300).all(), "Each series should have 300 points"
+        
+        assert choose_period('2024-01-01', '2024-06-30') == 'daily', "Short ranges should stay daily"
+        assert choose_period('2000-01-01', '2024-12-31') == 'monthly', "Long ranges should be monthly"
+        assert str(plot_x(pd.Series(pd.period_range('2024-01', periods=3, freq='M'))).dtype).startswith('datetime64'), \
+            "Periods should become datetimes"
+        
+        builds = []
+        def build():
+            builds.append(1)
+            return px.line(series.head(10), x='date', y='registrations')
+        first = cached_figure('test', {'vehicle_type': 'All'}, ('v', 1), build)
+        second = cached_figure('test', {'vehicle_type': None}, ('v', 1), build)
+        cached_figure('test', {'vehicle_type': None}, ('v', 2), build)
+        assert first is second and len(builds) == 2, "Figure cache keys are wrong"
+        figure_cache.clear()
+        
+        print("✅ Chart data successful")
+        print(f"   - Downsampled {len(series):,} points to {len(reduced):,}")
+        return True
+    except Exception as e:
+        print(f"❌ Chart data error: {e}")
+        return False
+
+def test_sql_backend():
+    """Test that SQL backend queries match the in-memory processor"""
+    try:
+        import tempfile
+        import pandas as pd
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from sql_backend import SQLiteBackend
+        
+        data = VehicleDataScraper().generate_bulk_data(days=300, manufacturers_per_type=8, seed=43)
+        in_memory = VehicleDataProcessor(data)
+        in_memory.process_data()
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'registrations.sqlite')
+            sql = VehicleDataProcessor(data)
+            sql.process_data()
+            sql.use_sql_backend(SQLiteBackend(path))
+            
+            assert sql.get_summary_statistics() == in_memory.get_summary_statistics(), "Summary statistics differ"
+            assert sql.get_top_manufacturers('4W', 5) == in_memory.get_top_manufacturers('4W', 5), "Top manufacturers differ"
+            for period in ['daily', 'weekly', 'quarterly', 'fiscal_year']:
+                assert sql.get_trend_data(period=period).equals(in_memory.get_trend_data(period=period)), \
+                    f"{period} trend differs"
+            
+            end_date = in_memory.raw_data['date'].max()
+            filters = dict(start_date=end_date - pd.Timedelta(days=60), end_date=end_date,
+                           vehicle_type='2W', manufacturer='Honda')
+            filtered = sql.get_filtered_data(**filters)
+            expected = in_memory.get_filtered_data(**filters)
+            assert len(filtered) > 0 and filtered.astype(str).reset_index(drop=True).equals(
+                expected.astype(str).reset_index(drop=True)), "Filtered data differs"
+            sql.backend.close()
+            
+            # Reopen the file database without loading raw rows into pandas
+            backend = SQLiteBackend(path)
+            assert backend.is_loaded(), "File database should be reusable"
+            reopened = VehicleDataProcessor.from_sql_backend(backend)
+            assert reopened.raw_data is None, "Raw rows should stay in the database"
+            assert reopened.calculate_growth_metrics() == in_memory.calculate_growth_metrics(), "Growth metrics differ"
+            assert reopened.cube is None, "The daily cube should stay in the database"
+            assert reopened.get_filter_options()['max_date'] == end_date, "Filter options differ"
+            assert reopened.get_quarterly_totals().equals(in_memory.get_quarterly_totals()), "Quarterly totals differ"
+            rollup_rows = sum(len(totals) for totals in reopened._rollups.values())
+            assert rollup_rows < len(in_memory.cube) // 10, "Only coarse rollups should be read"
+            backend.close()
+        
+        print("✅ SQL backend successful")
+        print(f"   - Filtered rows from SQL: {len(filtered)}")
+        return True
+    except Exception as e:
+        print(f"❌ SQL backend error: {e}")
+        return False
+
+def test_query_cache():
+    """Test query result caching, eviction and invalidation"""
+    try:
+        import time
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from query_cache import QueryCache
+        
+        cache = QueryCache(max_bytes=200, ttl_seconds=0.05)
+        cache.set('a', 'x' * 100)
+        cache.set('b', 'y' * 100)
+        assert cache.get('a') == (False, None), "Least recently used entry should be evicted"
+        assert cache.get('b')[0], "Most recent entry should be cached"
+        time.sleep(0.1)
+        assert not cache.get('b')[0], "Expired entry should not be returned"
+        
+        scraper = VehicleDataScraper()
+        data = scraper.generate_bulk_data(days=200, seed=13)
+        processor = VehicleDataProcessor(data)
+        processor.process_data()
+        
+        first = processor.get_top_manufacturers(vehicle_type='2W')
+        second = processor.get_top_manufacturers('2W', 10)
+        assert first is second, "Equivalent queries should share a cached result"
+        assert processor.query_cache.stats()['hits'] >= 1, "Expected a cache hit"
+        
+        update = data.iloc[-1:].copy()
+        update['registrations'] += 1
+        processor.apply_updates(update)
+        third = processor.get_top_manufacturers(vehicle_type='2W')
+        assert third is not first, "Cache should be invalidated by a data update"
+        
+        print("✅ Query cache successful")
+        print(f"   - Cache stats: {processor.query_cache.stats()}")
+        return True
+    except Exception as e:
+        print(f"❌ Query cache error: {e}")
+        return False
+
+def test_data_export():
+    """Test chunked CSV, gzip CSV and Parquet exports"""
+    try:
+        import io
+        import gzip
+        import pandas as pd
+        from data_processor import VehicleDataProcessor
+        from data_scraper import VehicleDataScraper
+        from data_exporter import EXPORT_FORMATS, make_filtered_download
+        from streamlit.elements.widgets.button import convert_data_to_bytes_and_infer_mime
+        
+        scraper = VehicleDataScraper()
+        processor = VehicleDataProcessor(scraper.generate_bulk_data(days=60, seed=17))
+        processor.process_data()
+        expected = processor.get_filtered_data(vehicle_type='2W')
+        
+        chunks = list(processor.iter_filtered_data(vehicle_type='2W', chunk_rows=37))
+        assert max(len(chunk) for chunk in chunks) <= 37, "Chunks should be bounded by chunk_rows"
+        assert pd.concat(chunks).equals(expected), "Chunked filtered data differs"
+        
+        for fmt in EXPORT_FORMATS:
+            export = make_filtered_download(processor, fmt=fmt, chunk_rows=37, vehicle_type='2W')
+            # download_button converts callable results with this function
+            content, _ = convert_data_to_bytes_and_infer_mime(export(), TypeError(f"{fmt} export type"))
+            if fmt == 'parquet':
+                exported = pd.read_parquet(io.BytesIO(content))
+            else:
+                if fmt == 'csv.gz':
+                    content = gzip.decompress(content)
+                exported = pd.read_csv(io.BytesIO(content))
+            assert len(exported) == len(expected), f"{fmt} export has {len(exported)} records"
+            assert exported['registrations'].sum() == expected['registrations'].sum(), f"{fmt} totals differ"
+        
+        print("✅ Data export successful")
+        print(f"   - Formats: {', '.join(EXPORT_FORMATS)}")
+        return True
+    except Exception as e:
+        print(f"❌ Data export error: {e}")
+        return False
+
 def test_dashboard_components():
     """Test dashboard component integration"""
     try:
-        from app import load_data
+        from app import load_data, current_data_version
         
         # Test data loading function
-        processor = load_data()
+        processor = load_data(current_data_version())
         
         if processor and hasattr(processor, 'processed_data'):
             print("✅ Dashboard components integrated successfully")
@@ -167,9 +1258,32 @@ def main():
         ("Package Imports", test_imports),
         ("Local Modules", test_local_modules),
         ("Data Generation", test_data_generation),
+        ("Bulk Data Generation", test_bulk_data_generation),
+        ("Registration Fetching", test_registration_fetching),
+        ("Raw Ingestion", test_raw_ingestion),
         ("Data Processing", test_data_processing),
+        ("Compact Representation", test_compact_representation),
         ("Utility Functions", test_utility_functions),
+        ("Columnar Storage", test_columnar_storage),
         ("Growth Calculations", test_growth_calculations),
+        ("Growth Table", test_growth_table),
+        ("Period Engine", test_period_engine),
+        ("Series Analytics", test_series_analytics),
+        ("Filtered Data", test_filtered_data),
+        ("Incremental Updates", test_incremental_updates),
+        ("Streaming Processing", test_streaming_processing),
+        ("Parallel Processing", test_parallel_processing),
+        ("Profiler", test_profiler),
+        ("Shared Store", test_shared_store),
+        ("SQL Backend", test_sql_backend),
+        ("Lazy Tables", test_lazy_tables),
+        ("Disk Cache", test_disk_cache),
+        ("Refresh Worker", test_refresh_worker),
+        ("Batch Queries", test_run_queries),
+        ("Query Service", test_query_service),
+        ("Chart Data", test_chart_data),
+        ("Query Cache", test_query_cache),
+        ("Data Export", test_data_export),
         ("Dashboard Components", test_dashboard_components)
     ]
     
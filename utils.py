@@ -6,8 +6,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+import glob
 import json
 
+from profiler import profiled
+from analytics import autocorrelation, peak_lags, percentile_rank_of
+
 def ensure_data_directory():
     """Ensure data directories exist"""
     os.makedirs('data/raw', exist_ok=True)
@@ -19,6 +23,14 @@ def calculate_growth(current, previous):
         return 0 if current == 0 else 100
     return ((current - previous) / previous) * 100
 
+def calculate_growth_array(current, previous):
+    """Calculate percentage growth element-wise for arrays of values"""
+    current = np.asarray(current, dtype=float)
+    previous = np.asarray(previous, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (current - previous) / previous * 100
+    return np.where(previous == 0, np.where(current == 0, 0.0, 100.0), growth)
+
 def calculate_yoy_growth(df, current_year, previous_year, value_column):
     """Calculate Year-over-Year growth"""
     current_data = df[df['year'] == current_year][value_column].sum()
@@ -63,8 +75,18 @@ def get_color_for_growth(growth_value):
     else:
         return '#6c757d'  # Gray for no change
 
-def save_data(data, filename, directory='data/processed'):
-    """Save data to file"""
+# Columns read as categoricals and columns used to partition columnar stores
+CATEGORICAL_COLUMNS = ['quarter', 'vehicle_type', 'manufacturer', 'region']
+PARTITION_COLUMNS = ['year', 'month']
+
+@profiled('utils.save_data')
+def save_data(data, filename, directory='data/processed', partition_cols=None):
+    """Save data to file
+    
+    Parquet data is written as a hive-partitioned dataset directory
+    (year=YYYY/month=M/) unless partition_cols is an empty list. Rewriting
+    a dataset replaces only the partitions present in data.
+    """
     ensure_data_directory()
     filepath = os.path.join(directory, filename)
     
@@ -74,24 +96,185 @@ def save_data(data, filename, directory='data/processed'):
         data.to_json(filepath, orient='records')
     elif filename.endswith('.xlsx'):
         data.to_excel(filepath, index=False)
+    elif filename.endswith('.parquet'):
+        _save_parquet(_prepare_columnar(data), filepath, partition_cols)
+    elif filename.endswith('.feather'):
+        _prepare_columnar(data).to_feather(filepath)
     
     return filepath
 
-def load_data(filename, directory='data/processed'):
-    """Load data from file"""
-    filepath = os.path.join(directory, filename)
+def _prepare_columnar(data):
+    """Store dates as timestamps so date predicates can be pushed down"""
+    data = data.reset_index(drop=True)
+    if 'date' in data.columns and not pd.api.types.is_datetime64_any_dtype(data['date']):
+        data = data.assign(date=pd.to_datetime(data['date'].astype(str)))
+    return data
+
+def _save_parquet(data, filepath, partition_cols=None):
+    """Write a Parquet file or a year/month partitioned Parquet dataset"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    if partition_cols is None:
+        partition_cols = [c for c in PARTITION_COLUMNS if c in data.columns]
+    if not partition_cols:
+        data.to_parquet(filepath, index=False)
+        return
+    
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    pq.write_to_dataset(
+        table, filepath, partition_cols=list(partition_cols),
+        existing_data_behavior='delete_matching'
+    )
+
+@profiled('utils.load_data')
+def load_data(filename, directory='data/processed', columns=None, start_date=None,
+              end_date=None, vehicle_type=None, manufacturer=None):
+    """Load data from file
+    
+    Args:
+        filename: File name; .parquet may be a file or a partitioned dataset
+        directory: Directory containing the file
+        columns: Optional list of columns to read
+        start_date, end_date: Optional inclusive date range
+        vehicle_type, manufacturer: Optional value or list of values
+            ('All' means no filter)
+    
+    Parquet and Feather files only read the requested columns and push the
+    filters down to partitions and row groups; other formats are filtered
+    after reading. Categorical columns are returned as pandas categoricals.
+    """
+    filters = {
+        'start_date': start_date, 'end_date': end_date,
+        'vehicle_type': vehicle_type, 'manufacturer': manufacturer
+    }
     
+    # A glob pattern ingests every matching raw file (see ingest.py)
+    if glob.has_magic(filename):
+        from ingest import ingest_files
+        data, _ = ingest_files(filename, directory)
+        return _project(_filter_rows(data, **filters), columns)
+    
+    filepath = os.path.join(directory, filename)
     if not os.path.exists(filepath):
         return None
     
+    if filename.endswith('.parquet') or filename.endswith('.feather'):
+        return _load_columnar(filepath, columns, **filters)
+    
     if filename.endswith('.csv'):
-        return pd.read_csv(filepath)
+        header = pd.read_csv(filepath, nrows=0).columns
+        usecols = _projection(header, columns, filters)
+        dtype = {c: 'category' for c in CATEGORICAL_COLUMNS if c in usecols}
+        data = pd.read_csv(filepath, usecols=usecols, dtype=dtype)
     elif filename.endswith('.json'):
-        return pd.read_json(filepath)
+        data = pd.read_json(filepath)
     elif filename.endswith('.xlsx'):
-        return pd.read_excel(filepath)
+        data = pd.read_excel(filepath)
+    else:
+        return None
+    
+    return _project(_filter_rows(data, **filters), columns)
+
+def iter_data_chunks(filename, directory='data/processed', chunk_rows=1_000_000, columns=None):
+    """Yield a data file as DataFrames of at most chunk_rows rows
+    
+    CSV files and Parquet/Feather files or partitioned datasets are read
+    incrementally; JSON and Excel files are read whole and then sliced.
+    """
+    filepath = os.path.join(directory, filename)
+    if not os.path.exists(filepath):
+        return
+    
+    if filename.endswith('.parquet') or filename.endswith('.feather'):
+        import pyarrow.dataset as ds
+        file_format = 'feather' if filename.endswith('.feather') else 'parquet'
+        partitioning = 'hive' if os.path.isdir(filepath) else None
+        dataset = ds.dataset(filepath, format=file_format, partitioning=partitioning)
+        for batch in dataset.to_batches(columns=columns, batch_size=chunk_rows):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    elif filename.endswith('.csv'):
+        yield from pd.read_csv(filepath, usecols=columns, chunksize=chunk_rows)
+    else:
+        data = load_data(filename, directory, columns=columns)
+        for start in range(0, len(data), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+
+def _projection(available, columns, filters):
+    """Get the columns to read: the requested ones plus those filtered on"""
+    if columns is None:
+        return list(available)
+    needed = list(columns)
+    if filters['start_date'] or filters['end_date']:
+        needed.append('date')
+    needed += [c for c in ['vehicle_type', 'manufacturer'] if _filter_values(filters[c])]
+    return [c for c in available if c in needed]
+
+def _project(data, columns):
+    """Keep only the requested columns of an in-memory frame"""
+    if columns is not None:
+        data = data[list(columns)]
+    return data
+
+def _filter_values(value):
+    """Normalize a filter value to a list, or None when it does not filter"""
+    if value is None or value == 'All':
+        return None
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+def _filter_rows(data, start_date=None, end_date=None, vehicle_type=None, manufacturer=None):
+    """Apply load_data filters to an in-memory frame"""
+    if start_date or end_date:
+        dates = pd.to_datetime(data['date'])
+        mask = pd.Series(True, index=data.index)
+        if start_date:
+            mask &= dates >= pd.Timestamp(start_date)
+        if end_date:
+            mask &= dates <= pd.Timestamp(end_date)
+        data = data[mask]
+    for column, value in [('vehicle_type', vehicle_type), ('manufacturer', manufacturer)]:
+        values = _filter_values(value)
+        if values:
+            data = data[data[column].isin(values)]
+    return data
+
+def _load_columnar(filepath, columns=None, start_date=None, end_date=None,
+                   vehicle_type=None, manufacturer=None):
+    """Load a Parquet/Feather file or dataset with projection and pushdown"""
+    import pyarrow.dataset as ds
+    
+    file_format = 'feather' if filepath.endswith('.feather') else 'parquet'
+    partitioning = 'hive' if os.path.isdir(filepath) else None
+    dataset = ds.dataset(filepath, format=file_format, partitioning=partitioning)
+    names = dataset.schema.names
+    
+    expression = None
+    conditions = []
+    if start_date:
+        start = pd.Timestamp(start_date)
+        conditions.append(ds.field('date') >= start)
+        if 'year' in names:
+            conditions.append(ds.field('year') >= start.year)
+    if end_date:
+        end = pd.Timestamp(end_date)
+        conditions.append(ds.field('date') <= end)
+        if 'year' in names:
+            conditions.append(ds.field('year') <= end.year)
+    for column, value in [('vehicle_type', vehicle_type), ('manufacturer', manufacturer)]:
+        values = _filter_values(value)
+        if values:
+            conditions.append(ds.field(column).isin(values))
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
     
-    return None
+    if columns is not None:
+        columns = [c for c in columns if c in names]
+    table = dataset.to_table(columns=columns, filter=expression)
+    categories = [c for c in CATEGORICAL_COLUMNS if c in table.column_names]
+    return table.to_pandas(categories=categories)
 
 def get_available_years():
     """Get list of available years for filtering"""
@@ -121,23 +304,20 @@ def detect_seasonality(data, period=12):
     if len(data) < period * 2:
         return None
     
-    # Simple seasonality detection using autocorrelation
-    autocorr = np.correlate(data, data, mode='full')
-    autocorr = autocorr[len(autocorr)//2:]
+    # Simple seasonality detection using autocorrelation, computed with the
+    # FFT (same values as np.correlate(mode='full') in O(n log n))
+    autocorr = autocorrelation(data, demean=False, normalize=False)[0]
     
     # Find peaks in autocorrelation
-    peaks = []
-    for i in range(1, len(autocorr)-1):
-        if autocorr[i] > autocorr[i-1] and autocorr[i] > autocorr[i+1]:
-            peaks.append(i)
+    peaks = peak_lags(autocorr, tolerance=1e-9 * abs(autocorr[0])).tolist()
     
     return peaks if peaks else None
 
 def calculate_percentile_rank(data, value):
-    """Calculate percentile rank of a value in a dataset"""
+    """Calculate percentile rank of a value (or array of values) in a dataset"""
     if len(data) == 0:
         return 0
-    return (data < value).sum() / len(data) * 100
+    return percentile_rank_of(data, value)
 
 def format_currency(amount, currency='INR'):
     """Format amount as currency"""
@@ -0,0 +1,149 @@
+"""
+Registration Fetcher for Vehicle Registration Dashboard
+Fetches state x month x vehicle-class registration pages concurrently
+"""
+
+import os
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from config import FETCH_CONFIG, STATE_REGIONS
+
+# One registration page: state code, month ('YYYY-MM') and vehicle class
+FetchTask = namedtuple('FetchTask', ['state', 'month', 'vehicle_class'])
+
+# HTTP statuses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class RateLimiter:
+    """Per-host rate limiter spacing requests evenly across threads"""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """Block until the next request to host is allowed"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class RegistrationFetcher:
+    def __init__(self, base_url=None, max_workers=None, requests_per_second=None,
+                 retries=None, backoff_seconds=None, timeout_seconds=None, checkpoint_dir=None):
+        self.base_url = (base_url or FETCH_CONFIG['base_url']).rstrip('/')
+        self.max_workers = max_workers or FETCH_CONFIG['max_workers']
+        self.retries = FETCH_CONFIG['retries'] if retries is None else retries
+        self.backoff_seconds = FETCH_CONFIG['backoff_seconds'] if backoff_seconds is None else backoff_seconds
+        self.timeout_seconds = timeout_seconds or FETCH_CONFIG['timeout_seconds']
+        self.checkpoint_dir = checkpoint_dir or FETCH_CONFIG['checkpoint_dir']
+        self.rate_limiter = RateLimiter(
+            FETCH_CONFIG['requests_per_second'] if requests_per_second is None else requests_per_second
+        )
+        self.failures = []
+
+        # One pooled session shared by all workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch_all(self, tasks):
+        """Fetch every task concurrently and return the combined registrations
+
+        Tasks with an existing checkpoint under checkpoint_dir are not
+        fetched again, so an interrupted crawl resumes where it stopped.
+        Tasks that still fail after all retries are listed in self.failures.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self.failures = []
+        pending = [task for task in tasks if not os.path.exists(self._checkpoint_path(task))]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch_task, task): task for task in pending}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    self.failures.append((futures[future], str(e)))
+
+        frames = [
+            pd.read_csv(self._checkpoint_path(task)) for task in tasks
+            if os.path.exists(self._checkpoint_path(task))
+        ]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def fetch_task(self, task):
+        """Fetch, parse and checkpoint a single registration page"""
+        html = self._get(f"{self.base_url}/registrations", {
+            'state': task.state, 'month': task.month, 'vehicle_class': task.vehicle_class
+        })
+        records = self.parse_page(html, task)
+
+        # Write to a temporary file first so a checkpoint is never partial
+        path = self._checkpoint_path(task)
+        records.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+        return records
+
+    def _get(self, url, params):
+        """GET a page with per-host rate limiting and exponential backoff"""
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait(host)
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout_seconds)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.text
+                error = requests.HTTPError(f"{response.status_code} for {response.url}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt < self.retries:
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+        raise error
+
+    def parse_page(self, html, task):
+        """Parse a registration table (maker, registrations) into dashboard rows"""
+        soup = BeautifulSoup(html, 'lxml')
+        rows = []
+        for row in soup.select('table#registrations tbody tr'):
+            cells = [cell.get_text(strip=True) for cell in row.find_all('td')]
+            if len(cells) >= 2:
+                rows.append((cells[0], int(cells[1].replace(',', ''))))
+
+        date = pd.Timestamp(f"{task.month}-01")
+        return pd.DataFrame({
+            'date': date.strftime('%Y-%m-%d'),
+            'year': date.year,
+            'month': date.month,
+            'quarter': f"Q{date.quarter}",
+            'vehicle_type': task.vehicle_class,
+            'manufacturer': [maker for maker, _ in rows],
+            'registrations': [count for _, count in rows],
+            'region': STATE_REGIONS.get(task.state, 'Central'),
+            'state': task.state
+        }, columns=['date', 'year', 'month', 'quarter', 'vehicle_type',
+                    'manufacturer', 'registrations', 'region', 'state'])
+
+    def _checkpoint_path(self, task):
+        """Get the checkpoint file for a task"""
+        return os.path.join(
+            self.checkpoint_dir, f"{task.state}_{task.month}_{task.vehicle_class}.csv"
+        )
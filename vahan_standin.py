@@ -0,0 +1,157 @@
+"""
+Local Vahan Stand-in Server for Vehicle Registration Dashboard
+Serves recorded registration pages over HTTP so fetching can be tested offline
+
+Usage:
+    python vahan_standin.py --record     # record sample pages, then serve them
+    python vahan_standin.py --port 8765 --directory data/raw/recorded
+"""
+
+import os
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from config import STATE_REGIONS
+from data_scraper import MANUFACTURERS_BY_TYPE, BASE_REGISTRATION_RANGES
+
+RECORDED_PAGES_DIR = 'data/raw/recorded'
+
+def page_filename(state, month, vehicle_class):
+    """Get the recorded page file name for a request"""
+    return f"{state}_{month}_{vehicle_class}.html"
+
+def render_page(state, month, vehicle_class, registrations):
+    """Render a registration page in the layout the fetcher parses"""
+    rows = '\n'.join(
+        f"      <tr><td>{maker}</td><td>{count:,}</td></tr>"
+        for maker, count in registrations.items()
+    )
+    return f"""<html>
+  <head><title>Vahan registrations - {state} {month} {vehicle_class}</title></head>
+  <body>
+    <table id="registrations">
+      <thead><tr><th>Maker</th><th>Registrations</th></tr></thead>
+      <tbody>
+{rows}
+      </tbody>
+    </table>
+  </body>
+</html>
+"""
+
+def record_sample_pages(directory=RECORDED_PAGES_DIR, states=None, months=None, seed=None):
+    """Write synthetic monthly registration pages for offline use"""
+    rng = random.Random(seed)
+    states = states or list(STATE_REGIONS)
+    months = months or ['2024-01', '2024-02', '2024-03']
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for state in states:
+        for month in months:
+            for vehicle_class, manufacturers in MANUFACTURERS_BY_TYPE.items():
+                low, high = BASE_REGISTRATION_RANGES[vehicle_class]
+                registrations = {
+                    maker: int(rng.randint(low, high) * rng.uniform(0.7, 1.3))
+                    for maker in manufacturers
+                }
+                path = os.path.join(directory, page_filename(state, month, vehicle_class))
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(render_page(state, month, vehicle_class, registrations))
+                paths.append(path)
+    return paths
+
+class VahanStandInServer(ThreadingHTTPServer):
+    """HTTP server answering /registrations requests from recorded pages
+
+    fail_first makes each page answer 503 that many times before succeeding,
+    to exercise client retries.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, directory=RECORDED_PAGES_DIR, host='127.0.0.1', port=8765, fail_first=0):
+        super().__init__((host, port), _StandInHandler)
+        self.directory = directory
+        self.fail_first = fail_first
+        self.request_count = 0
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def should_fail(self, key):
+        """Count a request and decide whether to answer it with a 503"""
+        with self._lock:
+            self.request_count += 1
+            failures = self._failures.get(key, 0)
+            if failures < self.fail_first:
+                self._failures[key] = failures + 1
+                return True
+            return False
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path != '/registrations' or not {'state', 'month', 'vehicle_class'} <= params.keys():
+            return self._send(404, b'Not found')
+
+        filename = page_filename(params['state'], params['month'], params['vehicle_class'])
+        if self.server.should_fail(filename):
+            return self._send(503, b'Service unavailable')
+
+        path = os.path.join(self.server.directory, os.path.basename(filename))
+        if not os.path.exists(path):
+            return self._send(404, b'No recorded page')
+        with open(path, 'rb') as f:
+            self._send(200, f.read(), 'text/html; charset=utf-8')
+
+    def _send(self, status, body, content_type='text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    """Serve recorded pages until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--directory', default=RECORDED_PAGES_DIR)
+    parser.add_argument('--record', action='store_true', help='Record sample pages before serving')
+    args = parser.parse_args()
+
+    if args.record:
+        paths = record_sample_pages(args.directory)
+        print(f"✅ Recorded {len(paths)} sample pages in {args.directory}")
+
+    server = VahanStandInServer(args.directory, args.host, args.port)
+    print(f"🌐 Serving recorded Vahan pages at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping stand-in server")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()